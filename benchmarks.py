@@ -0,0 +1,1165 @@
+"""
+STRATALERTS - PERFORMANCE BENCHMARKS
+====================================
+
+Offline micro-benchmarks for the monitoring hot paths. Nothing here talks
+to the network; every benchmark builds its own scratch data.
+
+To run all:  python benchmarks.py
+To run some: python benchmarks.py db quotes
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import asyncio
+import contextlib
+import random
+import sqlite3
+import tempfile
+import threading
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import requests
+
+import complete_trading_system
+from complete_trading_system import (
+    MIGRATIONS, SQL_INSERT_STRATEGY, SQL_SELECT_ACTIVE_STRATEGIES, BarStore, Condition, Config, HttpClient,
+    IndicatorEngine, IndicatorPlan, JsonLinesQuoteStream, MarketData, Strategy, StrategyBatch, StrategyChecker,
+    StrategyType, ThresholdIndex, Tick, TokenBucket, TradingAlertSystem, VolumeTracker, migrate, wilder_rsi,
+    AdaptivePoller, AlertDispatcher, CycleScheduler, ExchangeCalendar, MarketCalendar, Plan, QuoteCache, SymbolClass
+)
+
+
+def _timeit(fn, repeat: int = 5) -> float:
+    """Best wall-clock time of `repeat` runs, in milliseconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def _header(title: str):
+    print("\n" + "="*70)
+    print(title)
+    print("="*70)
+
+
+# ============================================================================
+# DATABASE
+# ============================================================================
+
+def _populate(conn: sqlite3.Connection, n_strategies: int, pending_ratio: float = 0.01):
+    """Fill a scratch database with users and mostly-triggered strategies"""
+    rng = random.Random(42)
+    tickers = ["AAPL", "TSLA", "MSFT", "GOOGL", "AMZN", "NVDA", "META", "NFLX", "SPY", "QQQ"]
+    n_users = max(1, n_strategies // 10)
+    
+    with conn:
+        conn.executemany(
+            'INSERT INTO users (email) VALUES (?)',
+            ((f"user{i}@example.com",) for i in range(n_users))
+        )
+        conn.executemany(
+            '''INSERT INTO strategies
+               (user_id, ticker, strategy_type, condition, threshold, parameters, triggered_at)
+               VALUES (?, ?, 'PRICE', 'above', ?, '{}', ?)''',
+            ((
+                rng.randint(1, n_users),
+                rng.choice(tickers),
+                rng.uniform(10, 500),
+                None if rng.random() < pending_ratio else '2024-01-01 00:00:00'
+            ) for _ in range(n_strategies))
+        )
+
+
+def bench_db(sizes=(10_000, 100_000, 1_000_000)):
+    """Active-strategy query time before (v1) and after (latest) the index migration"""
+    _header("DB: active-strategy query (best of 5)")
+    print(f"{'strategies':>12} {'pending':>9} {'v1 ms':>10} {'v' + str(MIGRATIONS[-1][0]) + ' ms':>10} {'speedup':>8}")
+    
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            conn = sqlite3.connect(os.path.join(tmp, 'bench.db'))
+            for statement in MIGRATIONS[0][2]:
+                conn.execute(statement)
+            conn.execute(f'PRAGMA user_version = {MIGRATIONS[0][0]}')
+            _populate(conn, n)
+            
+            query = lambda: conn.execute(SQL_SELECT_ACTIVE_STRATEGIES).fetchall()
+            pending = len(query())
+            before = _timeit(query)
+            
+            migrate(conn)
+            after = _timeit(query)
+            conn.close()
+        
+        print(f"{n:>12,} {pending:>9,} {before:>10.2f} {after:>10.2f} {before / after:>7.1f}x")
+
+
+# ============================================================================
+# STUB MARKET DATA SERVER
+# ============================================================================
+
+def stub_price(ticker: str) -> float:
+    """Deterministic fake price for a ticker"""
+    return 10 + zlib.crc32(ticker.encode()) % 50000 / 100
+
+
+def stub_volume(ticker: str) -> tuple:
+    """Fake (session volume so far, average daily volume) for a ticker - the session total grows over the day"""
+    average = 100_000 + zlib.crc32(ticker[::-1].encode()) % 5_000_000
+    return int(average * 1.5 * (time.time() % 86400) / 86400), average
+
+
+class _StubQuoteHandler(BaseHTTPRequestHandler):
+    """Answers the Yahoo and Polygon endpoints MarketData calls, Yahoo's cookie/crumb handshake included"""
+    
+    protocol_version = "HTTP/1.1"  # Allow keep-alive
+    disable_nagle_algorithm = True  # Headers and body go out as separate writes
+    
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.request_count += 1
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        parts = url.path.strip('/').split('/')
+        
+        symbols = (query.get('symbols') or query.get('tickers') or [''])[0].split(',')
+        if url.path.startswith(('/v8/', '/v2/aggs/')):
+            symbols = [parts[3] if parts[0] == 'v2' else parts[-1]]
+        delay = server.latency + max((server.slow.get(t, 0) for t in symbols), default=0)
+        if delay:
+            time.sleep(delay)
+        
+        cookie = f"A3={server.crumb}-session"
+        signed_in = cookie in self.headers.get('Cookie', '')
+        if url.path == '/cookie':
+            self._respond(404, b'', ('Set-Cookie', f"{cookie}; Path=/"))
+            return
+        if url.path == '/v1/test/getcrumb':
+            self._respond(200, server.crumb.encode() if signed_in else b'')
+            return
+        if url.path == '/v7/finance/quote' and not (signed_in and query.get('crumb') == [server.crumb]):
+            self._respond(401, b'{"finance":{"error":{"code":"Unauthorized","description":"Invalid Crumb"}}}')
+            return
+        
+        if url.path == '/v7/finance/quote':
+            body = {'quoteResponse': {'result': [
+                {'symbol': t, 'regularMarketPrice': stub_price(t), 'regularMarketVolume': stub_volume(t)[0],
+                 'averageDailyVolume10Day': stub_volume(t)[1]} for t in symbols if t
+            ]}}
+        elif url.path.startswith('/v8/finance/chart/'):
+            body = {'chart': {'result': [{'meta': {'regularMarketPrice': stub_price(parts[-1]),
+                                                   'regularMarketVolume': stub_volume(parts[-1])[0]}}]}}
+        elif url.path == '/v2/snapshot/locale/us/markets/stocks/tickers':
+            body = {'tickers': [
+                {'ticker': t, 'lastTrade': {'p': stub_price(t)}, 'day': {'v': stub_volume(t)[0]},
+                 'prevDay': {'v': stub_volume(t)[1]}} for t in symbols if t
+            ]}
+        elif url.path.startswith('/v2/aggs/ticker/') and parts[-1] == 'prev':
+            body = {'results': [{'c': stub_price(parts[-2]), 'v': stub_volume(parts[-2])[1]}]}
+        else:
+            self.send_error(404)
+            return
+        
+        self._respond(200, json.dumps(body).encode())
+    
+    def _respond(self, status: int, payload: bytes, *headers):
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        for header in headers:
+            self.send_header(*header)
+        self.end_headers()
+        try:
+            self.wfile.write(payload)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # The client gave up at its deadline
+    
+    def log_message(self, format, *args):
+        pass
+
+
+class StubQuoteServer:
+    """
+    Local HTTP server impersonating the quote providers
+    
+    Usage:
+        with StubQuoteServer(latency=0.005, slow={"SLOW": 3.0}) as server:
+            market_data = _stub_market_data(server)
+    """
+    
+    def __init__(self, latency: float = 0.0, slow: dict = None):
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), _StubQuoteHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.latency = latency
+        self.httpd.slow = slow or {}  # Extra per-ticker latency
+        self.httpd.request_count = 0
+        self.httpd.crumb = "stubcrumb"  # Change it to expire the crumb clients hold
+        self.httpd.lock = threading.Lock()
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+    
+    @property
+    def request_count(self) -> int:
+        return self.httpd.request_count
+    
+    def __enter__(self):
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+    
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def _stub_market_data(server: StubQuoteServer, use_free: bool = True, rate_limited: bool = False) -> MarketData:
+    market_data = MarketData(cache=QuoteCache())  # Not the process-wide cache, so every run really fetches
+    market_data.use_free = use_free
+    market_data.yahoo_url = market_data.polygon_url = server.url
+    market_data.yahoo_cookie_url = f"{server.url}/cookie"
+    market_data.calendar = None  # Benchmarks run at any hour; the stub server is always open
+    if not rate_limited:
+        market_data.rate_limits = {provider: TokenBucket(1_000_000, 1_000_000)
+                                   for provider in market_data.rate_limits}
+    return market_data
+
+
+class StubStreamServer:
+    """
+    Local quote stream speaking JsonLinesQuoteStream's protocol
+    
+    Ticks are stamped with the time they are sent. Usage:
+        with StubStreamServer() as server:
+            server.replay(ticks, rate=5000)  # Starts once a client subscribes
+            source = JsonLinesQuoteStream(port=server.port)
+    """
+    
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.clients = {}  # writer -> subscribed tickers
+        self.subscribed = threading.Event()
+        self.sent = 0
+        self.server = self.loop.run_until_complete(asyncio.start_server(self._client, '127.0.0.1', 0))
+        self.port = self.server.sockets[0].getsockname()[1]
+    
+    async def _client(self, reader, writer):
+        tickers = self.clients[writer] = set()
+        try:
+            async for line in reader:
+                message = json.loads(line)
+                if message.get('action') == 'subscribe':
+                    tickers.update(message['tickers'])
+                    self.subscribed.set()
+        except ConnectionError:
+            pass
+        finally:
+            self.clients.pop(writer, None)
+            writer.close()
+    
+    def _send(self, ticks):
+        for ticker, price, volume in ticks:
+            line = json.dumps({'ticker': ticker, 'price': price, 'volume': volume,
+                               'timestamp': time.time()}).encode() + b"\n"
+            for writer, tickers in self.clients.items():
+                if ticker in tickers:
+                    writer.write(line)
+                    self.sent += 1
+    
+    def publish(self, ticker: str, price: float, volume: float = None):
+        """Push one tick to every subscriber (thread-safe)"""
+        self.loop.call_soon_threadsafe(self._send, [(ticker, price, volume)])
+    
+    def replay(self, ticks, rate: float):
+        """Push (ticker, price, volume) ticks at `rate` per second from a background thread"""
+        def run():
+            self.subscribed.wait()
+            start = time.perf_counter()
+            chunk = max(1, int(rate / 1000))  # About one send per millisecond
+            for i in range(0, len(ticks), chunk):
+                ahead = start + i / rate - time.perf_counter()
+                if ahead > 0:
+                    time.sleep(ahead)
+                self.loop.call_soon_threadsafe(self._send, ticks[i:i + chunk])
+        threading.Thread(target=run, daemon=True).start()
+    
+    def __enter__(self):
+        threading.Thread(target=self.loop.run_forever, daemon=True).start()
+        return self
+    
+    def __exit__(self, *exc):
+        async def shutdown():
+            self.server.close()
+            for writer in list(self.clients):
+                writer.close()
+        asyncio.run_coroutine_threadsafe(shutdown(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+
+# ============================================================================
+# MARKET DATA
+# ============================================================================
+
+def bench_quotes(n_tickers: int = 500, latency: float = 0.002):
+    """Per-symbol get_price loop vs. batched get_prices against the stub server"""
+    _header(f"QUOTES: {n_tickers} tickers, {latency * 1000:.0f}ms server latency")
+    tickers = [f"T{i:04d}" for i in range(n_tickers)]
+    print(f"{'provider':>10} {'mode':>8} {'requests':>9} {'ms':>10}")
+    
+    for provider, use_free in (('yahoo', True), ('polygon', False)):
+        with StubQuoteServer(latency) as server:
+            market_data = _stub_market_data(server, use_free)
+            
+            start = time.perf_counter()
+            single = {t: market_data.get_price(t) for t in tickers}
+            single_ms = (time.perf_counter() - start) * 1000
+            single_requests = server.request_count
+            
+            market_data.cache = QuoteCache()  # Fetch everything again
+            start = time.perf_counter()
+            batch = market_data.get_prices(tickers)
+            batch_ms = (time.perf_counter() - start) * 1000
+            batch_requests = server.request_count - single_requests
+        
+        assert batch == single, "batch and single quotes disagree"
+        print(f"{provider:>10} {'single':>8} {single_requests:>9,} {single_ms:>10.1f}")
+        print(f"{provider:>10} {'batch':>8} {batch_requests:>9,} {batch_ms:>10.1f}")
+
+
+def bench_http(n_requests: int = 500):
+    """Per-request latency of a fresh connection vs. the pooled keep-alive client"""
+    _header(f"HTTP: {n_requests} single-quote requests against the stub server")
+    
+    with StubQuoteServer() as server:
+        url = f"{server.url}/v8/finance/chart/AAPL"
+        client = HttpClient()
+        client.get(url)  # Warm the pool
+        
+        start = time.perf_counter()
+        for _ in range(n_requests):
+            requests.get(url, timeout=10).json()
+        fresh = (time.perf_counter() - start) / n_requests * 1000
+        
+        start = time.perf_counter()
+        for _ in range(n_requests):
+            client.get(url).json()
+        pooled = (time.perf_counter() - start) / n_requests * 1000
+        client.close()
+    
+    print(f"{'fresh connection':>18}: {fresh:.3f} ms/request")
+    print(f"{'pooled keep-alive':>18}: {pooled:.3f} ms/request ({fresh - pooled:.3f} ms saved)")
+    print("(plain HTTP on loopback - real TLS handshakes to Yahoo/Polygon save far more)")
+
+
+def bench_concurrency(n_tickers: int = 100, latency: float = 0.02, straggler: float = 3.0, deadline: float = 1.0):
+    """Sequential vs. concurrent single-symbol fetching with one straggler"""
+    _header(f"CONCURRENCY: {n_tickers} single-symbol requests, {latency * 1000:.0f}ms each, "
+            f"one {straggler:.0f}s straggler")
+    tickers = [f"T{i:04d}" for i in range(n_tickers - 1)] + ["SLOW"]
+    print(f"{'mode':>28} {'ms':>9} {'missing':>8}")
+    
+    concurrent = complete_trading_system.Config.CONCURRENT_FETCH
+    modes = (
+        ("sequential, no deadline", False, straggler * 10, False),
+        (f"concurrent, {deadline:.0f}s deadline", True, deadline, False),
+        ("  + default rate limit", True, deadline, True),
+    )
+    try:
+        for label, parallel, timeout, rate_limited in modes:
+            with StubQuoteServer(latency, slow={"SLOW": straggler}) as server:
+                market_data = _stub_market_data(server, rate_limited=rate_limited)
+                market_data.YAHOO_BATCH_SIZE = 1  # As if the multi-quote endpoint were unavailable
+                complete_trading_system.Config.CONCURRENT_FETCH = parallel
+                
+                start = time.perf_counter()
+                prices = market_data.get_prices(tickers, timeout=timeout)
+                elapsed = (time.perf_counter() - start) * 1000
+            
+            missing = sum(1 for price in prices.values() if price is None)
+            print(f"{label:>28} {elapsed:>9.0f} {missing:>8}")
+    finally:
+        complete_trading_system.Config.CONCURRENT_FETCH = concurrent
+
+
+# ============================================================================
+# INDICATORS
+# ============================================================================
+
+def _reference_ema(closes, period):
+    """Full-recomputation EMA series (SMA-seeded), None before it exists"""
+    alpha = 2 / (period + 1)
+    out = [None] * len(closes)
+    if len(closes) < period:
+        return out
+    ema = sum(closes[:period]) / period
+    out[period - 1] = ema
+    for i in range(period, len(closes)):
+        ema += alpha * (closes[i] - ema)
+        out[i] = ema
+    return out
+
+
+def _reference_macd(closes, fast=12, slow=26, signal=9):
+    fast_ema, slow_ema = _reference_ema(closes, fast), _reference_ema(closes, slow)
+    line = [f - s for f, s in zip(fast_ema, slow_ema) if s is not None]
+    signal_ema = _reference_ema(line, signal)
+    if not line or signal_ema[-1] is None:
+        return None
+    return line[-1], signal_ema[-1], line[-1] - signal_ema[-1]
+
+
+def _random_walk_bars(store: BarStore, ticker: str, n_bars: int, ticks_per_bar: int = 3, seed: int = 7):
+    """Yield after each quote fed into `store` (several quotes per bar)"""
+    rng = random.Random(seed)
+    price = 100.0
+    for bar in range(n_bars):
+        for tick in range(ticks_per_bar):
+            price *= 1 + rng.gauss(0, 0.002)
+            store.record(ticker, price, timestamp=bar * store.resolution + tick)
+            yield
+
+
+def bench_indicators(n_bars: int = 400):
+    """Incremental indicators vs. full recomputation: correctness, then cost per read"""
+    _header(f"INDICATORS: incremental vs. full recomputation over {n_bars} bars")
+    
+    # Correctness - compare after every single quote, including mid-bar updates
+    store = BarStore()
+    engine = IndicatorEngine(store)
+    checks = 0
+    for _ in _random_walk_bars(store, "AAPL", n_bars):
+        closes = store.get("AAPL").closes().tolist()
+        expected = {
+            ("RSI", 14): wilder_rsi(store.get("AAPL").closes(), 14),
+            ("SMA", 50): sum(closes[-50:]) / 50 if len(closes) >= 50 else None,
+            ("EMA", 20): _reference_ema(closes, 20)[-1],
+        }
+        for (name, period), want in expected.items():
+            got = engine.get("AAPL", name, period)
+            assert (got is None) == (want is None), (name, len(closes), got, want)
+            assert got is None or abs(got - want) < 1e-6, (name, len(closes), got, want)
+            checks += 1
+        want = _reference_macd(closes)
+        got = engine.get("AAPL", "MACD", 12, 26, 9)
+        assert (got is None) == (want is None), ("MACD", len(closes), got, want)
+        assert got is None or all(abs(g - w) < 1e-6 for g, w in zip(got, want)), ("MACD", got, want)
+        checks += 1
+    print(f"✓ {checks:,} reads matched full recomputation (RSI 14, SMA 50, EMA 20, MACD 12/26/9)")
+    
+    # Cost of one read right after a new bar closes
+    print(f"\n{'indicator':>10} {'incremental us':>15} {'full us':>10} {'speedup':>8}")
+    full = {
+        ("RSI", 14): lambda closes: wilder_rsi(closes, 14),
+        ("SMA", 200): lambda closes: float(closes[-200:].mean()),
+        ("EMA", 200): lambda closes: _reference_ema(closes.tolist(), 200)[-1],
+        ("MACD", 12, 26, 9): lambda closes: _reference_macd(closes.tolist()),
+    }
+    for key, recompute in full.items():
+        store = BarStore()
+        engine = IndicatorEngine(store)
+        feed = _random_walk_bars(store, "AAPL", n_bars + 1000, ticks_per_bar=1)
+        for _ in range(n_bars):
+            next(feed)
+        engine.get("AAPL", *key)
+        
+        rounds = 1000
+        elapsed = 0.0
+        for _ in range(rounds):
+            next(feed)  # One new bar closes
+            start = time.perf_counter()
+            engine.get("AAPL", *key)
+            elapsed += time.perf_counter() - start
+        incremental = elapsed / rounds * 1e6
+        
+        closes = store.get("AAPL").closes()
+        start = time.perf_counter()
+        for _ in range(rounds // 10):
+            recompute(closes)
+        recomputed = (time.perf_counter() - start) / (rounds // 10) * 1e6
+        print(f"{key[0] + str(key[1]):>10} {incremental:>15.1f} {recomputed:>10.1f} {recomputed / incremental:>7.1f}x")
+
+
+def bench_timeframes(n_bars: int = 3_000, ticks_per_bar: int = 3):
+    """Rolled-up timeframes vs. resampling every quote: correctness, then cost"""
+    _header(f"TIMEFRAMES: 5m / 15m / 1h / 1d rolled up from {n_bars:,} base bars")
+    timeframes = [seconds for seconds in Config.BAR_TIMEFRAMES.values() if seconds != Config.BAR_RESOLUTION]
+    store = BarStore(capacity=n_bars)
+    engine = IndicatorEngine(store)
+    rng = random.Random(20)
+    start_time = 1_767_621_600.0  # A Monday 09:30 New York
+    quotes, price, checks = [], 100.0, 0
+    
+    def resample(resolution):
+        """Reference OHLCV bars from every quote so far"""
+        bars = {}
+        for timestamp, p, v in quotes:
+            if resolution >= 86400:
+                bucket = store.clock.start(timestamp)
+            else:
+                bucket = timestamp - timestamp % resolution
+            bar = bars.get(bucket)
+            if bar is None:
+                bars[bucket] = [bucket, p, p, p, p, v]
+            else:
+                bar[2], bar[3], bar[4], bar[5] = max(bar[2], p), min(bar[3], p), p, bar[5] + v
+        return list(bars.values())
+    
+    for bar in range(n_bars):
+        if bar == n_bars // 10:
+            for resolution in timeframes:  # Late subscribers are backfilled from the base bars
+                store.subscribe("AAPL", resolution)
+        for tick in range(ticks_per_bar):
+            price *= 1 + rng.gauss(0, 0.002)
+            timestamp = start_time + bar * store.resolution + tick
+            volume = float(rng.randrange(100, 1000))
+            quotes.append((timestamp, price, volume))
+            store.record("AAPL", price, timestamp, volume)
+        if bar < n_bars // 10 or bar % 97:
+            continue
+        for resolution in timeframes:
+            expected = resample(resolution)
+            rolled = store.get("AAPL", resolution)
+            got = np.stack([rolled.field(field) for field in range(6)], axis=1).tolist()
+            # Every bar but the forming one must match exactly
+            assert np.allclose(got[:-1], expected[len(expected) - len(got):-1]), (resolution, bar)
+            closes = [b[4] for b in expected]
+            want = wilder_rsi(np.array(closes), 14)
+            got_rsi = engine.get("AAPL", "RSI", 14, resolution=resolution)
+            assert (got_rsi is None) == (want is None) and (want is None or abs(got_rsi - want) < 1e-6), \
+                (resolution, bar, got_rsi, want)
+            checks += 1
+    print(f"✓ {checks:,} checkpoints matched resampling every quote (OHLCV bars and RSI 14)")
+    
+    # Cost: quotes into the base bars alone vs. with every timeframe subscribed
+    def feed(subscribe):
+        store = BarStore()
+        for resolution in subscribe:
+            store.subscribe("AAPL", resolution)
+        for bar in range(n_bars):
+            for tick in range(ticks_per_bar):
+                store.record("AAPL", 100.0 + tick, start_time + bar * store.resolution + tick, 1.0)
+    
+    quotes_fed = n_bars * ticks_per_bar
+    plain_ms = _timeit(lambda: feed(()), repeat=3)
+    rolled_ms = _timeit(lambda: feed(timeframes), repeat=3)
+    print(f"{'base bars only':>24}: {plain_ms * 1e6 / quotes_fed:>8.0f} ns per quote")
+    print(f"{'+ 4 rolled-up timeframes':>24}: {rolled_ms * 1e6 / quotes_fed:>8.0f} ns per quote "
+          f"({(rolled_ms - plain_ms) * 1e6 / n_bars:,.0f} ns per base bar close)")
+    print(f"{'upstream requests':>24}: 1 quote batch per cycle, vs. {len(timeframes) + 1} fetching each timeframe")
+
+
+# ============================================================================
+# STRATEGY CHECKING
+# ============================================================================
+
+def _price_strategies(n: int, n_tickers: int, seed: int = 3):
+    """n PRICE above/below strategies spread over n_tickers, plus their quotes"""
+    rng = random.Random(seed)
+    tickers = [f"T{i:04d}" for i in range(n_tickers)]
+    prices = {ticker: stub_price(ticker) for ticker in tickers}
+    strategies = []
+    for i in range(n):
+        ticker = tickers[rng.randrange(n_tickers)]
+        condition = Condition.ABOVE if rng.random() < 0.5 else Condition.BELOW
+        # Mostly out of the money: ~1% of rows sit on the wrong side of the quote
+        offset = prices[ticker] * rng.uniform(-0.01, 0.99)
+        threshold = prices[ticker] + offset if condition == Condition.ABOVE else prices[ticker] - offset
+        strategies.append(Strategy(i, i, ticker, StrategyType.PRICE, condition, round(threshold, 2)))
+    return strategies, prices
+
+
+def _offline_checker(prices: dict) -> StrategyChecker:
+    checker = StrategyChecker(MarketData())
+    checker.prices = dict(prices)
+    return checker
+
+
+def bench_batch(n: int = 1_000_000, n_tickers: int = 5_000):
+    """Per-strategy check() loop vs. vectorized StrategyChecker.evaluate"""
+    _header(f"BATCH CHECK: {n:,} PRICE strategies over {n_tickers:,} tickers")
+    strategies, prices = _price_strategies(n, n_tickers)
+    checker = _offline_checker(prices)
+    
+    sample = strategies[:100_000]
+    start = time.perf_counter()
+    looped = [(s, m) for s in sample for t, m in [checker.check(s)] if t]
+    loop_ms = (time.perf_counter() - start) * 1000 * n / len(sample)
+    
+    start = time.perf_counter()
+    batch = StrategyBatch(strategies)
+    build_ms = (time.perf_counter() - start) * 1000
+    
+    evaluate_ms = _timeit(lambda: checker.evaluate(batch), repeat=3)
+    fired = checker.evaluate(batch)
+    
+    extra, _ = _price_strategies(1_000, n_tickers, seed=4)
+    start = time.perf_counter()
+    for strategy in extra:
+        strategy.id += n
+        batch.strategy_added(strategy)
+    batch.flush()
+    add_ms = (time.perf_counter() - start) * 1000
+    
+    sample_ids = {s.id for s, _ in looped}
+    assert sample_ids == {s.id for s, _ in fired if s.id < len(sample)}, "batch and loop disagree"
+    print(f"{'check() loop':>22}: {loop_ms:>9.1f} ms (extrapolated from {len(sample):,})")
+    print(f"{'StrategyBatch build':>22}: {build_ms:>9.1f} ms (full reload only)")
+    print(f"{'add 1,000 strategies':>22}: {add_ms:>9.1f} ms")
+    print(f"{'evaluate()':>22}: {evaluate_ms:>9.1f} ms -> {len(fired):,} fired")
+
+
+def bench_index(n: int = 1_000_000, n_tickers: int = 5_000):
+    """Sorted threshold index vs. vectorized batch for PRICE levels"""
+    _header(f"THRESHOLD INDEX: {n:,} PRICE strategies over {n_tickers:,} tickers")
+    strategies, prices = _price_strategies(n, n_tickers)
+    checker = _offline_checker(prices)
+    
+    start = time.perf_counter()
+    index = ThresholdIndex(strategies)
+    build_ms = (time.perf_counter() - start) * 1000
+    batch = StrategyBatch(strategies)
+    empty = StrategyBatch()
+    
+    via_index = checker.evaluate(empty, index)
+    via_batch = checker.evaluate(batch)
+    assert {s.id for s, _ in via_index} == {s.id for s, _ in via_batch}, "index and batch disagree"
+    
+    index_ms = _timeit(lambda: checker.evaluate(empty, index), repeat=3)
+    batch_ms = _timeit(lambda: checker.evaluate(batch), repeat=3)
+    
+    # Fired strategies leave, and the same number of new ones arrive
+    fired = [s for s, _ in via_index]
+    start = time.perf_counter()
+    for strategy in fired:
+        index.strategy_removed(strategy)
+    for strategy in fired:
+        index.strategy_added(strategy)
+    churn_ms = (time.perf_counter() - start) * 1000
+    
+    print(f"{'index build':>24}: {build_ms:>8.1f} ms (full reload only)")
+    print(f"{'index evaluate':>24}: {index_ms:>8.1f} ms -> {len(via_index):,} fired")
+    print(f"{'batch evaluate':>24}: {batch_ms:>8.1f} ms")
+    print(f"{'remove + re-add ' + format(len(fired), ','):>24}: {churn_ms:>8.1f} ms")
+    
+    # Quiet cycle: every price drifts toward the money but nothing crosses
+    fired_ids = {s.id for s in fired}
+    index = ThresholdIndex([s for s in strategies if s.id not in fired_ids])
+    quiet_ms = _timeit(lambda: checker.evaluate(empty, index), repeat=3)
+    print(f"{'index, nothing fires':>24}: {quiet_ms:>8.1f} ms")
+
+
+def _mixed_strategies(n: int, tickers: list, seed: int = 5):
+    """n level strategies of every checkable type, with a spread of parameters"""
+    rng = random.Random(seed)
+    strategies = []
+    for i in range(n):
+        ticker = rng.choice(tickers)
+        above = rng.random() < 0.5
+        condition = Condition.ABOVE if above else Condition.BELOW
+        # Levels are mostly out of the money, as in a quiet cycle
+        sign = 1 if above else -1
+        kind = rng.randrange(4)
+        if kind == 0:
+            threshold = 100 + sign * rng.uniform(5, 40)
+            strategies.append(Strategy(i, i, ticker, StrategyType.PRICE, condition, threshold))
+        elif kind == 1:
+            threshold = 50 + sign * rng.uniform(15, 45)
+            strategies.append(Strategy(i, i, ticker, StrategyType.RSI, condition, threshold))
+        elif kind == 2:
+            params = rng.choice([{}, {'fast': 5, 'slow': 13, 'signal': 4}])
+            threshold = sign * rng.uniform(0.2, 2.0)
+            strategies.append(Strategy(i, i, ticker, StrategyType.MACD, condition, threshold, params))
+        else:
+            params = rng.choice([{'fast': 5, 'slow': 20}, {'fast': 1, 'slow': 10}])
+            strategies.append(Strategy(i, i, ticker, StrategyType.MA_CROSS, condition, None, params))
+    return strategies
+
+
+def bench_compile(n: int = 200_000, n_tickers: int = 500, n_bars: int = 60):
+    """check() dispatch vs. strategies compiled once into predicates"""
+    _header(f"COMPILED PREDICATES: {n:,} mixed strategies over {n_tickers:,} tickers")
+    market_data = MarketData()
+    tickers = [f"T{i:04d}" for i in range(n_tickers)]
+    for i, ticker in enumerate(tickers):
+        for _ in _random_walk_bars(market_data.bars, ticker, n_bars, seed=i):
+            pass
+    checker = StrategyChecker(market_data)
+    checker.prices = {ticker: market_data.bars.get(ticker).last_close for ticker in tickers}
+    strategies = _mixed_strategies(n, tickers)
+    
+    start = time.perf_counter()
+    predicates = [checker.compile(s) for s in strategies]
+    compile_ms = (time.perf_counter() - start) * 1000
+    
+    dispatched = [message for s in strategies for triggered, message in [checker.check(s)] if triggered]
+    compiled = [message for predicate in predicates for message in [predicate()] if message is not None]
+    assert dispatched == compiled, "compiled predicates disagree with check()"
+    
+    print(f"{'compile (once)':>24}: {compile_ms:>8.1f} ms -> {len(compiled):,} fire")
+    for strategy_type in (None, StrategyType.PRICE, StrategyType.RSI, StrategyType.MACD, StrategyType.MA_CROSS):
+        rows = [(s, p) for s, p in zip(strategies, predicates) if strategy_type in (None, s.type)]
+        subset = [s for s, _ in rows]
+        compiled_subset = [p for _, p in rows]
+        dispatch_ms = _timeit(lambda: [checker.check(s) for s in subset], repeat=3)
+        compiled_ms = _timeit(lambda: [predicate() for predicate in compiled_subset], repeat=3)
+        label = strategy_type.name if strategy_type else "all"
+        print(f"{label + ', check()':>24}: {dispatch_ms:>8.1f} ms")
+        print(f"{label + ', predicates':>24}: {compiled_ms:>8.1f} ms ({dispatch_ms / compiled_ms:.1f}x)")
+
+
+def bench_plan(n: int = 200_000, n_tickers: int = 500, n_bars: int = 60):
+    """Per-strategy indicator reads vs. one read per distinct (ticker, indicator, params)"""
+    _header(f"INDICATOR PLAN: {n:,} mixed strategies over {n_tickers:,} tickers")
+    market_data = MarketData()
+    tickers = [f"T{i:04d}" for i in range(n_tickers)]
+    for i, ticker in enumerate(tickers):
+        for _ in _random_walk_bars(market_data.bars, ticker, n_bars, seed=i):
+            pass
+    strategies = _mixed_strategies(n, tickers)
+    engine = market_data.indicators
+    
+    plan = IndicatorPlan(engine)
+    plan.reset(strategies)
+    keys = [key for s in strategies for key in IndicatorPlan.requirements(s)]
+    slots = [plan.slots[key] for key in keys]
+    
+    def planned_cycle():
+        plan.begin_cycle()
+        return [slot.current() for slot in slots]
+    
+    def direct():
+        return [engine.get(t, name, *params, resolution=resolution) for t, name, params, resolution in keys]
+    
+    assert planned_cycle() == direct(), "plan disagrees with direct reads"
+    stats = plan.stats
+    
+    per_strategy_ms = _timeit(direct, repeat=3)
+    plan_ms = _timeit(planned_cycle, repeat=3)
+    
+    print(f"{'stats':>24}: {stats}")
+    print(f"{'read per strategy':>24}: {per_strategy_ms:>8.1f} ms")
+    print(f"{'planned, once per key':>24}: {plan_ms:>8.1f} ms ({per_strategy_ms / plan_ms:.0f}x)")
+
+
+def bench_composite(n: int = 20_000, n_tickers: int = 5_000, n_bars: int = 60):
+    """Composite strategies: short-circuit cheap terms first vs. reading every term"""
+    _header(f"COMPOSITE: {n:,} 'price AND MACD AND RSI' strategies over {n_tickers:,} tickers")
+    market_data = MarketData()
+    tickers = [f"T{i:04d}" for i in range(n_tickers)]
+    for i, ticker in enumerate(tickers):
+        for _ in _random_walk_bars(market_data.bars, ticker, n_bars, seed=i):
+            pass
+    
+    # Expensive terms listed first; the cheap price term rejects most rows
+    rng = random.Random(9)
+    strategies = []
+    for i in range(n):
+        expression = {"all": [
+            {"type": "MACD", "condition": "above", "parameters": {"fast": rng.choice([5, 8, 12]), "slow": 26}},
+            {"type": "RSI", "condition": "below", "threshold": 70},
+            {"type": "PRICE", "condition": "below", "threshold": round(rng.uniform(50, 100), 2)},
+        ]}
+        strategies.append(Strategy(i, i, rng.choice(tickers), StrategyType.COMPOSITE, Condition.UNKNOWN,
+                                   None, {"expression": expression}))
+    
+    checker = StrategyChecker(market_data)
+    checker.prices = {ticker: market_data.bars.get(ticker).last_close for ticker in tickers}
+    checker.plan.reset(strategies)
+    predicates = [checker.compile(s) for s in strategies]
+    
+    def cycle():
+        stats = checker.plan.begin_cycle()
+        return [p() for p in predicates], stats
+    
+    def every_term():
+        stats = checker.plan.begin_cycle()
+        for slot in checker.plan.slots.values():
+            slot.current()
+        return [p() for p in predicates], stats
+    
+    (fired, stats), (expected, all_stats) = cycle(), every_term()
+    assert fired == expected, "short-circuit changed the outcome"
+    
+    print(f"{'short-circuit':>24}: {_timeit(lambda: cycle(), repeat=3):>8.1f} ms, {stats}")
+    print(f"{'every term':>24}: {_timeit(lambda: every_term(), repeat=3):>8.1f} ms, {all_stats}")
+    print(f"{'fired':>24}: {sum(m is not None for m in fired):,}")
+
+
+def bench_volume(n: int = 100_000, n_tickers: int = 5_000, days: int = 25, quotes_per_day: int = 8):
+    """Session volume and relative-volume baselines: rolling window vs. re-averaging every day"""
+    _header(f"VOLUME: {n:,} strategies over {n_tickers:,} tickers, {days} sessions")
+    tracker = VolumeTracker()
+    tickers = [f"T{i:04d}" for i in range(n_tickers)]
+    rng = random.Random(19)
+    calendar = ExchangeCalendar()
+    opens = [1_767_621_600.0]  # A Monday 09:30 New York, then the following sessions
+    while len(opens) < days:
+        opens.append(calendar.session(calendar.session(opens[-1])[1])[0])
+    history = {ticker: [] for ticker in tickers}
+    
+    start = time.perf_counter()
+    for day in range(days):
+        for step in range(1, quotes_per_day + 1):
+            timestamp = opens[day] + step * 2700
+            for i, ticker in enumerate(tickers):
+                tracker.record(ticker, (i + day + 1) * 1000 * step, timestamp)
+        for i, ticker in enumerate(tickers):
+            history[ticker].append((i + day + 1) * 1000 * quotes_per_day)
+    elapsed = time.perf_counter() - start
+    records = days * quotes_per_day * n_tickers
+    print(f"{'record()':>24}: {elapsed * 1e9 / records:>8.0f} ns per quote ({records:,} quotes)")
+    
+    # Reference: average the closed sessions from scratch
+    def rescan():
+        return {t: sum(h[-tracker.days - 1:-1]) / tracker.days for t, h in history.items()}
+    expected = rescan()
+    assert all(abs(tracker.average_volume(t) - expected[t]) < 1e-6 for t in tickers), "baseline drifted"
+    print(f"{'rescan history':>24}: {_timeit(rescan, repeat=3):>8.1f} ms")
+    print(f"{'rolling window':>24}: {_timeit(lambda: [tracker.average_volume(t) for t in tickers], repeat=3):>8.1f} ms")
+    
+    market_data = MarketData()
+    market_data.volumes = tracker
+    strategies = [
+        Strategy(i, i, rng.choice(tickers), StrategyType.VOLUME, rng.choice([Condition.ABOVE, Condition.BELOW]),
+                 round(rng.uniform(0.5, 5), 2), {"relative": True}) if i % 2 else
+        Strategy(i, i, rng.choice(tickers), StrategyType.VOLUME, rng.choice([Condition.ABOVE, Condition.BELOW]),
+                 rng.randrange(1_000_000, 400_000_000), None)
+        for i in range(n)
+    ]
+    checker = StrategyChecker(market_data)
+    batch = StrategyBatch()
+    batch.reset(strategies)
+    fired = checker.evaluate(batch)
+    expected_ids = sorted(s.id for s in strategies if checker.check(s)[0])
+    assert sorted(s.id for s, _ in fired) == expected_ids, "batch disagrees with check()"
+    print(f"{'check() loop':>24}: {_timeit(lambda: [checker.check(s) for s in strategies], repeat=3):>8.1f} ms")
+    print(f"{'evaluate()':>24}: {_timeit(lambda: checker.evaluate(batch), repeat=3):>8.1f} ms -> {len(fired):,} fired")
+
+
+# ============================================================================
+# STREAMING
+# ============================================================================
+
+def bench_stream(n_tickers: int = 1_000, per_ticker: int = 20, n_ticks: int = 20_000, rate: float = 5_000):
+    """Tick-to-alert latency in streaming mode, end to end through a local socket"""
+    _header(f"STREAMING: {n_tickers * per_ticker:,} strategies over {n_tickers:,} tickers, "
+            f"{n_ticks:,} ticks at {rate:,.0f}/s")
+    rng = random.Random(21)
+    tickers = [f"T{i:04d}" for i in range(n_tickers)]
+    rows = []
+    for ticker in tickers:
+        for i in range(per_ticker):
+            kind = i % 4
+            if kind == 0:
+                row = ('PRICE', 'above', round(rng.uniform(100.5, 103), 2), {})
+            elif kind == 1:
+                row = ('PRICE', 'below', round(rng.uniform(97, 99.5), 2), {})
+            elif kind == 2:
+                row = ('PRICE', 'crosses_above', round(rng.uniform(100.2, 102), 2), {})
+            else:
+                row = ('COMPOSITE', 'all', None, {"expression": {"all": [
+                    {"type": "PRICE", "condition": "above", "threshold": round(rng.uniform(100.5, 103), 2)},
+                    {"type": "RSI", "condition": "below", "threshold": 101}]}})
+            rows.append((ticker,) + row)
+    
+    prices = {ticker: 100.0 for ticker in tickers}
+    ticks = []
+    for _ in range(n_ticks):
+        ticker = rng.choice(tickers)
+        prices[ticker] *= 1 + rng.gauss(0, 0.004)
+        ticks.append((ticker, round(prices[ticker], 4), None))
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        system = TradingAlertSystem(os.path.join(tmp, 'stream.db'))
+        system.alerts.send_alert = lambda email, phone, message: None  # No mail from benchmarks
+        user_id = system.db.add_user("bench@example.com", plan=Plan.PRO)  # Free strategies are checked hourly
+        with system.db.pool.connection() as conn, conn:
+            conn.executemany(SQL_INSERT_STRATEGY, [
+                (user_id, ticker, strategy_type, condition, threshold, json.dumps(params), None)
+                for ticker, strategy_type, condition, threshold, params in rows
+            ])
+        
+        with StubStreamServer() as server:
+            server.replay(ticks, rate)
+            source = JsonLinesQuoteStream(port=server.port)
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                asyncio.run(system.stream(source, max_ticks=n_ticks))
+            elapsed = time.perf_counter() - start
+        stats = system.stream_stats
+        handled = stats.ticks
+        with system.db.pool.connection() as conn:
+            recorded = conn.execute('SELECT COUNT(*) FROM alerts').fetchone()[0]
+        
+        # Per-tick work alone, without the socket
+        tick_ms = _timeit(lambda: [system.on_tick(Tick(ticker, price)) for ticker, price, _ in ticks[:2000]],
+                          repeat=1) / 2000
+    
+    print(f"{'ticks handled':>24}: {handled:,} in {elapsed:.2f} s ({handled / elapsed:,.0f}/s)")
+    print(f"{'alerts':>24}: {stats.alerts:,} ({recorded:,} recorded)")
+    print(f"{'tick-to-alert p50':>24}: {stats.percentile(0.5) * 1000:>8.2f} ms")
+    print(f"{'tick-to-alert p99':>24}: {stats.percentile(0.99) * 1000:>8.2f} ms")
+    print(f"{'work per tick':>24}: {tick_ms * 1000:>8.1f} us")
+    print(f"{'polling, for comparison':>24}: up to {Config.CHECK_INTERVAL} s + cycle "
+          f"(mean {Config.CHECK_INTERVAL / 2:.0f} s)")
+
+
+# ============================================================================
+# SCHEDULING
+# ============================================================================
+
+class FakeClock:
+    """Simulated monotonic clock: sleeping and working just advance it"""
+    
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self) -> float:
+        return self.now
+    
+    def sleep(self, seconds: float):
+        self.now += seconds
+
+
+def bench_schedule(n_cycles: int = 1_440, interval: float = 60.0, dispatch: float = 4.0):
+    """Sleep-after-cycle vs. deadline scheduling over a simulated day of slowly growing cycles"""
+    _header(f"SCHEDULE: {n_cycles:,} cycles every {interval:.0f} s, alerts take {dispatch:.0f} s to send")
+    rng = random.Random(22)
+    # Fetch + evaluate grows with the strategy count; every 100th cycle stalls
+    fetch = [5 + 30 * i / n_cycles + rng.uniform(0, 3) + (90 if i % 100 == 99 else 0) for i in range(n_cycles)]
+    
+    # Old loop: cycle (dispatch inline), then sleep a full interval
+    clock = FakeClock()
+    starts = []
+    for seconds in fetch:
+        starts.append(clock())
+        clock.sleep(seconds + dispatch)
+        clock.sleep(interval)
+    drift = starts[-1] - (n_cycles - 1) * interval
+    period = (starts[-1] - starts[0]) / (n_cycles - 1)
+    print(f"{'sleep after cycle':>24}: mean period {period:6.1f} s, last cycle {drift / 60:6.1f} min late")
+    
+    # Deadline grid, dispatch overlapped with the next cycle
+    for catch_up in (True, False):
+        clock = FakeClock()
+        scheduler = CycleScheduler(interval, catch_up=catch_up, clock=clock, sleep=clock.sleep)
+        starts = []
+        work = iter(fetch)
+        
+        def job():
+            starts.append(clock())
+            clock.sleep(next(work))
+        
+        scheduler.run(job, cycles=n_cycles)
+        stats = scheduler.stats
+        if not catch_up:
+            assert all(abs(t - round(t / interval) * interval) < 1e-6 for t in starts), "cycle left the grid"
+        label = "deadlines, merge" if catch_up else "deadlines, skip"
+        print(f"{label:>24}: mean period {(starts[-1] - starts[0]) / (n_cycles - 1):6.1f} s, "
+              f"last cycle {stats.last_lag:6.1f} s late, {stats.overruns} overruns, {stats.skipped} skipped, "
+              f"max lag {stats.max_lag:.1f} s")
+
+
+def bench_polling(n_tickers: int = 2_000, levels_per_ticker: int = 3, n_cycles: int = 390, interval: float = 60.0):
+    """Adaptive polling vs. quoting every ticker every cycle over a simulated session of random walks"""
+    _header(f"POLLING: {n_tickers:,} tickers x {levels_per_ticker} PRICE levels, {n_cycles} cycles of {interval:.0f} s")
+    rng = np.random.default_rng(23)
+    tickers = [f"T{i:04d}" for i in range(n_tickers)]
+    # 20-80% annualized volatility as per-second log-return deviation
+    sigma = rng.uniform(0.2, 0.8, n_tickers) / np.sqrt(252 * 6.5 * 3600)
+    steps = rng.standard_normal((n_cycles, n_tickers)) * sigma * np.sqrt(interval)
+    paths = 100 * np.exp(np.cumsum(steps, axis=0))
+    
+    strategies = []
+    for i, ticker in enumerate(tickers):
+        for _ in range(levels_per_ticker):
+            distance = rng.uniform(0.002, 0.15)
+            above = rng.random() < 0.5
+            strategies.append(Strategy(len(strategies), 0, ticker, StrategyType.PRICE,
+                                       Condition.ABOVE if above else Condition.BELOW,
+                                       round(100 * (1 + distance if above else 1 - distance), 2), None))
+    
+    def run(adaptive: bool):
+        clock = FakeClock()
+        bars = BarStore()
+        poller = AdaptivePoller(bars, interval, clock=clock)
+        poller.reset(strategies)
+        live = {ticker: [] for ticker in tickers}
+        for strategy in strategies:
+            live[strategy.ticker].append(strategy)
+        fired_at, fetches = {}, 0
+        for cycle in range(n_cycles):
+            clock.now = 1_767_621_600.0 + cycle * interval
+            due = poller.due(batch_size=100) if adaptive else tickers
+            prices = {ticker: float(paths[cycle, int(ticker[1:])]) for ticker in due}
+            fetches += len(due)
+            for ticker, price in prices.items():
+                bars.record(ticker, price, clock.now)
+                for strategy in [s for s in live[ticker]
+                                 if (price > s.threshold if s.condition == Condition.ABOVE else price < s.threshold)]:
+                    fired_at[strategy.id] = cycle
+                    live[ticker].remove(strategy)
+                    poller.strategy_removed(strategy)
+            poller.observe(prices)
+        return fired_at, fetches, poller.total_stats
+    
+    every, every_fetches, _ = run(adaptive=False)
+    start = time.perf_counter()
+    adaptive, adaptive_fetches, stats = run(adaptive=True)
+    elapsed = time.perf_counter() - start
+    
+    missed = len(set(every) - set(adaptive))
+    late = [adaptive[i] - every[i] for i in adaptive if i in every]
+    print(f"{'every ticker, every cycle':>26}: {every_fetches:>9,} quotes, {len(every):,} alerts")
+    print(f"{'adaptive':>26}: {adaptive_fetches:>9,} quotes, {len(adaptive):,} alerts "
+          f"({1 - adaptive_fetches / every_fetches:.0%} fewer quotes)")
+    print(f"{'':>26}  {stats}")
+    print(f"{'':>26}  {missed} alerts missed, {sum(1 for d in late if d)} late "
+          f"(max {max(late, default=0)} cycles)")
+    print(f"{'planning overhead':>26}: {elapsed / n_cycles * 1000:>8.2f} ms per cycle (simulation included)")
+
+
+# ============================================================================
+# PLAN TIERS
+# ============================================================================
+
+def bench_tiers(n_free: int = 50_000, n_pro: int = 2_000, n_tickers: int = 2_000, n_cycles: int = 5,
+                latency: float = 0.02):
+    """Pro alert latency and upstream load: one queue for every tier vs. Pro fast path + hourly Free batch"""
+    _header(f"TIERS: {n_pro:,} Pro + {n_free:,} Free strategies over {n_tickers:,} tickers, "
+            f"{n_cycles} cycles, {latency * 1000:.0f}ms server latency")
+    rng = random.Random(24)
+    tickers = [f"T{i:04d}" for i in range(n_tickers)]
+    pro_tickers = tickers[:n_tickers // 10]
+    
+    def rows(n: int, universe: list):
+        # One in ten sits just below the stub price, so it fires on the first check
+        for i in range(n):
+            ticker = rng.choice(universe)
+            price = stub_price(ticker)
+            yield ticker, price * (0.99 if i % 10 == 0 else rng.uniform(1.05, 1.5))
+    
+    print(f"{'queues':>26} {'requests':>9} {'Pro alerts out (p50)':>21} {'1st cycle':>10} {'later cycles':>13}")
+    for label, intervals in (("one for all tiers", {"free": None, "pro": None, "enterprise": None}),
+                             ("Pro fast path, Free hourly", Config.PLAN_CHECK_INTERVALS)):
+        with tempfile.TemporaryDirectory() as tmp, StubQuoteServer(latency) as server:
+            with contextlib.redirect_stdout(io.StringIO()):
+                system = TradingAlertSystem(os.path.join(tmp, 'tiers.db'), plan_intervals=intervals)
+            system.alerts.send_alert = lambda email, phone, message: None  # No mail from benchmarks
+            system.market_data = system.checker.market_data = _stub_market_data(server)
+            system.poller = None  # Quote every ticker, to isolate the effect of the queues
+            for plan, n, universe in ((Plan.FREE, n_free, tickers), (Plan.PRO, n_pro, pro_tickers)):
+                user_id = system.db.add_user(f"{plan.name.lower()}@example.com", plan=plan)
+                with system.db.pool.connection() as conn, conn:
+                    conn.executemany(SQL_INSERT_STRATEGY, [
+                        (user_id, ticker, 'PRICE', 'ABOVE', round(threshold, 2), '{}', None)
+                        for ticker, threshold in rows(n, universe)
+                    ])
+            
+            dispatcher = AlertDispatcher(system.db, lambda fired, details: None, system.registry)
+            dispatcher.start()
+            durations = []
+            with contextlib.redirect_stdout(io.StringIO()):
+                for _ in range(n_cycles):
+                    system.market_data.cache = QuoteCache()  # Cycles are a minute apart in real life
+                    start = time.perf_counter()
+                    system.monitor_once(dispatcher)
+                    durations.append(time.perf_counter() - start)
+            dispatcher.close()
+        
+        pro = next(queue for queue in system.queues if Plan.PRO in queue.plans)
+        later = durations[1:] or durations
+        print(f"{label:>26} {server.request_count:>9,} {pro.stats.percentile(0.5) * 1000:>18.0f} ms "
+              f"{durations[0] * 1000:>7.0f} ms {sum(later) / len(later) * 1000:>10.0f} ms")
+        for queue in system.queues:
+            print(f"{'':>26}   {queue.name}: {queue.stats}")
+
+
+# ============================================================================
+# MARKET HOURS
+# ============================================================================
+
+def bench_calendar(n_equities: int = 1_900, n_crypto: int = 100, interval: float = 60.0):
+    """Upstream quote requests over a simulated week (Thanksgiving 2026), 24/7 vs. skipping closed venues"""
+    _header(f"CALENDAR: {n_equities:,} equities + {n_crypto:,} crypto tickers, "
+            f"a week of {interval:.0f} s cycles (Thanksgiving 2026)")
+    tickers = [f"T{i:04d}" for i in range(n_equities)] + [f"C{i:03d}-USD" for i in range(n_crypto)]
+    calendar = MarketCalendar()
+    assert sum(SymbolClass.of(ticker) == SymbolClass.CRYPTO for ticker in tickers) == n_crypto
+    batch_size = MarketData.YAHOO_BATCH_SIZE
+    
+    def requests_for(n: int) -> int:
+        return (n + batch_size - 1) // batch_size
+    
+    start = datetime(2026, 11, 23, tzinfo=ZoneInfo(Config.MARKET_TIMEZONE)).timestamp()
+    n_cycles = int(7 * 86400 / interval)
+    always = aware = aware_off_hours = always_off_hours = 0
+    open_cycles = 0
+    was_closed = set()
+    elapsed = 0.0
+    for i in range(n_cycles):
+        now = start + i * interval
+        t0 = time.perf_counter()
+        closed = calendar.closed(tickers, now)
+        elapsed += time.perf_counter() - t0
+        # Open tickers are quoted every cycle; a newly closed one once more, for its last close
+        quoted = len(tickers) - len(closed) + len(closed - was_closed)
+        was_closed = closed
+        always += requests_for(len(tickers))
+        aware += requests_for(quoted)
+        if closed:
+            always_off_hours += requests_for(len(tickers))
+            aware_off_hours += requests_for(quoted)
+        else:
+            open_cycles += 1
+    
+    print(f"{'equity sessions':>24}: {open_cycles:,} of {n_cycles:,} cycles "
+          f"({open_cycles * interval / 3600:.1f} h, Thanksgiving closed)")
+    print(f"{'quoted around the clock':>24}: {always:>9,} requests ({always_off_hours:,} off-hours)")
+    print(f"{'closed venues skipped':>24}: {aware:>9,} requests ({aware_off_hours:,} off-hours, "
+          f"{1 - aware_off_hours / always_off_hours:.0%} fewer; {1 - aware / always:.0%} fewer overall)")
+    print(f"{'calendar lookup':>24}: {elapsed / n_cycles * 1000:>9.3f} ms per cycle")
+
+
+# ============================================================================
+# RUN
+# ============================================================================
+
+BENCHMARKS = {
+    'db': bench_db,
+    'quotes': bench_quotes,
+    'http': bench_http,
+    'concurrency': bench_concurrency,
+    'indicators': bench_indicators,
+    'timeframes': bench_timeframes,
+    'batch': bench_batch,
+    'index': bench_index,
+    'compile': bench_compile,
+    'plan': bench_plan,
+    'composite': bench_composite,
+    'volume': bench_volume,
+    'stream': bench_stream,
+    'schedule': bench_schedule,
+    'polling': bench_polling,
+    'tiers': bench_tiers,
+    'calendar': bench_calendar,
+}
+
+
+def main(names):
+    for name in names or BENCHMARKS:
+        BENCHMARKS[name]()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -10,13 +10,27 @@ This is the full production-ready system that:
 To run: python complete_trading_system.py
 """
 
+import os
+import sys
+import re
 import json
+import asyncio
+import operator
+import bisect
 import time
+import queue
 import sqlite3
-from datetime import datetime
-from typing import Dict, List, Optional
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from enum import IntEnum
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, NamedTuple, Optional, Protocol
+from zoneinfo import ZoneInfo
+import numpy as np
 import requests
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 
 # ============================================================================
@@ -34,6 +48,12 @@ class Config:
     # Or use free Yahoo Finance (less reliable but free)
     USE_FREE_DATA = True  # Set to False when you have Polygon key
     
+    # Market data endpoints (override to point at a local stub server)
+    YAHOO_API_URL = "https://query1.finance.yahoo.com"
+    YAHOO_COOKIE_URL = "https://fc.yahoo.com"  # Sets the session cookie Yahoo's crumb is issued for
+    YAHOO_USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+    POLYGON_API_URL = "https://api.polygon.io"
+    
     # Email settings (for alerts)
     SMTP_SERVER = "smtp.gmail.com"
     SMTP_PORT = 587
@@ -42,123 +62,577 @@ class Config:
     
     # System settings
     CHECK_INTERVAL = 60  # Check market every 60 seconds
+    SCHEDULE_CATCH_UP = True  # After an overrun, run one merged catch-up cycle at once (False: wait for the next slot)
+    
+    # Adaptive polling (skip quotes for tickers whose price levels are far off)
+    ADAPTIVE_POLLING = True
+    POLL_MAX_STALENESS = 600  # Seconds a ticker may go without a fresh quote
+    POLL_SIGMAS = 5.0  # A level is "reachable" within this many standard deviations of movement
+    POLL_VOLATILITY_BARS = 30  # Recent base bars the volatility estimate uses
+    POLL_MIN_RETURNS = 5  # Fewer bar-to-bar moves than this and the ticker is polled every cycle
+    
+    # Streaming mode (quotes pushed instead of polled)
+    POLYGON_STREAM_URL = "wss://socket.polygon.io/stocks"
+    STREAM_SYNC_INTERVAL = 5  # Seconds between picking up new strategies (and subscribing their tickers)
+    STREAM_RECONNECT_DELAY = 1.0  # Seconds before reconnecting a dropped stream
+    
+    # Recording triggered alerts (see AlertDispatcher)
+    ALERT_RETRY_DELAY = 0.5  # Seconds before retrying a batch that failed to commit, doubling each time
+    ALERT_RETRY_MAX_DELAY = 30.0
+    ALERT_RETRIES_ON_CLOSE = 5  # Attempts left once stopping; what still fails stays pending in the database
     DATABASE_FILE = "trading_alerts.db"
+    
+    # Database connection pool (shared by the monitor and the web apps)
+    DB_POOL_SIZE = 8  # Max open connections per database file
+    DB_BUSY_TIMEOUT = 5.0  # Seconds to wait on a locked database
+    DB_STATEMENT_CACHE = 256  # Prepared statements kept per connection
+    CHANGE_LOG_PRUNE_ROWS = 10000  # Strategy change-log entries a monitor reads past before pruning them
+    
+    # Outbound HTTP (market data + AI parser)
+    HTTP_POOL_SIZE = 10  # Keep-alive connections kept per host
+    HTTP_MAX_HOSTS = 8  # Hosts with a connection pool
+    HTTP_CONNECT_TIMEOUT = 3.05  # Seconds to establish a connection
+    HTTP_READ_TIMEOUT = 10  # Seconds to wait for response data
+    
+    # Market data fetching
+    CONCURRENT_FETCH = True  # Fetch quote batches in parallel
+    FETCH_CONCURRENCY = 8  # Max in-flight quote requests
+    QUOTE_DEADLINE = 15.0  # Seconds a cycle waits for quotes before skipping stragglers
+    RATE_LIMITS = {  # Requests per second (sustained, burst) per provider
+        "yahoo": (20, 20),
+        "polygon": (100, 100),
+    }
+    QUOTE_TTL = {  # Seconds a cached quote stays fresh, per provider
+        "yahoo": 15,
+        "polygon": 5,
+    }
+    QUOTE_CACHE_SIZE = 10000  # Max tickers cached (least recently used are evicted)
+    
+    # Price history kept in memory per ticker
+    BAR_RESOLUTION = 60  # Seconds per base bar
+    BAR_CAPACITY = 500  # Bars kept per ticker and resolution (oldest are overwritten)
+    BAR_TIMEFRAMES = {  # Strategy "timeframe" parameter -> seconds per bar, rolled up from the base bars
+        "1m": 60,
+        "5m": 300,
+        "15m": 900,
+        "1h": 3600,
+        "1d": 86400,  # One bar per session day (midnight to midnight in MARKET_TIMEZONE)
+    }
+    
+    # Volume
+    VOLUME_BASELINE_DAYS = 20  # Sessions in the rolling average-volume baseline
+    MARKET_TIMEZONE = "America/New_York"  # Sessions roll over at midnight here
+    
+    # Market hours (offline trading calendars per symbol class, see MarketCalendar)
+    MARKET_HOURS = True  # Don't fetch or check tickers whose venue is closed
+    EQUITY_SESSION = ("09:30", "16:00")  # Regular session in MARKET_TIMEZONE, NYSE holidays excluded
+    CRYPTO_QUOTE_CURRENCIES = ("USD", "USDT", "USDC", "EUR", "GBP", "BTC", "ETH")  # BTC-USD etc. trade 24/7
+    
+    # Plan tiers (as sold on /pricing): seconds between checks, None = every monitor cycle
+    PLAN_CHECK_INTERVALS = {
+        "free": 3600,  # Hourly price checks
+        "pro": None,  # Real-time monitoring
+        "enterprise": None,
+    }
+
+
+# ============================================================================
+# STRATEGY MODEL
+# ============================================================================
+
+class StrategyType(IntEnum):
+    """Indicator a strategy watches (stored as text, held as a small int)"""
+    UNKNOWN = 0
+    PRICE = 1
+    RSI = 2
+    MA_CROSS = 3
+    VOLUME = 4
+    MACD = 5
+    COMPOSITE = 6  # Expression tree of level conditions in `parameters`
+    
+    @classmethod
+    def parse(cls, name: Optional[str]) -> "StrategyType":
+        return cls.__members__.get(str(name).upper(), cls.UNKNOWN)
+
+
+class Condition(IntEnum):
+    """Comparison a strategy applies to its indicator"""
+    UNKNOWN = 0
+    ABOVE = 1
+    BELOW = 2
+    CROSSES_ABOVE = 3
+    CROSSES_BELOW = 4
+    
+    @classmethod
+    def parse(cls, name: Optional[str]) -> "Condition":
+        return cls.__members__.get(str(name).upper(), cls.UNKNOWN)
+
+
+class Plan(IntEnum):
+    """Subscription tier of a strategy's owner (users.plan, stored as text)"""
+    FREE = 0
+    PRO = 1
+    ENTERPRISE = 2
+    
+    @classmethod
+    def parse(cls, name: Optional[str]) -> "Plan":
+        return cls.__members__.get(str(name).upper(), cls.FREE)
+
+
+class Strategy:
+    """
+    Compact resident record of an active strategy
+    
+    Only the fields the checker needs are kept; tickers are interned so the
+    thousands of strategies on one symbol share a single string, and cold
+    text (description, email, phone) is fetched only when an alert fires.
+    """
+    
+    __slots__ = ('id', 'user_id', 'ticker', 'type', 'condition', 'threshold', 'parameters', 'plan')
+    
+    def __init__(self, id: int, user_id: int, ticker: str, type: StrategyType,
+                 condition: Condition, threshold: Optional[float], parameters: Optional[Dict] = None,
+                 plan: Plan = Plan.FREE):
+        self.id = id
+        self.user_id = user_id
+        self.ticker = sys.intern(ticker)
+        self.type = type
+        self.condition = condition
+        self.threshold = threshold
+        self.parameters = parameters or None  # Most strategies have none
+        self.plan = plan  # The owner's, so the monitor can queue by tier
+    
+    @classmethod
+    def from_row(cls, row) -> "Strategy":
+        """Build from an (id, user_id, ticker, strategy_type, condition, threshold, parameters, plan) row"""
+        id, user_id, ticker, strategy_type, condition, threshold, parameters, plan = row
+        return cls(
+            id, user_id, ticker,
+            StrategyType.parse(strategy_type),
+            Condition.parse(condition),
+            threshold,
+            json.loads(parameters) if parameters and parameters != '{}' else None,
+            Plan.parse(plan)
+        )
+    
+    def __repr__(self) -> str:
+        return (f"Strategy(#{self.id} {self.ticker} {self.type.name} "
+                f"{self.condition.name.lower()} {self.threshold})")
+
+
+# A COMPOSITE strategy keeps its logic in parameters['expression']: either a
+# group {"all": [...]} / {"any": [...]} of sub-expressions, or a term shaped
+# like a single strategy - {"type": "RSI", "condition": "below",
+# "threshold": 30, "parameters": {...}}, with an optional "ticker" that
+# defaults to the strategy's own.
+COMPOSITE_GROUPS = ('all', 'any')
+
+
+def composite_terms(strategy: Strategy) -> List[tuple]:
+    """(ticker, type, parameters) of every term in a composite strategy"""
+    terms = []
+    pending = [(strategy.parameters or {}).get('expression') or {}]
+    while pending:
+        node = pending.pop()
+        if not isinstance(node, dict):
+            continue
+        group = next((node[g] for g in COMPOSITE_GROUPS if g in node), None)
+        if group is not None:
+            pending.extend(group)
+        else:
+            terms.append((sys.intern(node.get('ticker') or strategy.ticker),
+                          StrategyType.parse(node.get('type')), node.get('parameters') or {}))
+    return terms
 
 
 # ============================================================================
 # DATABASE SETUP
 # ============================================================================
 
+class ConnectionPool:
+    """
+    Small pool of long-lived SQLite connections
+    
+    Connections are opened lazily (up to `size`), switched to WAL journaling
+    so readers never block on the writer, and handed out LIFO so the warmest
+    connection - and its prepared statement cache - is reused first.
+    """
+    
+    PRAGMAS = (
+        "PRAGMA journal_mode = WAL",
+        "PRAGMA synchronous = NORMAL",  # Durable at checkpoint, no fsync per commit
+        "PRAGMA temp_store = MEMORY",
+        "PRAGMA cache_size = -16000",  # ~16MB page cache per connection
+        "PRAGMA mmap_size = 134217728",
+    )
+    
+    def __init__(self, db_file: str, size: int = Config.DB_POOL_SIZE):
+        self.db_file = db_file
+        self.size = size
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._opened = 0
+    
+    def _open(self) -> sqlite3.Connection:
+        """Open and tune a new connection"""
+        conn = sqlite3.connect(
+            self.db_file,
+            timeout=Config.DB_BUSY_TIMEOUT,
+            check_same_thread=False,
+            cached_statements=Config.DB_STATEMENT_CACHE
+        )
+        conn.row_factory = sqlite3.Row
+        for pragma in self.PRAGMAS:
+            conn.execute(pragma)
+        return conn
+    
+    def acquire(self) -> sqlite3.Connection:
+        """Check a connection out of the pool, opening one if allowed"""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        
+        with self._lock:
+            if self._opened < self.size:
+                self._opened += 1
+                try:
+                    return self._open()
+                except Exception:
+                    self._opened -= 1
+                    raise
+        
+        try:
+            return self._idle.get(timeout=Config.DB_BUSY_TIMEOUT)
+        except queue.Empty:
+            # Same error as a busy database, so callers handling sqlite3.Error cover it
+            raise sqlite3.OperationalError("connection pool exhausted") from None
+    
+    def release(self, conn: sqlite3.Connection):
+        """Return a connection to the pool"""
+        if conn.in_transaction:
+            # Never hand a half-finished transaction to the next caller
+            conn.rollback()
+        self._idle.put(conn)
+    
+    @contextmanager
+    def connection(self):
+        """Borrow a connection for the duration of a `with` block"""
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+    
+    def close_all(self):
+        """Close every idle connection"""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._lock:
+                self._opened -= 1
+
+
+_pools: Dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_file: str = Config.DATABASE_FILE) -> ConnectionPool:
+    """Get the process-wide connection pool for a database file"""
+    key = os.path.abspath(db_file)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = ConnectionPool(key)
+        return pool
+
+
+# Schema migrations, applied in order and recorded in PRAGMA user_version.
+# Append new entries - never edit one that has already shipped.
+MIGRATIONS = [
+    (1, "Base schema", [
+        '''
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            email TEXT UNIQUE NOT NULL,
+            phone TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS strategies (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            ticker TEXT NOT NULL,
+            strategy_type TEXT NOT NULL,
+            condition TEXT NOT NULL,
+            threshold REAL,
+            parameters TEXT,
+            raw_description TEXT,
+            active INTEGER DEFAULT 1,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            triggered_at TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users (id)
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS alerts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            strategy_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            message TEXT NOT NULL,
+            sent_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (strategy_id) REFERENCES strategies (id),
+            FOREIGN KEY (user_id) REFERENCES users (id)
+        )
+        ''',
+    ]),
+    (2, "Indexes for the monitor's hot queries", [
+        # Partial index: only rows the monitor still has to check
+        '''
+        CREATE INDEX IF NOT EXISTS idx_strategies_pending
+        ON strategies (id) WHERE active = 1 AND triggered_at IS NULL
+        ''',
+        'CREATE INDEX IF NOT EXISTS idx_strategies_ticker ON strategies (ticker)',
+        'CREATE INDEX IF NOT EXISTS idx_strategies_user ON strategies (user_id)',
+        'CREATE INDEX IF NOT EXISTS idx_alerts_strategy_sent ON alerts (strategy_id, sent_at)',
+        'ANALYZE',
+    ]),
+    (3, "Strategy change log for incremental reloads", [
+        # Every write to a strategy - from any process - appends its id here,
+        # so monitors can follow changes with a cheap `seq > cursor` scan
+        '''
+        CREATE TABLE IF NOT EXISTS strategy_changes (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            strategy_id INTEGER NOT NULL
+        )
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_strategies_insert AFTER INSERT ON strategies
+        BEGIN
+            INSERT INTO strategy_changes (strategy_id) VALUES (NEW.id);
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_strategies_update AFTER UPDATE ON strategies
+        BEGIN
+            INSERT INTO strategy_changes (strategy_id) VALUES (NEW.id);
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_strategies_delete AFTER DELETE ON strategies
+        BEGIN
+            INSERT INTO strategy_changes (strategy_id) VALUES (OLD.id);
+        END
+        ''',
+    ]),
+    (4, "Last observed side of each crossing strategy", [
+        # Kept out of `strategies` so state writes don't feed the change log
+        '''
+        CREATE TABLE IF NOT EXISTS strategy_state (
+            strategy_id INTEGER PRIMARY KEY,
+            last_value REAL NOT NULL,
+            side INTEGER NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (strategy_id) REFERENCES strategies (id)
+        )
+        ''',
+    ]),
+    (5, "Plan tier per user", [
+        "ALTER TABLE users ADD COLUMN plan TEXT NOT NULL DEFAULT 'free'",
+        # A plan change re-logs the user's strategies, so monitors re-read
+        # them and move them to their new tier's queue
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_users_plan AFTER UPDATE OF plan ON users
+        WHEN NEW.plan IS NOT OLD.plan
+        BEGIN
+            INSERT INTO strategy_changes (strategy_id)
+            SELECT id FROM strategies WHERE user_id = NEW.id;
+        END
+        ''',
+    ]),
+    (6, "Latest quotes published by the monitor", [
+        '''
+        CREATE TABLE IF NOT EXISTS quotes (
+            ticker TEXT PRIMARY KEY,
+            price REAL NOT NULL,
+            updated_at REAL NOT NULL
+        )
+        ''',
+    ]),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """
+    Bring a database up to SCHEMA_VERSION
+    
+    Each migration runs in its own IMMEDIATE transaction, so concurrent
+    processes (monitor + web workers) starting together apply it only once.
+    Returns the resulting schema version.
+    """
+    for version, description, statements in MIGRATIONS:
+        if conn.execute('PRAGMA user_version').fetchone()[0] >= version:
+            continue
+        
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            # Re-check under the write lock - another process may have won
+            if conn.execute('PRAGMA user_version').fetchone()[0] < version:
+                for statement in statements:
+                    conn.execute(statement)
+                conn.execute(f'PRAGMA user_version = {version}')
+                print(f"✓ Applied migration {version}: {description}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+# Statement text is kept constant so every pooled connection's statement
+# cache can reuse the prepared form instead of recompiling it per call
+SQL_INSERT_USER = 'INSERT INTO users (email, phone, plan) VALUES (?, ?, ?)'
+
+SQL_SELECT_USER_ID = 'SELECT id FROM users WHERE email = ?'
+
+SQL_SET_USER_PLAN = 'UPDATE users SET plan = ? WHERE email = ?'
+
+SQL_UPSERT_QUOTE = '''
+    INSERT INTO quotes (ticker, price, updated_at) VALUES (?, ?, ?)
+    ON CONFLICT(ticker) DO UPDATE SET price = excluded.price, updated_at = excluded.updated_at
+    WHERE excluded.updated_at >= quotes.updated_at
+'''
+
+SQL_SELECT_QUOTE = 'SELECT price, updated_at FROM quotes WHERE ticker = ?'
+
+SQL_INSERT_STRATEGY = '''
+    INSERT INTO strategies 
+    (user_id, ticker, strategy_type, condition, threshold, parameters, raw_description)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+'''
+
+SQL_SELECT_ACTIVE_STRATEGIES = '''
+    SELECT s.*, u.email, u.phone 
+    FROM strategies s
+    JOIN users u ON s.user_id = u.id
+    WHERE s.active = 1 AND s.triggered_at IS NULL
+'''
+
+# Hot columns only - the registry needs the owner's plan, never contact details or free text
+SQL_SELECT_PENDING_RECORDS = '''
+    SELECT s.id, s.user_id, s.ticker, s.strategy_type, s.condition, s.threshold, s.parameters, u.plan
+    FROM strategies s
+    JOIN users u ON u.id = s.user_id
+    WHERE s.active = 1 AND s.triggered_at IS NULL
+'''
+
+SQL_SELECT_PENDING_RECORDS_BY_ID = SQL_SELECT_PENDING_RECORDS + '''
+    AND s.id IN ({placeholders})
+'''
+
+SQL_SELECT_ALERT_DETAILS = '''
+    SELECT s.id, s.raw_description, u.email, u.phone
+    FROM strategies s
+    JOIN users u ON s.user_id = u.id
+    WHERE s.id IN ({placeholders})
+'''
+
+SQL_SELECT_CHANGES = '''
+    SELECT seq, strategy_id FROM strategy_changes
+    WHERE seq > ?
+    ORDER BY seq
+'''
+
+# Highest change-log seq ever issued (AUTOINCREMENT keeps it in sqlite_sequence),
+# even once pruning has emptied the log
+SQL_SELECT_LAST_CHANGE = '''
+    SELECT COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'strategy_changes'), 0)
+'''
+
+SQL_MARK_TRIGGERED = '''
+    UPDATE strategies 
+    SET triggered_at = CURRENT_TIMESTAMP
+    WHERE id = ? AND triggered_at IS NULL
+'''
+
+# Only logs the alert while the strategy is still untriggered, so replaying
+# a flush (e.g. after a crash) can never write a second alert row
+SQL_LOG_TRIGGER_ALERT = '''
+    INSERT INTO alerts (strategy_id, user_id, message)
+    SELECT id, user_id, ? FROM strategies
+    WHERE id = ? AND triggered_at IS NULL
+'''
+
+SQL_SELECT_STRATEGY_STATES = 'SELECT strategy_id, last_value, side FROM strategy_state'
+
+SQL_SAVE_STRATEGY_STATE = '''
+    INSERT OR REPLACE INTO strategy_state (strategy_id, last_value, side)
+    VALUES (?, ?, ?)
+'''
+
+SQL_DELETE_STRATEGY_STATE = 'DELETE FROM strategy_state WHERE strategy_id = ?'
+
+SQL_INSERT_ALERT = '''
+    INSERT INTO alerts (strategy_id, user_id, message)
+    VALUES (?, ?, ?)
+'''
+
+
 class Database:
     """Handles all database operations"""
     
     def __init__(self, db_file: str = Config.DATABASE_FILE):
         self.db_file = db_file
+        self.pool = get_pool(db_file)
         self.init_database()
     
     def init_database(self):
-        """Create tables if they don't exist"""
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
-        
-        # Users table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                email TEXT UNIQUE NOT NULL,
-                phone TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # Strategies table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS strategies (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                ticker TEXT NOT NULL,
-                strategy_type TEXT NOT NULL,
-                condition TEXT NOT NULL,
-                threshold REAL,
-                parameters TEXT,
-                raw_description TEXT,
-                active INTEGER DEFAULT 1,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                triggered_at TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users (id)
-            )
-        ''')
-        
-        # Alerts history table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS alerts (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                strategy_id INTEGER NOT NULL,
-                user_id INTEGER NOT NULL,
-                message TEXT NOT NULL,
-                sent_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (strategy_id) REFERENCES strategies (id),
-                FOREIGN KEY (user_id) REFERENCES users (id)
-            )
-        ''')
+        """Create tables if they don't exist and apply pending migrations"""
+        with self.pool.connection() as conn:
+            version = migrate(conn)
         
-        conn.commit()
-        conn.close()
-        print("✓ Database initialized")
+        print(f"✓ Database initialized (schema v{version})")
     
-    def add_user(self, email: str, phone: str = None) -> int:
+    def add_user(self, email: str, phone: str = None, plan: Plan = Plan.FREE) -> int:
         """Add a new user"""
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
-        
-        try:
-            cursor.execute('INSERT INTO users (email, phone) VALUES (?, ?)', (email, phone))
-            user_id = cursor.lastrowid
-            conn.commit()
-            return user_id
-        except sqlite3.IntegrityError:
-            # User already exists
-            cursor.execute('SELECT id FROM users WHERE email = ?', (email,))
-            return cursor.fetchone()[0]
-        finally:
-            conn.close()
+        with self.pool.connection() as conn:
+            try:
+                with conn:
+                    cursor = conn.execute(SQL_INSERT_USER, (email, phone, plan.name.lower()))
+                    return cursor.lastrowid
+            except sqlite3.IntegrityError:
+                # User already exists
+                return conn.execute(SQL_SELECT_USER_ID, (email,)).fetchone()[0]
+    
+    def set_plan(self, email: str, plan: Plan) -> bool:
+        """Move a user to another plan tier; False if there's no such user"""
+        with self.pool.connection() as conn, conn:
+            return conn.execute(SQL_SET_USER_PLAN, (plan.name.lower(), email)).rowcount > 0
     
     def add_strategy(self, user_id: int, strategy: Dict) -> int:
         """Add a new strategy"""
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO strategies 
-            (user_id, ticker, strategy_type, condition, threshold, parameters, raw_description)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            user_id,
-            strategy.get('ticker'),
-            strategy.get('type'),
-            strategy.get('condition'),
-            strategy.get('threshold'),
-            json.dumps(strategy.get('parameters', {})),
-            strategy.get('raw_description')
-        ))
-        
-        strategy_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
-        return strategy_id
+        with self.pool.connection() as conn, conn:
+            cursor = conn.execute(SQL_INSERT_STRATEGY, (
+                user_id,
+                strategy.get('ticker'),
+                strategy.get('type'),
+                strategy.get('condition'),
+                strategy.get('threshold'),
+                json.dumps(strategy.get('parameters', {})),
+                strategy.get('raw_description')
+            ))
+            return cursor.lastrowid
     
-    def get_active_strategies(self) -> List[Dict]:
-        """Get all active strategies"""
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT s.*, u.email, u.phone 
-            FROM strategies s
-            JOIN users u ON s.user_id = u.id
-            WHERE s.active = 1 AND s.triggered_at IS NULL
-        ''')
-        
+    @staticmethod
+    def _rows_to_strategies(cursor: sqlite3.Cursor) -> List[Dict]:
+        """Turn joined strategy rows into dicts with decoded parameters"""
         columns = [desc[0] for desc in cursor.description]
         strategies = []
         
@@ -168,35 +642,354 @@ class Database:
                 strategy['parameters'] = json.loads(strategy['parameters'])
             strategies.append(strategy)
         
-        conn.close()
         return strategies
     
-    def mark_triggered(self, strategy_id: int):
-        """Mark a strategy as triggered"""
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
+    def get_active_strategies(self) -> List[Dict]:
+        """Get all active strategies"""
+        with self.pool.connection() as conn:
+            return self._rows_to_strategies(conn.execute(SQL_SELECT_ACTIVE_STRATEGIES))
+    
+    def get_active_strategies_snapshot(self) -> tuple[List[Strategy], int]:
+        """
+        Get all active strategies as records, plus the change-log cursor they reflect
         
-        cursor.execute('''
-            UPDATE strategies 
-            SET triggered_at = CURRENT_TIMESTAMP
-            WHERE id = ?
-        ''', (strategy_id,))
+        Both are read in one transaction, so changes committed after the
+        snapshot are guaranteed to show up in get_strategy_changes(cursor).
+        """
+        with self.pool.connection() as conn:
+            conn.execute('BEGIN')
+            try:
+                cursor = conn.execute(SQL_SELECT_LAST_CHANGE).fetchone()[0]
+                strategies = [Strategy.from_row(row) for row in conn.execute(SQL_SELECT_PENDING_RECORDS)]
+            finally:
+                conn.rollback()
+        return strategies, cursor
+    
+    @staticmethod
+    def _query_ids(conn: sqlite3.Connection, sql: str, ids: List[int]):
+        """Run an `IN ({placeholders})` query over ids in parameter-limit-sized chunks"""
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            yield from conn.execute(sql.format(placeholders=','.join('?' * len(chunk))), chunk)
+    
+    def get_pending_strategies(self, strategy_ids: List[int]) -> List[Strategy]:
+        """Get those of `strategy_ids` that are still active and untriggered"""
+        with self.pool.connection() as conn:
+            return [Strategy.from_row(row)
+                    for row in self._query_ids(conn, SQL_SELECT_PENDING_RECORDS_BY_ID, strategy_ids)]
+    
+    def get_alert_details(self, strategy_ids: List[int]) -> Dict[int, Dict]:
+        """Get the cold fields (description, email, phone) needed to send alerts"""
+        with self.pool.connection() as conn:
+            return {
+                row['id']: {'raw_description': row['raw_description'],
+                            'email': row['email'], 'phone': row['phone']}
+                for row in self._query_ids(conn, SQL_SELECT_ALERT_DETAILS, strategy_ids)
+            }
+    
+    def get_strategy_changes(self, since: int) -> tuple[Optional[set], int]:
+        """
+        Get ids of strategies written after change-log position `since`
         
-        conn.commit()
-        conn.close()
+        Returns (ids, new_cursor). ids is None when the log no longer
+        reaches back to `since` (it was pruned), meaning a full reload is needed.
+        """
+        with self.pool.connection() as conn:
+            conn.execute('BEGIN')
+            try:
+                # An empty log covers nothing issued after `since`
+                oldest = conn.execute('SELECT MIN(seq) FROM strategy_changes').fetchone()[0]
+                if oldest is None:
+                    oldest = conn.execute(SQL_SELECT_LAST_CHANGE).fetchone()[0] + 1
+                if oldest > since + 1:
+                    return None, since
+                
+                changed = set()
+                cursor = since
+                for seq, strategy_id in conn.execute(SQL_SELECT_CHANGES, (since,)):
+                    changed.add(strategy_id)
+                    cursor = seq
+            finally:
+                conn.rollback()
+        return changed, cursor
+    
+    def prune_strategy_changes(self, upto: int):
+        """Drop change-log entries at or before `upto`"""
+        with self.pool.connection() as conn, conn:
+            conn.execute('DELETE FROM strategy_changes WHERE seq <= ?', (upto,))
+    
+    def mark_triggered(self, strategy_id: int):
+        """Mark a strategy as triggered"""
+        with self.pool.connection() as conn, conn:
+            conn.execute(SQL_MARK_TRIGGERED, (strategy_id,))
     
     def log_alert(self, strategy_id: int, user_id: int, message: str):
         """Log an alert that was sent"""
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
+        with self.pool.connection() as conn, conn:
+            conn.execute(SQL_INSERT_ALERT, (strategy_id, user_id, message))
+    
+    def record_triggers(self, triggers: List[tuple]) -> int:
+        """
+        Log alerts and mark strategies triggered in a single transaction
+        
+        `triggers` is a list of (strategy_id, message). Either every row is
+        written or none is, and strategies that are already triggered are
+        skipped, so the same batch can be safely re-applied.
+        Returns the number of strategies newly marked.
+        """
+        if not triggers:
+            return 0
+        
+        with self.pool.connection() as conn, conn:
+            conn.executemany(SQL_LOG_TRIGGER_ALERT, ((message, sid) for sid, message in triggers))
+            cursor = conn.executemany(SQL_MARK_TRIGGERED, ((sid,) for sid, _ in triggers))
+            marked = cursor.rowcount
+            conn.executemany(SQL_DELETE_STRATEGY_STATE, ((sid,) for sid, _ in triggers))
+            return marked
+    
+    def publish_quotes(self, quotes: List[tuple]):
+        """Store (ticker, price, timestamp) quotes for other processes to read, in one transaction"""
+        if quotes:
+            with self.pool.connection() as conn, conn:
+                conn.executemany(SQL_UPSERT_QUOTE, quotes)
+    
+    def get_quote(self, ticker: str) -> Optional[tuple]:
+        """Latest (price, timestamp) a monitor published for a ticker, or None - never goes upstream"""
+        with self.pool.connection() as conn:
+            row = conn.execute(SQL_SELECT_QUOTE, (ticker,)).fetchone()
+        return (row[0], row[1]) if row else None
+    
+    def get_strategy_states(self) -> Dict[int, tuple]:
+        """Persisted crossing state: {strategy_id: (last_value, side)}"""
+        with self.pool.connection() as conn:
+            return {row[0]: (row[1], row[2]) for row in conn.execute(SQL_SELECT_STRATEGY_STATES)}
+    
+    def save_strategy_states(self, states: Dict[int, tuple]):
+        """Upsert crossing state for the given strategies in one transaction"""
+        if not states:
+            return
+        with self.pool.connection() as conn, conn:
+            conn.executemany(SQL_SAVE_STRATEGY_STATE,
+                             ((sid, value, side) for sid, (value, side) in states.items()))
+
+
+# ============================================================================
+# STRATEGY REGISTRY
+# ============================================================================
+
+class StrategyListener(Protocol):
+    """
+    Anything that mirrors the registry's strategies
+    
+    The registry calls reset() with every active strategy on a full load,
+    then strategy_added() / strategy_removed() for each delta a sync
+    applies (an edit is a removal followed by an addition), so a listener
+    stays current without rescanning. Index structures (StrategyBatch,
+    ThresholdIndex, CrossingTracker, ...) implement this; TierQueue does
+    too and passes its own tiers' share on to listeners of its own.
+    """
+    
+    def reset(self, strategies: List[Strategy]): ...
+    
+    def strategy_added(self, strategy: Strategy): ...
+    
+    def strategy_removed(self, strategy: Strategy): ...
+
+
+class StrategyRegistry:
+    """
+    Resident set of active strategies, kept current with deltas
+    
+    Loads everything once, then follows the strategy_changes log so each
+    sync only re-reads the strategies that were actually written - by this
+    process or by the web workers. Strategies are also indexed by ticker so
+    a cycle can work symbol by symbol.
+    """
+    
+    def __init__(self, db: Database):
+        self.db = db
+        self.cursor = 0
+        self.pruned = 0  # Cursor the change log was last pruned up to
+        self.loaded = False
+        self.listeners: List[StrategyListener] = []  # Notified of every load and add/remove
+        self._strategies: Dict[int, Strategy] = {}
+        self._by_ticker: Dict[str, Dict[int, Strategy]] = {}
+        self._in_flight: set = set()  # Fired and handed off, not recorded yet (see hand_off())
+        self._lock = threading.Lock()  # Guards _in_flight, which the dispatcher's worker settles
+    
+    def __len__(self) -> int:
+        return len(self._strategies)
+    
+    def strategies(self) -> List[Strategy]:
+        """Current active strategies"""
+        return list(self._strategies.values())
+    
+    def by_ticker(self) -> Dict[str, List[Strategy]]:
+        """Current active strategies grouped by ticker"""
+        return {ticker: list(group.values()) for ticker, group in self._by_ticker.items()}
+    
+    def tickers(self) -> List[str]:
+        """Tickers with at least one active strategy"""
+        return list(self._by_ticker)
+    
+    def _put(self, strategy: Strategy):
+        self._remove(strategy.id)
+        self._strategies[strategy.id] = strategy
+        self._by_ticker.setdefault(strategy.ticker, {})[strategy.id] = strategy
+        for listener in self.listeners:
+            listener.strategy_added(strategy)
+    
+    def _remove(self, strategy_id: int):
+        strategy = self._strategies.pop(strategy_id, None)
+        if strategy is None:
+            return
+        group = self._by_ticker[strategy.ticker]
+        del group[strategy_id]
+        if not group:
+            del self._by_ticker[strategy.ticker]
+        for listener in self.listeners:
+            listener.strategy_removed(strategy)
+    
+    def _in_flight_ids(self) -> set:
+        """
+        Strategies handed off but not recorded yet, which the database still shows pending
+        
+        Taken before reading the database, so a batch that commits in
+        between can't slip back in from a stale read.
+        """
+        with self._lock:
+            return set(self._in_flight)
+    
+    def load(self):
+        """Full reload from the database"""
+        in_flight = self._in_flight_ids()
+        strategies, self.cursor = self.db.get_active_strategies_snapshot()
+        strategies = [strategy for strategy in strategies if strategy.id not in in_flight]
+        self._strategies = {s.id: s for s in strategies}
+        self._by_ticker = {}
+        for strategy in strategies:
+            self._by_ticker.setdefault(strategy.ticker, {})[strategy.id] = strategy
+        for listener in self.listeners:
+            listener.reset(strategies)
+        self.loaded = True
+        
+        # Nothing older than our snapshot is needed any more; a monitor that
+        # is further behind will see the gap and reload too
+        self.db.prune_strategy_changes(self.cursor)
+        self.pruned = self.cursor
+    
+    def sync(self) -> int:
+        """Apply changes made since the last sync. Returns strategies touched."""
+        if not self.loaded:
+            self.load()
+            return len(self._strategies)
+        
+        changed, cursor = self.db.get_strategy_changes(self.cursor)
+        if changed is None:
+            self.load()
+            return len(self._strategies)
+        if not changed:
+            return 0
+        
+        in_flight = self._in_flight_ids()
+        for strategy_id in changed:
+            self._remove(strategy_id)
+        for strategy in self.db.get_pending_strategies(list(changed)):
+            if strategy.id not in in_flight:
+                self._put(strategy)
+        
+        self.cursor = cursor
+        if cursor - self.pruned >= Config.CHANGE_LOG_PRUNE_ROWS:
+            # Long-running monitors don't reload, so the log is trimmed as it's read
+            self.db.prune_strategy_changes(cursor)
+            self.pruned = cursor
+        return len(changed)
+    
+    def add(self, strategy_id: int):
+        """Pick up a strategy this process just created"""
+        for strategy in self.db.get_pending_strategies([strategy_id]):
+            self._put(strategy)
+    
+    def discard(self, strategy_ids: List[int]):
+        """Drop strategies this process just triggered or deactivated"""
+        for strategy_id in strategy_ids:
+            self._remove(strategy_id)
+    
+    def hand_off(self, strategy_ids: List[int]):
+        """Drop strategies that fired and are waiting for an AlertDispatcher to record them"""
+        with self._lock:
+            self._in_flight.update(strategy_ids)
+        self.discard(strategy_ids)
+    
+    def settle(self, strategy_ids: List[int]):
+        """Handed-off strategies are recorded as triggered (called from the dispatcher's worker)"""
+        with self._lock:
+            self._in_flight.difference_update(strategy_ids)
+
+
+# ============================================================================
+# HTTP CLIENT
+# ============================================================================
+
+class HttpClient:
+    """
+    Shared outbound HTTP client with keep-alive connection pooling
+    
+    One requests.Session keeps a connection pool per host, so repeated
+    quote and parser calls reuse warm TCP/TLS connections instead of
+    handshaking every time. Connect and read timeouts are set separately.
+    """
+    
+    def __init__(self, pool_size: int = Config.HTTP_POOL_SIZE,
+                 connect_timeout: float = Config.HTTP_CONNECT_TIMEOUT,
+                 read_timeout: float = Config.HTTP_READ_TIMEOUT):
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
         
-        cursor.execute('''
-            INSERT INTO alerts (strategy_id, user_id, message)
-            VALUES (?, ?, ?)
-        ''', (strategy_id, user_id, message))
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=Config.HTTP_MAX_HOSTS,
+            pool_maxsize=pool_size
+        )
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+    
+    def request(self, method: str, url: str, read_timeout: float = None, deadline: float = None,
+                **kwargs) -> requests.Response:
+        """
+        Send a request over a pooled connection
         
-        conn.commit()
-        conn.close()
+        A `deadline` (time.monotonic()) caps both timeouts at the time left
+        before it, so a stalled server can't hold the caller past it.
+        """
+        connect_timeout, read_timeout = self.connect_timeout, read_timeout or self.read_timeout
+        if deadline is not None:
+            remaining = max(deadline - time.monotonic(), 0.001)  # 0 would mean "no timeout" to urllib3
+            connect_timeout, read_timeout = min(connect_timeout, remaining), min(read_timeout, remaining)
+        kwargs.setdefault('timeout', (connect_timeout, read_timeout))
+        return self.session.request(method, url, **kwargs)
+    
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+    
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+    
+    def close(self):
+        self.session.close()
+
+
+_http_client: Optional[HttpClient] = None
+_http_client_lock = threading.Lock()
+
+
+def get_http_client() -> HttpClient:
+    """Get the process-wide HTTP client"""
+    global _http_client
+    with _http_client_lock:
+        if _http_client is None:
+            _http_client = HttpClient()
+        return _http_client
 
 
 # ============================================================================
@@ -206,9 +999,13 @@ class Database:
 class StrategyParser:
     """Uses OpenAI API to parse natural language strategies"""
     
-    def __init__(self, api_key: str = Config.CLAUDE_API_KEY):
+    # A clause of a compound description names its own condition or indicator
+    CLAUSE_WORDS = re.compile(r'above|over|exceed|break|below|under|drop|cross|between|rsi|moving average|\bma\b|volume')
+    
+    def __init__(self, api_key: str = Config.CLAUDE_API_KEY, http: HttpClient = None):
         self.api_key = api_key
         self.api_url = "https://api.openai.com/v1/chat/completions"
+        self.http = http or get_http_client()
     
     def parse(self, user_description: str) -> Dict:
         """
@@ -234,18 +1031,30 @@ User's strategy: "{user_description}"
 
 Return ONLY valid JSON with these fields:
 - ticker: stock symbol (string)
-- type: one of [RSI, PRICE, MA_CROSS, VOLUME, MACD]
+- type: one of [RSI, PRICE, MA_CROSS, VOLUME, MACD, COMPOSITE]
 - condition: one of [above, below, crosses_above, crosses_below]
 - threshold: numeric value (if applicable)
-- parameters: object with additional params (like MA periods)
+- parameters: object with additional params (like MA periods: {{"fast": 50, "slow": 200}};
+  for VOLUME, {{"relative": true}} makes threshold a multiple of average daily volume
+  instead of a share count; for RSI, MACD and MA_CROSS, "timeframe" picks the bars:
+  one of [1m, 5m, 15m, 1h, 1d], default 1m)
 
-Example:
+Several conditions joined by and/or are one COMPOSITE strategy: condition "all"
+or "any", and parameters.expression a tree of {{"all": [...]}} / {{"any": [...]}}
+groups whose leaves are conditions with their own type, condition, threshold
+and parameters. A price-vs-moving-average condition is MA_CROSS with fast 1.
+
+Examples:
 {{"ticker": "AAPL", "type": "RSI", "condition": "below", "threshold": 30}}
+{{"ticker": "SPY", "type": "MA_CROSS", "condition": "crosses_above", "parameters": {{"fast": 1, "slow": 50, "timeframe": "1d"}}}}
+{{"ticker": "AAPL", "type": "COMPOSITE", "condition": "all", "parameters": {{"expression": {{"all": [
+  {{"type": "RSI", "condition": "below", "threshold": 30}},
+  {{"type": "MA_CROSS", "condition": "above", "parameters": {{"fast": 1, "slow": 200}}}}]}}}}}}
 
 Return only the JSON, nothing else."""
 
         try:
-            response = requests.post(
+            response = self.http.post(
                 self.api_url,
                 headers={
                     "Content-Type": "application/json",
@@ -254,10 +1063,10 @@ Return only the JSON, nothing else."""
                 json={
                     "model": "gpt-4o-mini",
                     "messages": [{"role": "user", "content": prompt}],
-                    "max_tokens": 200,
+                    "max_tokens": 400,
                     "temperature": 0
                 },
-                timeout=30
+                read_timeout=30
             )
             
             if response.status_code == 200:
@@ -308,102 +1117,1455 @@ Return only the JSON, nothing else."""
                 ticker = symbol
                 break
         
+        # "between 150 and 200" is one range clause, not two
+        text = re.sub(r'\bbetween\s+(\$?\d+\.?\d*)\s+and\s+(?=\$?\d)', r'between \1 to ', description_lower)
+        
+        # "A and B" / "A or B" where every clause has its own number and its
+        # own condition or indicator is a COMPOSITE: "or" splits alternatives,
+        # "and" splits each of those. Otherwise ("above 150 and 200") it's one clause.
+        groups = [re.split(r'\s+and\s+', part) for part in re.split(r'\s+or\s+', text)]
+        clauses = [clause for group in groups for clause in group]
+        if len(clauses) == 1 or not all(re.search(r'\d', clause) and self.CLAUSE_WORDS.search(clause)
+                                        for clause in clauses):
+            groups = [[text]]
+        
+        terms = [[term for clause in group for term in self._parse_range(clause)] for group in groups]
+        if len(terms) == 1 and len(terms[0]) == 1:
+            return {"ticker": ticker, **terms[0][0], "raw_description": description}
+        
+        alternatives = [{"all": group} if len(group) > 1 else group[0] for group in terms]
+        expression = {"any": alternatives} if len(alternatives) > 1 else alternatives[0]
+        return {
+            "ticker": ticker,
+            "type": "COMPOSITE",
+            "condition": "any" if "any" in expression else "all",
+            "threshold": None,
+            "parameters": {"expression": expression},
+            "raw_description": description
+        }
+    
+    @classmethod
+    def _parse_range(cls, text: str) -> List[Dict]:
+        """Conditions of one clause: two for "between X to Y" (above the low end, below the high one), else one"""
+        match = re.search(r'\bbetween\s+\$?(\d+\.?\d*)\s+to\s+\$?(\d+\.?\d*)', text)
+        if match is None:
+            return [cls._parse_clause(text)]
+        low, high = sorted((float(match.group(1)), float(match.group(2))))
+        return [cls._parse_clause(f"{text[:match.start()]}{word} {level}{text[match.end():]}")
+                for word, level in (("above", low), ("below", high))]
+    
+    @staticmethod
+    def _parse_clause(text: str) -> Dict:
+        """Type, condition, threshold and parameters of one lower-cased condition"""
+        import re
+        
         # Detect indicator type
-        if "rsi" in description_lower:
+        if "rsi" in text:
             strategy_type = "RSI"
-        elif "moving average" in description_lower or "ma" in description_lower:
+        elif "moving average" in text or re.search(r'\bma\b', text):
             strategy_type = "MA_CROSS"
-        elif "volume" in description_lower:
+        elif "volume" in text:
             strategy_type = "VOLUME"
         else:
             strategy_type = "PRICE"
         
+        # "1-hour RSI", "RSI on the 15 min chart", "daily MA" read rolled-up bars
+        timeframe = None
+        if strategy_type in ("RSI", "MA_CROSS"):
+            match = re.search(r'\b(\d+)\s*-?\s*(m|min|minute|h|hr|hour)s?\b|\b(hourly|daily)\b', text)
+            if match:
+                label = ({"hourly": "1h", "daily": "1d"}[match.group(3)] if match.group(3)
+                         else match.group(1) + match.group(2)[0])
+                if label in Config.BAR_TIMEFRAMES:
+                    timeframe = label
+                    text = text[:match.start()] + text[match.end():]
+        
         # Detect condition
-        if any(word in description_lower for word in ["above", "over", "exceed", "break"]):
+        if "cross" in text:
+            below = any(word in text for word in ["below", "under", "down"])
+            condition = "crosses_below" if below else "crosses_above"
+        elif any(word in text for word in ["above", "over", "exceed", "break"]):
             condition = "above"
-        elif any(word in description_lower for word in ["below", "under", "drop"]):
+        elif any(word in text for word in ["below", "under", "drop"]):
             condition = "below"
         else:
             condition = "above"
         
         # Extract threshold
-        numbers = re.findall(r'\d+\.?\d*', description)
+        numbers = re.findall(r'\d+\.?\d*', text)
         threshold = float(numbers[0]) if numbers else 100.0
+        parameters = {}
+        
+        # "50-day MA ... 200-day MA" compares two averages; a single period
+        # compares the price itself (a 1-bar average) with that average
+        if strategy_type == "MA_CROSS" and numbers:
+            periods = sorted(int(float(n)) for n in numbers[:2])
+            parameters = {"fast": periods[0] if len(periods) > 1 else 1, "slow": periods[-1]}
+            threshold = None
+        
+        # "volume 3x average" / "relative volume above 2" compare with the daily average
+        if strategy_type == "VOLUME" and (re.search(r'\d\s*x\b|times|average|relative', text)):
+            parameters = {"relative": True}
+        
+        # "volume above 5M" / "2.5 million shares"
+        if strategy_type == "VOLUME" and numbers and not parameters:
+            suffix = re.search(r'\d+\.?\d*\s*(k|m|b|thousand|million|billion)\b', text)
+            if suffix:
+                threshold *= {'k': 1e3, 'm': 1e6, 'b': 1e9}[suffix.group(1)[0]]
+        
+        if timeframe:
+            parameters["timeframe"] = timeframe
         
         return {
-            "ticker": ticker,
             "type": strategy_type,
             "condition": condition,
             "threshold": threshold,
-            "parameters": {},
-            "raw_description": description
+            "parameters": parameters
         }
 
 
 # ============================================================================
-# MARKET DATA PROVIDER
+# PRICE HISTORY
 # ============================================================================
 
-class MarketData:
-    """Fetches real-time market data"""
+def timeframe_resolution(params: Optional[Dict]) -> Optional[int]:
+    """
+    Seconds per bar for a strategy's "timeframe" parameter ("5m", "1h", ...)
     
-    def __init__(self):
-        self.use_free = Config.USE_FREE_DATA
-        self.polygon_key = Config.POLYGON_API_KEY
+    None means the base bars - no timeframe, the base one, or a label not
+    in Config.BAR_TIMEFRAMES.
+    """
+    label = params.get('timeframe') if params else None
+    resolution = Config.BAR_TIMEFRAMES.get(label)
+    return None if resolution == Config.BAR_RESOLUTION else resolution
+
+
+class SessionClock:
+    """Start of the session day (local midnight) containing a timestamp, cached for the current day"""
     
-    def get_price(self, ticker: str) -> Optional[float]:
-        """Get current price"""
-        if self.use_free:
-            return self._get_price_yahoo(ticker)
-        else:
-            return self._get_price_polygon(ticker)
+    def __init__(self, timezone: str = Config.MARKET_TIMEZONE):
+        self.timezone = ZoneInfo(timezone)
+        self._day = (0.0, 0.0)  # [start, end) of the most recent day looked up
     
-    def _get_price_yahoo(self, ticker: str) -> Optional[float]:
-        """Yahoo Finance (free but unofficial)"""
-        try:
-            url = f"https://query1.finance.yahoo.com/v8/finance/chart/{ticker}"
-            response = requests.get(url, timeout=10)
-            
-            if response.status_code == 200:
-                data = response.json()
-                price = data['chart']['result'][0]['meta']['regularMarketPrice']
-                return float(price)
-        except Exception as e:
-            print(f"Error fetching {ticker}: {e}")
-        return None
+    def start(self, timestamp: float) -> float:
+        start, end = self._day
+        if start <= timestamp < end:
+            return start
+        midnight = datetime.fromtimestamp(timestamp, self.timezone).replace(
+            hour=0, minute=0, second=0, microsecond=0)
+        start, end = midnight.timestamp(), (midnight + timedelta(days=1)).timestamp()
+        if start >= self._day[0]:
+            self._day = (start, end)
+        return start
+
+
+class BarBuffer:
+    """
+    Fixed-capacity ring buffer of OHLCV bars for one ticker and resolution
     
-    def _get_price_polygon(self, ticker: str) -> Optional[float]:
-        """Polygon.io (paid but reliable)"""
-        try:
-            url = f"https://api.polygon.io/v2/aggs/ticker/{ticker}/prev"
-            headers = {"Authorization": f"Bearer {self.polygon_key}"}
-            response = requests.get(url, headers=headers, timeout=10)
-            
-            if response.status_code == 200:
-                data = response.json()
-                price = data['results'][0]['c']  # Close price
-                return float(price)
-        except Exception as e:
-            print(f"Error fetching {ticker}: {e}")
-        return None
+    Every bar is written twice, `capacity` slots apart, so the most recent
+    bars are always one contiguous slice: the field accessors below return
+    numpy views into the buffer, never copies. Memory is fixed at
+    6 fields x 2 x capacity x 8 bytes. Daily (and longer) bars start at
+    session-day boundaries from `clock`; shorter ones at multiples of the
+    resolution.
+    """
+    
+    TIME, OPEN, HIGH, LOW, CLOSE, VOLUME = range(6)
+    
+    def __init__(self, resolution: int = Config.BAR_RESOLUTION, capacity: int = Config.BAR_CAPACITY,
+                 clock: SessionClock = None):
+        self.resolution = resolution
+        self.capacity = capacity
+        self.count = 0  # Bars held (<= capacity)
+        self.opened = 0  # Bars ever opened - a cheap position for incremental readers
+        self._head = -1  # Slot of the newest bar
+        self._data = np.zeros((6, 2 * capacity))
+        self._clock = clock if resolution >= 86400 else None
+    
+    def __len__(self) -> int:
+        return self.count
+    
+    @property
+    def nbytes(self) -> int:
+        return self._data.nbytes
+    
+    def update(self, price: float, timestamp: float, volume: float = 0.0) -> bool:
+        """
+        Fold a quote into the current bar, or open a new one
+        
+        Returns True when the quote opened a new bar. Quotes older than the
+        current bar are ignored.
+        """
+        return self.fold(timestamp, price, price, price, price, volume)
     
-    def calculate_rsi(self, ticker: str, period: int = 14) -> Optional[float]:
-        """Calculate RSI (simplified version)"""
-        # In production, you'd use a library like pandas-ta
-        # For now, return a simulated value
-        # TODO: Implement real RSI calculation
-        return 45.0  # Placeholder
+    def bar_start(self, timestamp: float) -> float:
+        """Start time of the bar a timestamp falls in"""
+        if self._clock is not None:
+            return self._clock.start(timestamp)
+        return timestamp - timestamp % self.resolution
     
-    def get_moving_average(self, ticker: str, period: int) -> Optional[float]:
-        """Get moving average"""
-        # TODO: Implement real MA calculation
-        price = self.get_price(ticker)
-        return price * 0.98 if price else None  # Placeholder
+    def fold(self, timestamp: float, open_: float, high: float, low: float, close: float,
+             volume: float) -> bool:
+        """Fold a whole (shorter) bar into the current bar, or open a new one - as update()"""
+        bar_time = self.bar_start(timestamp)
+        data, head, capacity = self._data, self._head, self.capacity
+        
+        if self.count and bar_time == data[self.TIME, head]:
+            _, _, bar_high, bar_low, _, bar_volume = data[:, head].tolist()
+            values = (max(bar_high, high), min(bar_low, low), close, bar_volume + volume)
+            data[self.HIGH:, head] = values
+            data[self.HIGH:, head + capacity] = values
+            return False
+        
+        if self.count and bar_time < data[self.TIME, head]:
+            return False
+        
+        head = self._head = (head + 1) % capacity
+        self.count = min(self.count + 1, capacity)
+        self.opened += 1
+        values = (bar_time, open_, high, low, close, volume)
+        data[:, head] = values
+        data[:, head + capacity] = values
+        return True
+    
+    @property
+    def last_time(self) -> float:
+        return self._data[self.TIME, self._head]
+    
+    @property
+    def last_close(self) -> float:
+        return float(self._data[self.CLOSE, self._head])
+    
+    def field(self, field: int, n: int = None) -> np.ndarray:
+        """View of the last `n` (default: all) values of a field, oldest first"""
+        n = self.count if n is None else min(n, self.count)
+        end = self._head + self.capacity + 1
+        return self._data[field, end - n:end]
+    
+    def times(self, n: int = None) -> np.ndarray:
+        return self.field(self.TIME, n)
+    
+    def opens(self, n: int = None) -> np.ndarray:
+        return self.field(self.OPEN, n)
+    
+    def highs(self, n: int = None) -> np.ndarray:
+        return self.field(self.HIGH, n)
+    
+    def lows(self, n: int = None) -> np.ndarray:
+        return self.field(self.LOW, n)
+    
+    def closes(self, n: int = None) -> np.ndarray:
+        return self.field(self.CLOSE, n)
+    
+    def volumes(self, n: int = None) -> np.ndarray:
+        return self.field(self.VOLUME, n)
 
 
+class BarStore:
+    """
+    Resident price history: one BarBuffer per (ticker, resolution)
+    
+    Quotes only ever feed the base-resolution bars. Longer timeframes are
+    rolled up from them: subscribe() creates a ticker's buffer for a
+    timeframe (backfilled from the base bars already held), and from then
+    on each base bar is folded into it as the bar closes - a handful of
+    writes per ticker per base bar, never per quote and never an extra
+    fetch. A rolled-up buffer's newest bar is the one still forming; its
+    close lags until the base bar closes, so live readers take the current
+    price from the base bars.
+    """
+    
+    def __init__(self, resolution: int = Config.BAR_RESOLUTION, capacity: int = Config.BAR_CAPACITY):
+        self.resolution = resolution
+        self.capacity = capacity
+        self.clock = SessionClock()
+        self._buffers: Dict[tuple, BarBuffer] = {}
+        self._rollups: Dict[str, List[BarBuffer]] = {}  # ticker -> its subscribed longer-timeframe buffers
+        self._lock = threading.Lock()
+    
+    def record(self, ticker: str, price: float, timestamp: float = None, volume: float = 0.0) -> bool:
+        """Feed a quote into the ticker's base-resolution bars"""
+        key = (ticker, self.resolution)
+        with self._lock:
+            buffer = self._buffers.get(key)
+            if buffer is None:
+                buffer = self._buffers[key] = BarBuffer(self.resolution, self.capacity)
+            opened = buffer.update(price, time.time() if timestamp is None else timestamp, volume)
+            if opened:
+                rollups = self._rollups.get(ticker)
+                if rollups:
+                    self._roll_up(buffer, rollups)
+            return opened
+    
+    @staticmethod
+    def _roll_up(base: BarBuffer, rollups: List[BarBuffer]):
+        """A base bar just opened: fold in the one that closed, and open the new one's period"""
+        end = base._head + base.capacity
+        bar_time, price = base._data[BarBuffer.TIME:BarBuffer.HIGH, end].tolist()
+        closed = base._data[:, end - 1].tolist() if base.count > 1 else None
+        for buffer in rollups:
+            # The new bar's volume is left for the fold at its close, so it's counted once
+            if closed is None:
+                buffer.fold(bar_time, price, price, price, price, 0.0)
+            elif buffer.bar_start(closed[0]) == buffer.bar_start(bar_time):
+                # Same period (the usual case): one fold covers both
+                closed_time, open_, high, low, _, volume = closed
+                buffer.fold(closed_time, open_, max(high, price), min(low, price), price, volume)
+            else:
+                buffer.fold(*closed)
+                buffer.fold(bar_time, price, price, price, price, 0.0)
+    
+    def subscribe(self, ticker: str, resolution: int) -> BarBuffer:
+        """A ticker's bars at a longer resolution, rolled up from the base bars from now on"""
+        key = (ticker, resolution)
+        with self._lock:
+            buffer = self._buffers.get(key)
+            if buffer is not None:
+                return buffer
+            if resolution % self.resolution:
+                raise ValueError(f"{resolution}s bars can't be built from {self.resolution}s bars")
+            buffer = self._buffers[key] = BarBuffer(resolution, self.capacity, self.clock)
+            
+            base = self._buffers.get((ticker, self.resolution))
+            if base is not None and len(base):
+                history = np.stack([base.field(field) for field in range(6)], axis=1).tolist()
+                for bar in history[:-1]:
+                    buffer.fold(*bar)
+                bar_time, price = history[-1][BarBuffer.TIME], history[-1][BarBuffer.OPEN]
+                buffer.fold(bar_time, price, price, price, price, 0.0)
+            self._rollups.setdefault(ticker, []).append(buffer)
+            return buffer
+    
+    def get(self, ticker: str, resolution: int = None) -> Optional[BarBuffer]:
+        return self._buffers.get((ticker, resolution or self.resolution))
+    
+    def __len__(self) -> int:
+        return len(self._buffers)
+    
+    @property
+    def nbytes(self) -> int:
+        return sum(buffer.nbytes for buffer in self._buffers.values())
+
+
+class VolumeSeries:
+    """Session volume and completed-session window for one ticker"""
+    
+    __slots__ = ('session', 'cumulative', 'reported', 'base', 'window', 'total', 'seed')
+    
+    def __init__(self, days: int):
+        self.session: Optional[float] = None  # Open of the session `cumulative` belongs to (None: no sessions)
+        self.cumulative: Optional[float] = None  # Volume traded so far this session
+        self.reported: Optional[float] = None  # Provider's running total in the latest quote
+        self.base = 0.0  # Provider total that counts as nothing traded yet (stale until the provider resets)
+        self.window = deque(maxlen=days)  # Totals of the last completed sessions
+        self.total = 0.0  # Sum of `window`
+        self.seed: Optional[float] = None  # Provider's own average, until the window fills
+    
+    def close_session(self):
+        if self.cumulative is None:
+            return
+        if len(self.window) == self.window.maxlen:
+            self.total -= self.window[0]
+        self.window.append(self.cumulative)
+        self.total += self.cumulative
+    
+    def average(self) -> Optional[float]:
+        days, n = self.window.maxlen, len(self.window)
+        if n == days:
+            return self.total / days
+        if self.seed:
+            return (self.total + self.seed * (days - n)) / days
+        return self.total / n if n else None
+
+
+class VolumeTracker:
+    """
+    Cumulative session volume and a rolling N-day baseline per ticker
+    
+    Providers report volume as a running total for the session, so each
+    quote adds only the difference from the previous one - that delta is
+    what goes into the current bar. When a session rolls over, the last
+    total seen becomes that day's volume and enters a fixed window with a
+    running sum, so the baseline average is O(1) to read. Until the window
+    fills, the provider's own average (sent with the same quote) stands in
+    for the missing days.
+    
+    Sessions roll over when the ticker's trading calendar opens the next
+    one, or when the provider's total drops (its reset, which is the only
+    signal on venues that never close). Providers keep reporting the last
+    session's total after the close and sometimes past the open, so that
+    total counts as zero for the new session until it resets. A drop
+    within a session already in progress is a correction, not a reset.
+    """
+    
+    def __init__(self, days: int = Config.VOLUME_BASELINE_DAYS, calendar: "MarketCalendar" = None):
+        self.days = days
+        self.calendar = calendar or MarketCalendar()
+        self._series: Dict[str, VolumeSeries] = {}
+        self._lock = threading.Lock()
+    
+    def record(self, ticker: str, cumulative: Optional[float], timestamp: float,
+               average: Optional[float] = None) -> float:
+        """Fold in a quote's session volume. Returns the volume traded since the previous quote."""
+        with self._lock:
+            series = self._series.get(ticker)
+            if series is None:
+                series = self._series[ticker] = VolumeSeries(self.days)
+            if average:
+                series.seed = average
+            if cumulative is None:
+                return 0.0
+            
+            session = self.calendar.current_session(ticker, timestamp)
+            if series.reported is None:
+                # Joined mid-session: the volume so far didn't trade in this bar.
+                # Joined while closed, the total is the last session's, rolled over at the open.
+                series.session = session if session is None or session <= timestamp else 0.0
+                series.cumulative = series.reported = cumulative
+                return 0.0
+            if session is not None and series.session is not None:
+                if session < series.session:
+                    return 0.0  # Late quote from a session already closed
+                if series.session < session <= timestamp:
+                    series.close_session()
+                    series.session, series.cumulative, series.base = session, 0.0, series.reported
+            
+            in_progress = session is not None and session == series.session and session <= timestamp
+            if cumulative < series.reported and (series.base or not in_progress):
+                if not series.base:
+                    series.close_session()  # A reset with no open since: 24/7 venues, or a reset ahead of the open
+                    series.session = session
+                series.cumulative, series.base = 0.0, 0.0
+            series.reported = cumulative
+            
+            volume = cumulative - series.base
+            delta = volume - series.cumulative
+            series.cumulative = volume
+            return max(delta, 0.0)  # A provider-side correction can step the total down
+    
+    def session_volume(self, ticker: str) -> Optional[float]:
+        series = self._series.get(ticker)
+        return series.cumulative if series is not None else None
+    
+    def average_volume(self, ticker: str) -> Optional[float]:
+        series = self._series.get(ticker)
+        return series.average() if series is not None else None
+    
+    def relative_volume(self, ticker: str) -> Optional[float]:
+        """Session volume as a multiple of the baseline daily average"""
+        series = self._series.get(ticker)
+        if series is None or series.cumulative is None:
+            return None
+        average = series.average()
+        return series.cumulative / average if average else None
+    
+    def __len__(self) -> int:
+        return len(self._series)
+
+
+def wilder_rsi(closes: np.ndarray, period: int = 14) -> Optional[float]:
+    """RSI with Wilder smoothing over a full close series (None if too short)"""
+    if len(closes) <= period:
+        return None
+    
+    changes = np.diff(closes)
+    gains = np.clip(changes, 0, None)
+    losses = np.clip(-changes, 0, None)
+    
+    avg_gain = gains[:period].mean()
+    avg_loss = losses[:period].mean()
+    for gain, loss in zip(gains[period:], losses[period:]):
+        avg_gain = (avg_gain * (period - 1) + gain) / period
+        avg_loss = (avg_loss * (period - 1) + loss) / period
+    
+    if avg_loss == 0:
+        return 100.0
+    return float(100 - 100 / (1 + avg_gain / avg_loss))
+
+
+# ============================================================================
+# INDICATORS
+# ============================================================================
+# Each indicator keeps rolling state over *closed* bars and updates it in
+# O(1) per bar. value(current) folds in the still-forming bar without
+# committing it, so the answer always matches a full recomputation over
+# every bar including the current one.
+
+class SMAState:
+    """Simple moving average: running sum over the last period-1 closed bars"""
+    
+    def __init__(self, period: int):
+        self.period = period
+        self.window = deque(maxlen=period - 1)
+        self.total = 0.0
+    
+    def update(self, close: float):
+        if self.period == 1:
+            return
+        if len(self.window) == self.window.maxlen:
+            self.total -= self.window[0]
+        self.window.append(close)
+        self.total += close
+    
+    def value(self, current: float) -> Optional[float]:
+        if len(self.window) < self.period - 1:
+            return None
+        return (self.total + current) / self.period
+
+
+class EMAState:
+    """Exponential moving average, seeded with the SMA of the first `period` bars"""
+    
+    def __init__(self, period: int):
+        self.period = period
+        self.alpha = 2 / (period + 1)
+        self.ema = None
+        self.seed = SMAState(period)
+    
+    def update(self, close: float):
+        if self.ema is None:
+            self.ema = self.seed.value(close)
+            self.seed.update(close)
+        else:
+            self.ema += self.alpha * (close - self.ema)
+    
+    def value(self, current: float) -> Optional[float]:
+        if self.ema is None:
+            return self.seed.value(current)
+        return self.ema + self.alpha * (current - self.ema)
+
+
+class RSIState:
+    """RSI with Wilder smoothing of average gains and losses"""
+    
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.prev_close = None
+        self.changes = 0
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+    
+    def _step(self, close: float) -> tuple[float, float]:
+        change = close - self.prev_close
+        gain, loss = max(change, 0.0), max(-change, 0.0)
+        if self.changes < self.period:
+            # Seeding: plain average of the first `period` changes
+            n = self.changes + 1
+            return (self.avg_gain * self.changes + gain) / n, (self.avg_loss * self.changes + loss) / n
+        return ((self.avg_gain * (self.period - 1) + gain) / self.period,
+                (self.avg_loss * (self.period - 1) + loss) / self.period)
+    
+    def update(self, close: float):
+        if self.prev_close is not None:
+            self.avg_gain, self.avg_loss = self._step(close)
+            self.changes += 1
+        self.prev_close = close
+    
+    def value(self, current: float) -> Optional[float]:
+        if self.prev_close is None or self.changes + 1 < self.period:
+            return None
+        avg_gain, avg_loss = self._step(current)
+        if avg_loss == 0:
+            return 100.0
+        return 100 - 100 / (1 + avg_gain / avg_loss)
+
+
+class MACDState:
+    """MACD line (fast EMA - slow EMA), its signal EMA, and the histogram"""
+    
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        self.fast = EMAState(fast)
+        self.slow = EMAState(slow)
+        self.signal = EMAState(signal)
+    
+    def update(self, close: float):
+        self.fast.update(close)
+        self.slow.update(close)
+        if self.slow.ema is not None:
+            self.signal.update(self.fast.ema - self.slow.ema)
+    
+    def value(self, current: float) -> Optional[tuple]:
+        """(macd, signal, histogram), or None until the signal line exists"""
+        fast, slow = self.fast.value(current), self.slow.value(current)
+        if fast is None or slow is None:
+            return None
+        macd = fast - slow
+        signal = self.signal.value(macd)
+        if signal is None:
+            return None
+        return macd, signal, macd - signal
+
+
+INDICATOR_STATES = {
+    "SMA": SMAState,
+    "EMA": EMAState,
+    "RSI": RSIState,
+    "MACD": MACDState,
+}
+
+
+class IndicatorEngine:
+    """
+    Incremental indicators over a BarStore
+    
+    State is kept per (ticker, indicator, params, resolution), resolution
+    None meaning the base bars; any other resolution subscribes the ticker
+    to that rolled-up timeframe. On each read, bars that have closed since
+    the last read (normally zero or one) are folded in; a new state is
+    warmed up once from the history already in the store. The still-forming
+    bar is always valued at the latest base-bar close.
+    """
+    
+    def __init__(self, bars: BarStore):
+        self.bars = bars
+        # key -> [state, closed bars folded in (as a BarBuffer.opened position)]
+        self._states: Dict[tuple, list] = {}
+    
+    def _series(self, ticker: str, resolution: Optional[int]) -> Optional[BarBuffer]:
+        """The bars an indicator at `resolution` folds (None: the base bars)"""
+        if resolution is None or resolution == self.bars.resolution:
+            return None
+        return self.bars.subscribe(ticker, resolution)
+    
+    def _entry(self, key: tuple) -> list:
+        entry = self._states.get(key)
+        if entry is None:
+            entry = self._states[key] = [INDICATOR_STATES[key[1]](*key[2]), 0]
+        return entry
+    
+    @staticmethod
+    def _read(entry: list, bars: BarBuffer, current: float):
+        state = entry[0]
+        # Fold in bars closed since last time - everything but the newest
+        closed = bars.opened - 1
+        new_bars = min(closed - entry[1], len(bars) - 1)
+        if new_bars > 0:
+            for close in bars.closes(new_bars + 1)[:-1].tolist():
+                state.update(close)
+            entry[1] = closed
+        
+        return state.value(current)
+    
+    def get(self, ticker: str, name: str, *params, resolution: int = None):
+        """Current indicator value for a ticker, or None without enough history"""
+        series = self._series(ticker, resolution)
+        base = self.bars.get(ticker)
+        if base is None or not len(base):
+            return None
+        if series is None:
+            series, resolution = base, None
+        return self._read(self._entry((ticker, name, params, resolution)), series, base.last_close)
+    
+    def handle(self, ticker: str, name: str, *params, resolution: int = None) -> Callable[[], Optional[object]]:
+        """
+        Reader bound to one (ticker, indicator, params, resolution)
+        
+        Same value as get(), with the state and price series resolved once
+        instead of looked up on every read. Shares state with get().
+        """
+        series = self._series(ticker, resolution)
+        entry = self._entry((ticker, name, params, None if series is None else resolution))
+        state_value = entry[0].value
+        store, read = self.bars, self._read
+        base = store.get(ticker)
+        
+        def value():
+            nonlocal base
+            if base is None:
+                base = store.get(ticker)
+                if base is None:
+                    return None
+            bars = base if series is None else series
+            if bars.opened - 1 == entry[1]:
+                return state_value(base.last_close)  # No bar closed since the last read
+            return read(entry, bars, base.last_close) if len(bars) else None
+        return value
+    
+    def __len__(self) -> int:
+        return len(self._states)
+
+
+# ============================================================================
+# MARKET CALENDAR
+# ============================================================================
+
+class SymbolClass(IntEnum):
+    """Kind of venue a ticker trades on, which picks its trading calendar"""
+    EQUITY = 0  # US-listed stocks and ETFs
+    CRYPTO = 1
+    
+    @classmethod
+    def of(cls, ticker: str) -> "SymbolClass":
+        """Classify by symbol shape: BTC-USD (Yahoo) and X:BTCUSD (Polygon) are crypto, the rest equities"""
+        if ticker.startswith("X:"):
+            return cls.CRYPTO
+        base, _, quote = ticker.rpartition("-")
+        if base and quote in Config.CRYPTO_QUOTE_CURRENCIES:
+            return cls.CRYPTO
+        return cls.EQUITY
+
+
+class TradingCalendar:
+    """When one kind of venue trades (subclass and register with a MarketCalendar)"""
+    
+    def is_open(self, timestamp: float) -> bool:
+        raise NotImplementedError
+    
+    def next_open(self, timestamp: float) -> float:
+        """Start of the next session after `timestamp` - `timestamp` itself while open"""
+        raise NotImplementedError
+    
+    def current_session(self, timestamp: float) -> Optional[float]:
+        """Open of the session in progress at `timestamp`, else of the next one (None: no sessions)"""
+        raise NotImplementedError
+
+
+class AlwaysOpen(TradingCalendar):
+    """A venue that never closes (crypto)"""
+    
+    def is_open(self, timestamp: float) -> bool:
+        return True
+    
+    def next_open(self, timestamp: float) -> float:
+        return timestamp
+    
+    def current_session(self, timestamp: float) -> Optional[float]:
+        return None
+
+
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    """The n-th `weekday` (Monday = 0) of a month; n = -1 for the last one"""
+    if n > 0:
+        first = date(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _easter(year: int) -> date:
+    """Western Easter Sunday (anonymous Gregorian algorithm)"""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def nyse_holidays(year: int) -> set:
+    """Full-day NYSE closures in a year, by the exchange's standing rules"""
+    def observed(day: date) -> date:
+        # Saturday holidays close the Friday before, Sunday ones the Monday after
+        return day + timedelta(days={5: -1, 6: 1}.get(day.weekday(), 0))
+    
+    holidays = {
+        _nth_weekday(year, 1, 0, 3),  # Martin Luther King Jr. Day
+        _nth_weekday(year, 2, 0, 3),  # Washington's Birthday
+        _easter(year) - timedelta(days=2),  # Good Friday
+        _nth_weekday(year, 5, 0, -1),  # Memorial Day
+        observed(date(year, 7, 4)),  # Independence Day
+        _nth_weekday(year, 9, 0, 1),  # Labor Day
+        _nth_weekday(year, 11, 3, 4),  # Thanksgiving
+        observed(date(year, 12, 25)),  # Christmas
+    }
+    new_year = date(year, 1, 1)
+    if new_year.weekday() != 5:  # A Saturday New Year's Day isn't made up on December 31
+        holidays.add(observed(new_year))
+    if year >= 2022:
+        holidays.add(observed(date(year, 6, 19)))  # Juneteenth
+    return holidays
+
+
+class ExchangeCalendar(TradingCalendar):
+    """
+    One session per weekday in the exchange's time zone, closed on holidays
+    
+    Early closes (the day after Thanksgiving, Christmas Eve) count as full
+    sessions: the extra hours are polled for nothing, but nothing is missed.
+    `closures` adds one-off dates such as a national day of mourning.
+    """
+    
+    MAX_CLOSED_DAYS = 30  # Gives up looking for the next session after this many days
+    
+    def __init__(self, timezone: str = Config.MARKET_TIMEZONE, session: tuple = Config.EQUITY_SESSION,
+                 holidays: Callable[[int], set] = nyse_holidays, closures=()):
+        self.timezone = ZoneInfo(timezone)
+        self.opens, self.closes = (datetime.strptime(hhmm, "%H:%M").time() for hhmm in session)
+        self.holidays = holidays
+        self.closures = set(closures)
+        self._years: Dict[int, set] = {}  # Holidays by year, computed on first use
+        self._span = (0.0, 0.0, False)  # [start, end) and state of the most recent stretch looked up
+        self._current = (0.0, 0.0, 0.0)  # [start, end) over which current_session() gives the third value
+    
+    def trading_day(self, day: date) -> bool:
+        if day.weekday() >= 5 or day in self.closures:
+            return False
+        holidays = self._years.get(day.year)
+        if holidays is None:
+            holidays = self._years[day.year] = self.holidays(day.year)
+        return day not in holidays
+    
+    def session(self, timestamp: float) -> tuple:
+        """(open, close) of the session in progress at `timestamp`, or else the next one"""
+        day = datetime.fromtimestamp(timestamp, self.timezone).date()
+        for _ in range(self.MAX_CLOSED_DAYS):
+            if self.trading_day(day):
+                opens = datetime.combine(day, self.opens, self.timezone).timestamp()
+                closes = datetime.combine(day, self.closes, self.timezone).timestamp()
+                if timestamp < closes:
+                    return opens, closes
+            day += timedelta(days=1)
+        raise ValueError(f"No session within {self.MAX_CLOSED_DAYS} days of {datetime.fromtimestamp(timestamp)}")
+    
+    def is_open(self, timestamp: float) -> bool:
+        start, end, is_open = self._span
+        if start <= timestamp < end:
+            return is_open
+        opens, closes = self.session(timestamp)
+        is_open = opens <= timestamp
+        self._span = (timestamp, closes if is_open else opens, is_open)
+        return is_open
+    
+    def next_open(self, timestamp: float) -> float:
+        return max(self.session(timestamp)[0], timestamp)
+    
+    def current_session(self, timestamp: float) -> Optional[float]:
+        start, end, opens = self._current
+        if start <= timestamp < end:
+            return opens
+        opens, closes = self.session(timestamp)
+        self._current = (timestamp, closes, opens)
+        return opens
+
+
+class MarketCalendar:
+    """
+    Which tickers' venues are trading, from offline calendars per symbol class
+    
+    Equities follow the NYSE session and holidays; crypto never closes.
+    Use register() to plug in another calendar for a class. A class with
+    no calendar counts as always open, so its tickers are never held back.
+    """
+    
+    def __init__(self, calendars: Dict[SymbolClass, TradingCalendar] = None):
+        self.calendars = calendars if calendars is not None else {
+            SymbolClass.EQUITY: ExchangeCalendar(),
+            SymbolClass.CRYPTO: AlwaysOpen(),
+        }
+        self._always_open = AlwaysOpen()
+        self._classes: Dict[str, SymbolClass] = {}  # Ticker -> symbol class, classified on first use
+    
+    def register(self, symbol_class: SymbolClass, calendar: TradingCalendar):
+        self.calendars[symbol_class] = calendar
+    
+    def for_ticker(self, ticker: str) -> TradingCalendar:
+        symbol_class = self._classes.get(ticker)
+        if symbol_class is None:
+            symbol_class = self._classes[ticker] = SymbolClass.of(ticker)
+        return self.calendars.get(symbol_class, self._always_open)
+    
+    def is_open(self, ticker: str, timestamp: float = None) -> bool:
+        return self.for_ticker(ticker).is_open(time.time() if timestamp is None else timestamp)
+    
+    def next_open(self, ticker: str, timestamp: float = None) -> float:
+        return self.for_ticker(ticker).next_open(time.time() if timestamp is None else timestamp)
+    
+    def current_session(self, ticker: str, timestamp: float) -> Optional[float]:
+        return self.for_ticker(ticker).current_session(timestamp)
+    
+    def next_open_of(self, tickers, timestamp: float = None) -> float:
+        """When the first venue among `tickers` opens (`timestamp` if one already is)"""
+        now = time.time() if timestamp is None else timestamp
+        calendars = {id(calendar): calendar for calendar in map(self.for_ticker, tickers)}
+        return min((calendar.next_open(now) for calendar in calendars.values()), default=now)
+    
+    def closed(self, tickers, timestamp: float = None) -> set:
+        """Those of `tickers` whose venue is closed at `timestamp` (default: now)"""
+        now = time.time() if timestamp is None else timestamp
+        states: Dict[int, bool] = {}  # Calendar -> open, looked up once per call
+        closed = set()
+        for ticker in tickers:
+            calendar = self.for_ticker(ticker)
+            is_open = states.get(id(calendar))
+            if is_open is None:
+                is_open = states[id(calendar)] = calendar.is_open(now)
+            if not is_open:
+                closed.add(ticker)
+        return closed
+
+
+# ============================================================================
+# MARKET DATA PROVIDER
+# ============================================================================
+
+class TokenBucket:
+    """Thread-safe token-bucket rate limiter"""
+    
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self, deadline: float = None) -> bool:
+        """
+        Take one token, waiting for it if needed
+        
+        Returns False instead of waiting past `deadline` (a time.monotonic() value).
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+                wait_for = (1 - self.tokens) / self.rate
+            
+            if deadline is not None and now + wait_for > deadline:
+                return False
+            time.sleep(wait_for)
+
+
+class QuoteCache:
+    """
+    Thread-safe TTL + LRU cache of latest quotes
+    
+    Shared by everything in the process (monitor, checker, web endpoints)
+    so a quote fetched once is reused until it goes stale.
+    """
+    
+    def __init__(self, max_size: int = Config.QUOTE_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries: OrderedDict = OrderedDict()  # key -> (price, expires_at)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, key) -> Optional[float]:
+        """Fresh cached value, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] <= time.monotonic():
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+    
+    def put(self, key, price: float, ttl: float):
+        with self._lock:
+            self._entries[key] = (price, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+    
+    def __str__(self) -> str:
+        return (f"{len(self)} cached, {self.hits} hits / {self.misses} misses "
+                f"({self.hit_rate:.0%} hit rate), {self.evictions} evicted")
+
+
+_quote_cache: Optional[QuoteCache] = None
+_quote_cache_lock = threading.Lock()
+
+
+def get_quote_cache() -> QuoteCache:
+    """Get the process-wide quote cache"""
+    global _quote_cache
+    with _quote_cache_lock:
+        if _quote_cache is None:
+            _quote_cache = QuoteCache()
+        return _quote_cache
+
+
+class Quote(NamedTuple):
+    """One upstream quote: last price plus whatever volume fields the provider sent"""
+    price: float
+    volume: Optional[float] = None  # Cumulative volume for the current session
+    average_volume: Optional[float] = None  # Provider's daily average, seeds the baseline
+
+
+def _number(value) -> Optional[float]:
+    return float(value) if value is not None else None
+
+
+class MarketData:
+    """Fetches real-time market data"""
+    
+    # Max symbols per multi-symbol quote request
+    YAHOO_BATCH_SIZE = 100
+    POLYGON_BATCH_SIZE = 250
+    
+    def __init__(self, http: HttpClient = None, cache: QuoteCache = None):
+        self.http = http or get_http_client()
+        self.cache = cache if cache is not None else get_quote_cache()  # An empty cache is falsy
+        self.calendar = MarketCalendar() if Config.MARKET_HOURS else None  # None: every venue counts as open
+        self.bars = BarStore()
+        self.volumes = VolumeTracker(calendar=self.calendar)
+        self.indicators = IndicatorEngine(self.bars)
+        self.use_free = Config.USE_FREE_DATA
+        self.polygon_key = Config.POLYGON_API_KEY
+        self.yahoo_url = Config.YAHOO_API_URL
+        self.yahoo_cookie_url = Config.YAHOO_COOKIE_URL
+        self._yahoo_headers = {"User-Agent": Config.YAHOO_USER_AGENT}  # Yahoo throttles library user agents
+        self._crumb: Optional[str] = None
+        self._crumb_lock = threading.Lock()
+        self.polygon_url = Config.POLYGON_API_URL
+        self.rate_limits = {provider: TokenBucket(rate, burst)
+                            for provider, (rate, burst) in Config.RATE_LIMITS.items()}
+        self._executor = ThreadPoolExecutor(Config.FETCH_CONCURRENCY, thread_name_prefix="quotes")
+        self._stats_lock = threading.Lock()
+        self.requests_made = 0  # Upstream HTTP requests, for stats/benchmarks
+        self.missing = 0  # Tickers left without a quote (deadline, rate limit or provider gap)
+    
+    @property
+    def provider(self) -> str:
+        return "yahoo" if self.use_free else "polygon"
+    
+    @property
+    def batch_size(self) -> int:
+        """Tickers per batch quote request"""
+        return self.YAHOO_BATCH_SIZE if self.use_free else self.POLYGON_BATCH_SIZE
+    
+    def _throttle(self, deadline: float = None) -> bool:
+        """Wait for a rate-limit token and count the request it allows"""
+        if not self.rate_limits[self.provider].acquire(deadline):
+            return False
+        with self._stats_lock:
+            self.requests_made += 1
+        return True
+    
+    def get_price(self, ticker: str) -> Optional[float]:
+        """Get current price"""
+        price = self.cache.get((self.provider, ticker))
+        if price is not None:
+            return price
+        
+        if self.use_free:
+            quote = self._get_quote_yahoo(ticker)
+        else:
+            quote = self._get_quote_polygon(ticker)
+        
+        self._record_quote(ticker, quote)
+        return quote.price if quote else None
+    
+    def _record_quote(self, ticker: str, quote: Optional[Quote], timestamp: float = None):
+        """Remember a freshly fetched quote and add it to the price and volume history"""
+        if quote is None:
+            return
+        now = time.time() if timestamp is None else timestamp
+        ttl = Config.QUOTE_TTL[self.provider]
+        if timestamp is None and self.calendar is not None:
+            # Fetched while the venue is closed, it's the last close until the next open
+            ttl = max(ttl, self.calendar.next_open(ticker, now) - now)
+        self.cache.put((self.provider, ticker), quote.price, ttl)
+        traded = self.volumes.record(ticker, quote.volume, now, quote.average_volume)
+        self.bars.record(ticker, quote.price, now, traded)
+    
+    def get_prices(self, tickers: List[str], timeout: float = Config.QUOTE_DEADLINE) -> Dict[str, Optional[float]]:
+        """
+        Get current prices for many tickers in as few requests as possible
+        
+        Fresh quotes come straight from the cache. The rest are fetched in
+        batches, in parallel (up to Config.FETCH_CONCURRENCY in flight,
+        rate-limited per provider). Tickers still outstanding after
+        `timeout` seconds are skipped, as are tickers missing from the
+        provider's response - both map to None. If a whole batch request
+        fails, its tickers are retried one at a time.
+        """
+        prices = {ticker: self.cache.get((self.provider, ticker)) for ticker in dict.fromkeys(tickers)}
+        tickers = [ticker for ticker, price in prices.items() if price is None]
+        
+        batch_size = self.batch_size
+        chunks = [tickers[i:i + batch_size] for i in range(0, len(tickers), batch_size)]
+        deadline = time.monotonic() + timeout
+        
+        fetched: Dict[str, Quote] = {}
+        failed = []
+        for chunk, quotes in self._run_concurrently(self._fetch_batch, chunks, deadline):
+            if quotes is None:
+                failed.extend(chunk)
+            else:
+                fetched.update(quotes)
+        
+        if failed:
+            print(f"Batch quote failed for {len(failed)} tickers; falling back to single quotes")
+            for ticker, quote in self._run_concurrently(self._fetch_single, failed, deadline):
+                if quote is not None:
+                    fetched[ticker] = quote
+        
+        for ticker in tickers:
+            quote = fetched.get(ticker)
+            prices[ticker] = quote.price if quote else None
+            self._record_quote(ticker, quote)
+        
+        missing = sum(1 for price in prices.values() if price is None)
+        with self._stats_lock:
+            self.missing += missing
+        return prices
+    
+    def _run_concurrently(self, fetch, items: list, deadline: float):
+        """
+        Yield (item, fetch(item, deadline)) for items finished by `deadline`
+        
+        Runs on the shared pool when Config.CONCURRENT_FETCH is set, so the
+        wall time is roughly the slowest fetch rather than the sum of them.
+        Inline fetches are bounded by the deadline through their HTTP timeouts.
+        """
+        if not Config.CONCURRENT_FETCH or len(items) == 1:
+            for item in items:
+                if time.monotonic() >= deadline:
+                    return
+                yield item, fetch(item, deadline)
+            return
+        
+        futures = {self._executor.submit(fetch, item, deadline): item for item in items}
+        done, not_done = wait(futures, timeout=max(0.0, deadline - time.monotonic()))
+        for future in not_done:
+            future.cancel()  # Stragglers already running just finish unobserved
+        for future in done:
+            yield futures[future], future.result()
+    
+    def _fetch_batch(self, chunk: List[str], deadline: float) -> Optional[Dict[str, Quote]]:
+        """One multi-symbol request; {} if rate-limited past the deadline, None if it failed"""
+        if not self._throttle(deadline):
+            return {}
+        try:
+            if self.use_free:
+                return self._get_quotes_yahoo(chunk, deadline)
+            return self._get_quotes_polygon(chunk, deadline)
+        except Exception as e:
+            print(f"Batch quote failed: {e}")
+            return None
+    
+    def _fetch_single(self, ticker: str, deadline: float) -> Optional[Quote]:
+        """One single-symbol request, unless rate-limited past the deadline"""
+        if self.use_free:
+            return self._get_quote_yahoo(ticker, deadline)
+        return self._get_quote_polygon(ticker, deadline)
+    
+    def _get_quotes_yahoo(self, tickers: List[str], deadline: float = None) -> Dict[str, Quote]:
+        """Yahoo Finance multi-symbol quote endpoint (needs a crumb, see _yahoo_crumb)"""
+        url = f"{self.yahoo_url}/v7/finance/quote"
+        
+        def get(crumb: str) -> requests.Response:
+            return self.http.get(url, params={"symbols": ",".join(tickers), "crumb": crumb},
+                                 headers=self._yahoo_headers, deadline=deadline)
+        
+        crumb = self._yahoo_crumb(deadline)
+        response = get(crumb)
+        if response.status_code == 401 and self._throttle(deadline):
+            response = get(self._yahoo_crumb(deadline, stale=crumb))  # Expired with its cookie: handshake again
+        response.raise_for_status()
+        
+        return {
+            quote['symbol']: Quote(float(quote['regularMarketPrice']),
+                                   _number(quote.get('regularMarketVolume')),
+                                   _number(quote.get('averageDailyVolume10Day')))
+            for quote in response.json()['quoteResponse']['result']
+            if quote.get('regularMarketPrice') is not None
+        }
+    
+    def _yahoo_crumb(self, deadline: float = None, stale: str = None) -> str:
+        """
+        Crumb for Yahoo's multi-symbol quotes, fetched once and shared
+        
+        /v7/finance/quote answers 401 "Invalid Crumb" unless the request
+        carries the session cookie fc.yahoo.com sets and the crumb
+        /v1/test/getcrumb issues for it (both kept on the shared HTTP
+        session). `stale` is a crumb that was just rejected.
+        """
+        with self._crumb_lock:
+            if self._crumb is None or self._crumb == stale:
+                self._crumb = None
+                for url in (self.yahoo_cookie_url, f"{self.yahoo_url}/v1/test/getcrumb"):
+                    if not self._throttle(deadline):
+                        raise TimeoutError("rate-limited past the deadline")
+                    response = self.http.get(url, headers=self._yahoo_headers, deadline=deadline)
+                response.raise_for_status()  # The cookie page itself answers 404; only the crumb must succeed
+                crumb = response.text.strip()
+                if not crumb or '<' in crumb:
+                    raise ValueError(f"no crumb in Yahoo's response: {crumb[:80]!r}")
+                self._crumb = crumb
+            return self._crumb
+    
+    def _get_quotes_polygon(self, tickers: List[str], deadline: float = None) -> Dict[str, Quote]:
+        """Polygon.io multi-ticker snapshot endpoint"""
+        url = f"{self.polygon_url}/v2/snapshot/locale/us/markets/stocks/tickers"
+        headers = {"Authorization": f"Bearer {self.polygon_key}"}
+        response = self.http.get(url, params={"tickers": ",".join(tickers)}, headers=headers, deadline=deadline)
+        response.raise_for_status()
+        
+        quotes = {}
+        for snapshot in response.json().get('tickers', []):
+            day, prev_day = snapshot.get('day') or {}, snapshot.get('prevDay') or {}
+            # Last trade if there is one, else today's / previous close
+            price = (snapshot.get('lastTrade') or {}).get('p') or day.get('c') or prev_day.get('c')
+            if price:
+                quotes[snapshot['ticker']] = Quote(float(price), _number(day.get('v')), _number(prev_day.get('v')))
+        return quotes
+    
+    def _get_quote_yahoo(self, ticker: str, deadline: float = None) -> Optional[Quote]:
+        """Yahoo Finance (free but unofficial)"""
+        if not self._throttle(deadline):
+            return None
+        try:
+            url = f"{self.yahoo_url}/v8/finance/chart/{ticker}"
+            response = self.http.get(url, headers=self._yahoo_headers, deadline=deadline)
+            
+            if response.status_code == 200:
+                data = response.json()
+                meta = data['chart']['result'][0]['meta']
+                return Quote(float(meta['regularMarketPrice']), _number(meta.get('regularMarketVolume')))
+        except Exception as e:
+            print(f"Error fetching {ticker}: {e}")
+        return None
+    
+    def _get_quote_polygon(self, ticker: str, deadline: float = None) -> Optional[Quote]:
+        """Polygon.io (paid but reliable)"""
+        if not self._throttle(deadline):
+            return None
+        try:
+            url = f"{self.polygon_url}/v2/aggs/ticker/{ticker}/prev"
+            headers = {"Authorization": f"Bearer {self.polygon_key}"}
+            response = self.http.get(url, headers=headers, deadline=deadline)
+            
+            if response.status_code == 200:
+                data = response.json()
+                bar = data['results'][0]  # Previous session: close price, and its volume as a baseline
+                return Quote(float(bar['c']), None, _number(bar.get('v')))
+        except Exception as e:
+            print(f"Error fetching {ticker}: {e}")
+        return None
+    
+    def calculate_rsi(self, ticker: str, period: int = 14, timeframe: str = None) -> Optional[float]:
+        """Calculate RSI from recorded bars (None until enough history exists)"""
+        return self.indicators.get(ticker, "RSI", period, resolution=timeframe_resolution({'timeframe': timeframe}))
+    
+    def get_moving_average(self, ticker: str, period: int, timeframe: str = None) -> Optional[float]:
+        """Get simple moving average of bar closes (None until enough history exists)"""
+        return self.indicators.get(ticker, "SMA", period, resolution=timeframe_resolution({'timeframe': timeframe}))
+    
+    def get_ema(self, ticker: str, period: int, timeframe: str = None) -> Optional[float]:
+        """Get exponential moving average of bar closes"""
+        return self.indicators.get(ticker, "EMA", period, resolution=timeframe_resolution({'timeframe': timeframe}))
+    
+    def get_macd(self, ticker: str, fast: int = 12, slow: int = 26, signal: int = 9,
+                 timeframe: str = None) -> Optional[tuple]:
+        """Get (macd, signal, histogram)"""
+        return self.indicators.get(ticker, "MACD", fast, slow, signal,
+                                   resolution=timeframe_resolution({'timeframe': timeframe}))
+    
+    def ingest(self, tick: "Tick"):
+        """Take in a pushed quote (see QuoteStream) exactly as if it had been fetched"""
+        self._record_quote(tick.ticker, Quote(tick.price, tick.volume), tick.timestamp)
+    
+    def get_volume(self, ticker: str) -> Optional[float]:
+        """Shares traded so far this session (from the quotes already fetched)"""
+        return self.volumes.session_volume(ticker)
+    
+    def get_relative_volume(self, ticker: str) -> Optional[float]:
+        """Session volume as a multiple of the rolling average daily volume"""
+        return self.volumes.relative_volume(ticker)
+
+
+# ============================================================================
+# QUOTE STREAMING
+# ============================================================================
+# Sources of pushed quotes for streaming mode (TradingAlertSystem.stream).
+# A stream is an async iterator of Ticks; subscribe() can be called again at
+# any time as strategies on new tickers appear.
+
+class Tick(NamedTuple):
+    ticker: str
+    price: float
+    volume: Optional[float] = None  # Shares traded so far this session, if the source reports it
+    timestamp: Optional[float] = None  # When the quote was made (epoch seconds); None = on arrival
+
+
+class QuoteStream:
+    """Base class for pushed-quote sources"""
+    
+    def __init__(self):
+        self.tickers: set = set()
+    
+    async def subscribe(self, tickers: List[str]):
+        """Start receiving quotes for `tickers` (in addition to those already subscribed)"""
+        self.tickers.update(tickers)
+    
+    def __aiter__(self):
+        return self.ticks()
+    
+    async def ticks(self):
+        """Yield Ticks as they arrive, reconnecting as needed, until closed"""
+        raise NotImplementedError
+        yield
+    
+    async def close(self):
+        pass
+
+
+class JsonLinesQuoteStream(QuoteStream):
+    """
+    Quotes over a plain TCP connection, one JSON object per line
+    
+    The client sends {"action": "subscribe", "tickers": [...]} and receives
+    {"ticker", "price", "volume", "timestamp"} lines - the protocol of the
+    stub stream server in benchmarks.py, and simple to bridge any feed into.
+    """
+    
+    def __init__(self, host: str = "127.0.0.1", port: int = 8765):
+        super().__init__()
+        self.host, self.port = host, port
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._closed = False
+    
+    async def _send_subscribe(self, tickers):
+        self._writer.write(json.dumps({"action": "subscribe", "tickers": sorted(tickers)}).encode() + b"\n")
+        await self._writer.drain()
+    
+    async def subscribe(self, tickers: List[str]):
+        new = set(tickers) - self.tickers
+        await super().subscribe(tickers)
+        if new and self._writer is not None:
+            await self._send_subscribe(new)
+    
+    async def ticks(self):
+        while not self._closed:
+            try:
+                reader, self._writer = await asyncio.open_connection(self.host, self.port)
+                if self.tickers:
+                    await self._send_subscribe(self.tickers)
+                async for line in reader:
+                    try:
+                        data = json.loads(line)
+                        yield Tick(data['ticker'], float(data['price']), _number(data.get('volume')),
+                                   _number(data.get('timestamp')))
+                    except (ValueError, KeyError, TypeError) as e:
+                        print(f"Bad stream message {line[:80]!r}: {e}")
+            except OSError as e:
+                print(f"Quote stream {self.host}:{self.port} unavailable: {e}")
+            finally:
+                if self._writer is not None:
+                    self._writer.close()
+                    self._writer = None
+            if not self._closed:
+                await asyncio.sleep(Config.STREAM_RECONNECT_DELAY)
+    
+    async def close(self):
+        self._closed = True
+        if self._writer is not None:
+            self._writer.close()
+
+
+class PolygonQuoteStream(QuoteStream):
+    """
+    Polygon's per-second aggregates ("A.<ticker>") over its websocket API
+    
+    Each aggregate carries the close and the session's accumulated volume.
+    Needs the `websockets` package (in requirements.txt).
+    """
+    
+    def __init__(self, api_key: str = Config.POLYGON_API_KEY, url: str = Config.POLYGON_STREAM_URL):
+        super().__init__()
+        self.api_key, self.url = api_key, url
+        self._socket = None
+    
+    async def _send_subscribe(self, tickers):
+        await self._socket.send(json.dumps({"action": "subscribe",
+                                            "params": ",".join(f"A.{t}" for t in sorted(tickers))}))
+    
+    async def subscribe(self, tickers: List[str]):
+        new = set(tickers) - self.tickers
+        await super().subscribe(tickers)
+        if new and self._socket is not None:
+            await self._send_subscribe(new)
+    
+    async def ticks(self):
+        import websockets
+        
+        async for socket in websockets.connect(self.url):  # Reconnects with backoff
+            try:
+                await socket.send(json.dumps({"action": "auth", "params": self.api_key}))
+                self._socket = socket
+                if self.tickers:
+                    await self._send_subscribe(self.tickers)
+                async for message in socket:
+                    for event in json.loads(message):
+                        if event.get('ev') == 'A':
+                            yield Tick(event['sym'], float(event['c']), _number(event.get('av')),
+                                       event['e'] / 1000 if event.get('e') else None)
+                        elif event.get('ev') == 'status' and event.get('status') == 'auth_failed':
+                            raise PermissionError(event.get('message', 'auth failed'))
+            except websockets.ConnectionClosed:
+                continue
+            finally:
+                self._socket = None
+    
+    async def close(self):
+        if self._socket is not None:
+            await self._socket.close()
+
+
+class ReplayQuoteStream(QuoteStream):
+    """
+    Recorded ticks played back offline - a JSON-lines file (as sent by
+    JsonLinesQuoteStream servers) or a list of Ticks
+    
+    Gaps between ticks are kept, divided by `speed` (0 = as fast as
+    possible), and timestamps are shifted to the time of playback.
+    """
+    
+    def __init__(self, source, speed: float = 1.0):
+        super().__init__()
+        self.source, self.speed = source, speed
+    
+    def _recorded(self):
+        if not isinstance(self.source, str):
+            yield from self.source
+            return
+        with open(self.source) as f:
+            for line in f:
+                if line.strip():
+                    data = json.loads(line)
+                    yield Tick(data['ticker'], float(data['price']), _number(data.get('volume')),
+                               _number(data.get('timestamp')))
+    
+    async def ticks(self):
+        first = start = None
+        for tick in self._recorded():
+            if self.tickers and tick.ticker not in self.tickers:
+                continue
+            recorded = tick.timestamp or 0.0
+            if first is None:
+                first, start = recorded, time.time()
+            due = start + (recorded - first) / self.speed if self.speed else time.time()
+            delay = due - time.time()
+            await asyncio.sleep(max(delay, 0))
+            yield tick._replace(timestamp=due)
+
+
+# ============================================================================
+# ALERT SYSTEM
 # ============================================================================
-# ALERT SYSTEM
-# ============================================================================
 
 class AlertSystem:
     """Sends alerts to users"""
@@ -445,91 +2607,1241 @@ class AlertSystem:
         # For now, just email
         self.send_email(user_email, "🚨 Trading Alert", message)
         
-        # If phone provided, send SMS
-        if user_phone:
-            self.send_sms(user_phone, message)
+        # If phone provided, send SMS
+        if user_phone:
+            self.send_sms(user_phone, message)
+
+
+# ============================================================================
+# STRATEGY CHECKER
+# ============================================================================
+
+@dataclass
+class FetchStats:
+    """Quote lookups requested by strategies vs. quotes and HTTP requests actually made"""
+    lookups: int = 0
+    fetches: int = 0
+    requests: int = 0
+    missing: int = 0
+    
+    @property
+    def dedup_ratio(self) -> float:
+        return self.lookups / self.fetches if self.fetches else 0.0
+    
+    def __str__(self) -> str:
+        return (f"{self.fetches} quotes fetched for {self.lookups} lookups "
+                f"({self.dedup_ratio:.1f}x dedup) in {self.requests} requests, {self.missing} missing")
+
+
+# Alert text per (type, condition); `value` is the indicator reading
+ALERT_MESSAGES = {
+    (StrategyType.PRICE, Condition.ABOVE): "{ticker} broke above ${threshold}! Currently at ${value:.2f}",
+    (StrategyType.PRICE, Condition.BELOW): "{ticker} dropped below ${threshold}! Currently at ${value:.2f}",
+    (StrategyType.RSI, Condition.BELOW): "{ticker} RSI dropped to {value:.1f} (below {threshold}) - Oversold!",
+    (StrategyType.RSI, Condition.ABOVE): "{ticker} RSI rose to {value:.1f} (above {threshold}) - Overbought!",
+    (StrategyType.MACD, Condition.ABOVE): "{ticker} MACD {line:.2f} moved above its signal line {signal:.2f} - Bullish!",
+    (StrategyType.MACD, Condition.BELOW): "{ticker} MACD {line:.2f} moved below its signal line {signal:.2f} - Bearish!",
+    (StrategyType.MA_CROSS, Condition.ABOVE): "{ticker} {fast_period}-bar MA {fast:.2f} is above the {slow_period}-bar MA {slow:.2f}",
+    (StrategyType.MA_CROSS, Condition.BELOW): "{ticker} {fast_period}-bar MA {fast:.2f} is below the {slow_period}-bar MA {slow:.2f}",
+    (StrategyType.PRICE, Condition.CROSSES_ABOVE): "{ticker} crossed above ${threshold}! Currently at ${value:.2f}",
+    (StrategyType.PRICE, Condition.CROSSES_BELOW): "{ticker} crossed below ${threshold}! Currently at ${value:.2f}",
+    (StrategyType.RSI, Condition.CROSSES_ABOVE): "{ticker} RSI crossed above {threshold} (now {value:.1f})",
+    (StrategyType.RSI, Condition.CROSSES_BELOW): "{ticker} RSI crossed below {threshold} (now {value:.1f})",
+    (StrategyType.MACD, Condition.CROSSES_ABOVE): "{ticker} MACD {line:.2f} crossed above its signal line {signal:.2f} - Bullish!",
+    (StrategyType.MACD, Condition.CROSSES_BELOW): "{ticker} MACD {line:.2f} crossed below its signal line {signal:.2f} - Bearish!",
+    (StrategyType.MA_CROSS, Condition.CROSSES_ABOVE): "{ticker} {fast_period}-bar MA {fast:.2f} crossed above the {slow_period}-bar MA {slow:.2f} - Golden cross!",
+    (StrategyType.MA_CROSS, Condition.CROSSES_BELOW): "{ticker} {fast_period}-bar MA {fast:.2f} crossed below the {slow_period}-bar MA {slow:.2f} - Death cross!",
+    (StrategyType.VOLUME, Condition.ABOVE): "{ticker} volume hit {value:,.0f} shares today (above {threshold:,.0f})",
+    (StrategyType.VOLUME, Condition.BELOW): "{ticker} volume is only {value:,.0f} shares today (below {threshold:,.0f})",
+    (StrategyType.VOLUME, Condition.CROSSES_ABOVE): "{ticker} volume crossed {threshold:,.0f} shares today (now {value:,.0f})",
+    (StrategyType.VOLUME, Condition.CROSSES_BELOW): "{ticker} volume fell below {threshold:,.0f} shares (now {value:,.0f})",
+}
+
+# MA_CROSS compares a fast and a slow simple moving average of bar closes;
+# fast = 1 means the price itself
+MA_CROSS_DEFAULTS = {'fast': 50, 'slow': 200}
+
+LEVEL_OPERATORS = {Condition.ABOVE: operator.gt, Condition.BELOW: operator.lt}
+
+COMPOSITE_MESSAGE = "{ticker} matched {expression}"
+
+# VOLUME with parameters {"relative": true} compares the session's volume,
+# as a multiple of the rolling average daily volume, with the threshold
+RELATIVE_VOLUME_MESSAGES = {
+    Condition.ABOVE: "{ticker} volume is {value:.1f}x its daily average (above {threshold}x) - Unusual activity!",
+    Condition.BELOW: "{ticker} volume is only {value:.2f}x its daily average (below {threshold}x)",
+    Condition.CROSSES_ABOVE: "{ticker} volume crossed {threshold}x its daily average (now {value:.1f}x)",
+    Condition.CROSSES_BELOW: "{ticker} volume fell below {threshold}x its daily average (now {value:.2f}x)",
+}
+
+
+def is_relative_volume(params: Optional[Dict]) -> bool:
+    return bool(params and params.get('relative'))
+
+# Relative cost of reading a composite term that isn't cached yet this cycle;
+# quotes for other tickers than the strategy's aren't prefetched, so they
+# cost a request
+TERM_COSTS = {StrategyType.PRICE: 1, StrategyType.VOLUME: 1, StrategyType.RSI: 2, StrategyType.MA_CROSS: 2,
+              StrategyType.MACD: 3}
+UNFETCHED_QUOTE_COST = 10
+
+
+def _never() -> Optional[str]:
+    """Compiled form of a strategy that can't trigger here"""
+    return None
+
+
+@dataclass
+class IndicatorStats:
+    """Indicator inputs requested by strategies vs. distinct indicators computed"""
+    requested: int = 0
+    computed: int = 0
+    
+    @property
+    def unique_ratio(self) -> float:
+        return self.computed / self.requested if self.requested else 0.0
+    
+    def __str__(self) -> str:
+        return (f"{self.computed} indicators computed for {self.requested} strategy inputs "
+                f"({self.unique_ratio:.1%} unique)")
+
+
+class IndicatorSlot:
+    """One (ticker, indicator, params, resolution) value shared by every strategy that needs it"""
+    
+    __slots__ = ('key', 'read', 'plan', 'value', 'epoch', 'refs')
+    
+    def __init__(self, key: tuple, read: Callable, plan: "IndicatorPlan"):
+        self.key = key
+        self.read = read
+        self.plan = plan
+        self.value = None
+        self.epoch = -1  # Plan cycle `value` was computed in
+        self.refs = 0
+    
+    @property
+    def fresh(self) -> bool:
+        """Already computed this cycle, so reading it is free"""
+        return self.epoch == self.plan.epoch
+    
+    def current(self):
+        """This cycle's value, computed on first use"""
+        plan = self.plan
+        if self.epoch != plan.epoch:
+            self.value = self.read()
+            self.epoch = plan.epoch
+            plan.stats.computed += 1
+        return self.value
+
+
+class IndicatorPlan:
+    """
+    The distinct indicators the active strategies depend on
+    
+    Many strategies ask for the same series ("AAPL RSI 14", "SPY 50-bar
+    SMA" on 1h bars), so each (ticker, indicator, params, resolution) gets
+    one slot, reference
+    counted by the strategies that need it. Every reader - batch, crossing
+    tracker, compiled predicates, check() - goes through the slot, which
+    computes its value at most once per cycle, on first use; slots nothing
+    asks for this cycle (say, behind a short-circuited composite term) are
+    never computed. Reference counts follow the strategies as a
+    StrategyListener.
+    """
+    
+    def __init__(self, engine: IndicatorEngine):
+        self.engine = engine
+        self.slots: Dict[tuple, IndicatorSlot] = {}
+        self.requested = 0
+        self.epoch = 0
+        self.stats = IndicatorStats()
+    
+    @staticmethod
+    def term_requirements(ticker: str, strategy_type: StrategyType, params: Dict) -> List[tuple]:
+        """(ticker, indicator, params, resolution) keys one level condition reads"""
+        resolution = timeframe_resolution(params)
+        if strategy_type == StrategyType.RSI:
+            return [(ticker, "RSI", (14,), resolution)]
+        if strategy_type == StrategyType.MACD:
+            return [(ticker, "MACD", (params.get('fast', 12), params.get('slow', 26), params.get('signal', 9)),
+                     resolution)]
+        if strategy_type == StrategyType.MA_CROSS:
+            return [(ticker, "SMA", (params.get('fast', MA_CROSS_DEFAULTS['fast']),), resolution),
+                    (ticker, "SMA", (params.get('slow', MA_CROSS_DEFAULTS['slow']),), resolution)]
+        return []
+    
+    @classmethod
+    def requirements(cls, strategy: Strategy) -> List[tuple]:
+        """(ticker, indicator, params, resolution) keys a strategy reads"""
+        params = strategy.parameters or {}
+        if strategy.type == StrategyType.COMPOSITE:
+            return [key for ticker, strategy_type, term_params in composite_terms(strategy)
+                    for key in cls.term_requirements(ticker, strategy_type, term_params)]
+        return cls.term_requirements(strategy.ticker, strategy.type, params)
+    
+    def slot(self, key: tuple) -> IndicatorSlot:
+        """The shared slot for `key`, created on first use"""
+        slot = self.slots.get(key)
+        if slot is None:
+            ticker, name, params, resolution = key
+            slot = self.slots[key] = IndicatorSlot(
+                key, self.engine.handle(ticker, name, *params, resolution=resolution), self)
+        return slot
+    
+    def reset(self, strategies: List[Strategy]):
+        self.slots = {}
+        self.requested = 0
+        for strategy in strategies:
+            self.strategy_added(strategy)
+    
+    def strategy_added(self, strategy: Strategy):
+        for key in self.requirements(strategy):
+            self.slot(key).refs += 1
+            self.requested += 1
+    
+    def strategy_removed(self, strategy: Strategy):
+        for key in self.requirements(strategy):
+            slot = self.slots.get(key)
+            if slot is None:
+                continue
+            slot.refs -= 1
+            self.requested -= 1
+            if slot.refs <= 0:
+                del self.slots[key]
+    
+    def begin_cycle(self) -> IndicatorStats:
+        """Invalidate every slot; returns this cycle's stats, filled in as slots are read"""
+        self.epoch += 1
+        self.stats = IndicatorStats(self.requested)
+        return self.stats
+
+
+class LevelTerm:
+    """Leaf of a composite strategy: one above/below condition on a reading"""
+    
+    __slots__ = ('label', 'read', 'ready', 'compare', 'level', 'cost')
+    
+    def __init__(self, label: str, read: Callable, ready: Callable, compare: Callable,
+                 level: float, cost: int):
+        self.label = label
+        self.read = read  # -> current reading, or None without data
+        self.ready = ready  # -> True when reading is free (already fetched/computed this cycle)
+        self.compare = compare
+        self.level = level
+        self.cost = cost
+    
+    def __call__(self) -> bool:
+        value = self.read()
+        return value is not None and self.compare(value, self.level)
+
+
+class TermGroup:
+    """
+    all/any over sub-terms, short-circuiting on the first deciding term
+    
+    Terms whose inputs are already cached this cycle go first; the rest
+    run cheapest first, and only until the outcome is known - so an
+    expensive indicator behind a failed cheap check is never computed.
+    Missing data counts as False.
+    """
+    
+    __slots__ = ('match_any', 'terms', 'label', 'cost')
+    
+    def __init__(self, match_any: bool, terms: list):
+        self.match_any = match_any
+        self.label = "(" + (" OR " if match_any else " AND ").join(term.label for term in terms) + ")"
+        self.terms = sorted(terms, key=lambda term: term.cost)
+        self.cost = sum(term.cost for term in terms)
+    
+    def ready(self) -> bool:
+        return all(term.ready() for term in self.terms)
+    
+    def __call__(self) -> bool:
+        decisive = self.match_any  # True settles an any, False settles an all
+        deferred = []
+        for term in self.terms:
+            if not term.ready():
+                deferred.append(term)
+            elif term() == decisive:
+                return decisive
+        for term in deferred:
+            if term() == decisive:
+                return decisive
+        return not decisive
+
+
+class StrategyBatch:
+    """
+    Column-oriented view of many strategies for vectorized checking
+    
+    Level conditions (above/below) on PRICE, RSI, default MACD and VOLUME
+    (absolute or relative) are held as parallel numpy arrays - ticker index, value kind, condition and
+    threshold - so one comparison decides every row. Anything else is kept
+    in `fallback` for the per-strategy path.
+    
+    Strategies added between evaluations are appended in bulk before the
+    next one and removed ones are masked out, so the arrays are only
+    rebuilt from scratch on reset().
+    """
+    
+    # Rows of the per-cycle value matrix, indexed by StrategyType (-1 = not vectorizable).
+    # A list rather than a dict: hashing IntEnum members is slow at millions of rows.
+    PRICE, RSI, MACD, VOLUME, RELATIVE_VOLUME = range(5)
+    N_KINDS = 5
+    KIND_BY_TYPE = [-1] * len(StrategyType)
+    KIND_BY_TYPE[StrategyType.PRICE] = PRICE
+    KIND_BY_TYPE[StrategyType.RSI] = RSI
+    KIND_BY_TYPE[StrategyType.MACD] = MACD
+    KIND_BY_TYPE[StrategyType.VOLUME] = VOLUME
+    LEVEL_CONDITIONS = (Condition.ABOVE, Condition.BELOW)
+    
+    def __init__(self, strategies: List[Strategy] = (), exclude=None):
+        self.exclude = exclude  # Predicate for strategies some other structure checks
+        self.reset(strategies)
+    
+    def reset(self, strategies: List[Strategy]):
+        """Rebuild from scratch"""
+        self.strategies: List[Strategy] = []
+        self.fallback: Dict[int, Strategy] = {}
+        self.predicates: Dict[int, Callable] = {}  # Compiled fallback strategies (see StrategyChecker.compile)
+        self.tickers: List[str] = []
+        self._ticker_index: Dict[str, int] = {}
+        self._row: Dict[int, int] = {}
+        self._pending: List[Strategy] = []
+        self.dead = 0
+        
+        self.ticker_idx = np.empty(0, np.int32)
+        self.kind = np.empty(0, np.int8)
+        self.above = np.empty(0, bool)
+        self.threshold = np.empty(0, np.float64)
+        self.alive = np.empty(0, bool)
+        self.needed = [set() for _ in range(self.N_KINDS)]  # Ticker indexes a cycle must read, per kind
+        self._uses = [{} for _ in range(self.N_KINDS)]  # Live rows reading each ticker index, per kind
+        
+        for strategy in strategies:
+            self.strategy_added(strategy)
+        self.flush()
+    
+    @classmethod
+    def vectorizable(cls, strategy: Strategy) -> bool:
+        if cls.KIND_BY_TYPE[strategy.type] < 0 or strategy.condition not in cls.LEVEL_CONDITIONS:
+            return False
+        if strategy.type == StrategyType.MACD:
+            return not strategy.parameters  # Default 12/26/9 only
+        if strategy.type == StrategyType.RSI and timeframe_resolution(strategy.parameters):
+            return False  # Batch readings are on the base bars
+        if strategy.type == StrategyType.VOLUME and strategy.parameters:
+            if set(strategy.parameters) != {'relative'}:
+                return False
+        return strategy.threshold is not None
+    
+    @classmethod
+    def kind_of(cls, strategy: Strategy) -> int:
+        kind = cls.KIND_BY_TYPE[strategy.type]
+        if kind == cls.VOLUME and is_relative_volume(strategy.parameters):
+            return cls.RELATIVE_VOLUME
+        return kind
+    
+    def __len__(self) -> int:
+        return len(self.strategies) - self.dead + len(self._pending) + len(self.fallback)
+    
+    def strategy_added(self, strategy: Strategy):
+        if self.exclude and self.exclude(strategy):
+            return
+        if self.vectorizable(strategy):
+            self._pending.append(strategy)
+        else:
+            self.fallback[strategy.id] = strategy
+    
+    def strategy_removed(self, strategy: Strategy):
+        if self.exclude and self.exclude(strategy):
+            return
+        row = self._row.pop(strategy.id, None)
+        if row is not None:
+            self.alive[row] = False
+            self.dead += 1
+            # The last live row on a (kind, ticker) takes the reading off the cycle
+            kind, index = int(self.kind[row]), int(self.ticker_idx[row])
+            uses = self._uses[kind]
+            uses[index] -= 1
+            if not uses[index]:
+                del uses[index]
+                self.needed[kind].discard(index)
+        elif self.fallback.pop(strategy.id, None) is None:
+            self._pending = [s for s in self._pending if s.id != strategy.id]
+        else:
+            self.predicates.pop(strategy.id, None)
+    
+    def flush(self):
+        """Append pending strategies to the arrays (compacting if mostly dead)"""
+        if self.dead and self.dead * 2 > len(self.strategies):
+            live = [s for s, alive in zip(self.strategies, self.alive.tolist()) if alive]
+            pending, fallback, predicates = self._pending, self.fallback, self.predicates
+            self.reset(live + pending)
+            self.fallback.update(fallback)
+            self.predicates.update(predicates)
+            return
+        if not self._pending:
+            return
+        
+        rows, self._pending = self._pending, []
+        for strategy in rows:
+            if strategy.ticker not in self._ticker_index:
+                self._ticker_index[strategy.ticker] = len(self.tickers)
+                self.tickers.append(strategy.ticker)
+        
+        start, n = len(self.strategies), len(rows)
+        ticker_idx = np.fromiter((self._ticker_index[s.ticker] for s in rows), np.int32, n)
+        kind_by_type, kind_of = self.KIND_BY_TYPE, self.kind_of
+        kind = np.fromiter((kind_by_type[s.type] if s.parameters is None else kind_of(s) for s in rows),
+                           np.int8, n)
+        
+        self.ticker_idx = np.concatenate((self.ticker_idx, ticker_idx))
+        self.kind = np.concatenate((self.kind, kind))
+        self.above = np.concatenate((self.above, np.fromiter(
+            (s.condition == Condition.ABOVE for s in rows), bool, n)))
+        self.threshold = np.concatenate((self.threshold, np.fromiter(
+            (s.threshold or 0.0 for s in rows), np.float64, n)))
+        self.alive = np.concatenate((self.alive, np.ones(n, bool)))
+        
+        self.strategies.extend(rows)
+        self._row.update((s.id, start + i) for i, s in enumerate(rows))
+        for k, index in zip(kind.tolist(), ticker_idx.tolist()):
+            uses = self._uses[k]
+            if index in uses:
+                uses[index] += 1
+            else:
+                uses[index] = 1
+                self.needed[k].add(index)
+
+
+class ThresholdIndex:
+    """
+    Per-ticker sorted thresholds for PRICE above/below strategies
+    
+    "Above T" fires for every T below the quote and "below T" for every T
+    over it, so with thresholds kept sorted the strategies a quote triggers
+    are a prefix (above) or suffix (below) found by one bisect: O(log n + k)
+    per ticker instead of touching every strategy on the symbol.
+    """
+    
+    def __init__(self, strategies: List[Strategy] = ()):
+        self.reset(strategies)
+    
+    @staticmethod
+    def indexable(strategy: Strategy) -> bool:
+        return (strategy.type == StrategyType.PRICE
+                and strategy.condition in StrategyBatch.LEVEL_CONDITIONS
+                and strategy.threshold is not None)
+    
+    def reset(self, strategies: List[Strategy]):
+        """Rebuild from scratch"""
+        # ticker -> [above thresholds, above strategies, below thresholds, below strategies]
+        self._books: Dict[str, list] = {}
+        grouped: Dict[str, tuple] = {}
+        for strategy in strategies:
+            if self.indexable(strategy):
+                above, below = grouped.setdefault(strategy.ticker, ([], []))
+                (above if strategy.condition == Condition.ABOVE else below).append(strategy)
+        
+        for ticker, sides in grouped.items():
+            book = self._books[ticker] = []
+            for side in sides:
+                side.sort(key=lambda s: s.threshold)
+                book.extend(([s.threshold for s in side], side))
+    
+    def __len__(self) -> int:
+        return sum(len(book[0]) + len(book[2]) for book in self._books.values())
+    
+    def tickers(self) -> List[str]:
+        return list(self._books)
+    
+    def _side(self, strategy: Strategy) -> tuple:
+        book = self._books.get(strategy.ticker)
+        if book is None:
+            book = self._books[strategy.ticker] = [[], [], [], []]
+        offset = 0 if strategy.condition == Condition.ABOVE else 2
+        return book[offset], book[offset + 1]
+    
+    def strategy_added(self, strategy: Strategy):
+        if not self.indexable(strategy):
+            return
+        keys, strategies = self._side(strategy)
+        i = bisect.bisect_right(keys, strategy.threshold)
+        keys.insert(i, strategy.threshold)
+        strategies.insert(i, strategy)
+    
+    def strategy_removed(self, strategy: Strategy):
+        if not self.indexable(strategy) or strategy.ticker not in self._books:
+            return
+        keys, strategies = self._side(strategy)
+        i = bisect.bisect_left(keys, strategy.threshold)
+        while i < len(keys) and keys[i] == strategy.threshold:
+            if strategies[i].id == strategy.id:
+                del keys[i], strategies[i]
+                break
+            i += 1
+        
+        book = self._books[strategy.ticker]
+        if not book[0] and not book[2]:
+            del self._books[strategy.ticker]
+    
+    def triggered(self, ticker: str, price: float) -> List[Strategy]:
+        """Strategies on `ticker` whose level condition holds at `price`"""
+        book = self._books.get(ticker)
+        if book is None:
+            return []
+        above_keys, above, below_keys, below = book
+        return above[:bisect.bisect_left(above_keys, price)] + below[bisect.bisect_right(below_keys, price):]
+
+
+class CrossingSignal:
+    """One series crossing strategies watch - e.g. AAPL's price, or TSLA's 50/200 MA spread"""
+    
+    __slots__ = ('ticker', 'type', 'parameters', 'keys', 'strategies', 'last', 'fresh')
+    
+    def __init__(self, ticker: str, strategy_type: StrategyType, parameters: Optional[Dict]):
+        self.ticker = ticker
+        self.type = strategy_type
+        self.parameters = parameters
+        self.keys: List[float] = []  # Sorted crossing levels
+        self.strategies: List[Strategy] = []  # Parallel to keys
+        self.last: Optional[float] = None  # Last reading; None forces a full pass
+        self.fresh: List[Strategy] = []  # Not observed on either side yet
+
+
+class CrossingTracker:
+    """
+    Edge-triggered state for crosses_above / crosses_below strategies
+    
+    Every crossing strategy remembers which side of its level it was last
+    seen on (+1 above, -1 below) and fires only when a reading lands on the
+    other side. Levels are kept sorted per signal, so when a reading moves
+    from `last` to `value` only strategies with a level in between can have
+    changed side - those are found with bisect and nothing else is touched.
+    
+    A strategy's first reading only establishes its side. Sides are saved to
+    strategy_state, so a restarted monitor picks up where it left off
+    instead of treating its first reading as a baseline (or as a cross).
+    """
+    
+    CONDITIONS = (Condition.CROSSES_ABOVE, Condition.CROSSES_BELOW)
+    SIGNAL_TYPES = (StrategyType.PRICE, StrategyType.RSI, StrategyType.MACD, StrategyType.MA_CROSS,
+                    StrategyType.VOLUME)
+    
+    def __init__(self, db: Database = None, strategies: List[Strategy] = ()):
+        self.db = db
+        self.reset(strategies)
+    
+    @classmethod
+    def tracked(cls, strategy: Strategy) -> bool:
+        return (strategy.condition in cls.CONDITIONS and strategy.type in cls.SIGNAL_TYPES
+                and cls.level(strategy) is not None)
+    
+    @staticmethod
+    def level(strategy: Strategy) -> Optional[float]:
+        """The value whose crossing counts - MACD histogram and MA spread default to 0"""
+        if strategy.type == StrategyType.MA_CROSS:
+            return 0.0
+        if strategy.type == StrategyType.MACD:
+            return strategy.threshold or 0.0
+        return strategy.threshold
+    
+    @staticmethod
+    def _side_of(value: float, level: float) -> int:
+        return (value > level) - (value < level)
+    
+    def reset(self, strategies: List[Strategy]):
+        """Rebuild from scratch, resuming from persisted state"""
+        saved = self.db.get_strategy_states() if self.db is not None else {}
+        saved.update(getattr(self, 'states', {}))  # Anything not flushed yet is newer
+        
+        self.signals: Dict[tuple, CrossingSignal] = {}
+        self._by_ticker: Dict[str, Dict[tuple, CrossingSignal]] = {}
+        self.states: Dict[int, tuple] = {}  # strategy_id -> (last_value, side)
+        self.dirty: Dict[int, tuple] = {}
+        self._parked: Dict[int, tuple] = {}  # Removed this cycle; kept in case it's re-added
+        
+        for strategy in strategies:
+            if self.tracked(strategy):
+                self._insert(strategy, saved.get(strategy.id))
+    
+    def __len__(self) -> int:
+        return sum(len(signal.keys) for signal in self.signals.values())
+    
+    def signals_for(self, ticker: str) -> List[CrossingSignal]:
+        """Signals read from one ticker's data"""
+        return list(self._by_ticker.get(ticker, {}).values())
+    
+    def _signal_key(self, strategy: Strategy) -> tuple:
+        params = strategy.parameters
+        return strategy.ticker, strategy.type, tuple(sorted(params.items())) if params else ()
+    
+    def _insert(self, strategy: Strategy, state: Optional[tuple]):
+        key = self._signal_key(strategy)
+        signal = self.signals.get(key)
+        if signal is None:
+            signal = self.signals[key] = CrossingSignal(strategy.ticker, strategy.type, strategy.parameters)
+            self._by_ticker.setdefault(strategy.ticker, {})[key] = signal
+        
+        level = self.level(strategy)
+        i = bisect.bisect_right(signal.keys, level)
+        signal.keys.insert(i, level)
+        signal.strategies.insert(i, strategy)
+        
+        if state is None:
+            signal.fresh.append(strategy)
+            return
+        # Re-derive the side in case the level was edited; a tie keeps the old one
+        value, side = state
+        reference = value if signal.last is None else signal.last
+        side = self._side_of(reference, level) or side
+        self.states[strategy.id] = (reference, side)
+        if side != state[1] or reference != value:
+            self.dirty[strategy.id] = self.states[strategy.id]
+    
+    def strategy_added(self, strategy: Strategy):
+        if self.tracked(strategy):
+            self._insert(strategy, self._parked.pop(strategy.id, None))
+    
+    def strategy_removed(self, strategy: Strategy):
+        if not self.tracked(strategy):
+            return
+        signal = self.signals.get(self._signal_key(strategy))
+        if signal is None:
+            return
+        
+        level = self.level(strategy)
+        i = bisect.bisect_left(signal.keys, level)
+        while i < len(signal.keys) and signal.keys[i] == level:
+            if signal.strategies[i].id == strategy.id:
+                del signal.keys[i], signal.strategies[i]
+                break
+            i += 1
+        signal.fresh = [s for s in signal.fresh if s.id != strategy.id]
+        if not signal.keys:
+            key = self._signal_key(strategy)
+            del self.signals[key]
+            group = self._by_ticker[strategy.ticker]
+            del group[key]
+            if not group:
+                del self._by_ticker[strategy.ticker]
+        
+        state = self.states.pop(strategy.id, None)
+        self.dirty.pop(strategy.id, None)
+        if state is not None:
+            self._parked[strategy.id] = state
+    
+    def observe(self, signal: CrossingSignal, value: float) -> List[Strategy]:
+        """Record a new reading for `signal`. Returns the strategies it crossed."""
+        keys, strategies = signal.keys, signal.strategies
+        if signal.last is None:
+            lo, hi = 0, len(keys)
+        else:
+            low, high = (signal.last, value) if signal.last <= value else (value, signal.last)
+            lo, hi = bisect.bisect_left(keys, low), bisect.bisect_right(keys, high)
+        
+        crossed = []
+        states, dirty = self.states, self.dirty
+        for i in range(lo, hi):
+            side = (value > keys[i]) - (value < keys[i])
+            strategy = strategies[i]
+            state = states.get(strategy.id)
+            if side == 0 or state is None or state[1] == side:
+                continue
+            states[strategy.id] = dirty[strategy.id] = (value, side)
+            if side == (1 if strategy.condition == Condition.CROSSES_ABOVE else -1):
+                crossed.append(strategy)
+        
+        if signal.fresh:
+            waiting = []
+            for strategy in signal.fresh:
+                side = self._side_of(value, self.level(strategy))
+                if side:
+                    states[strategy.id] = dirty[strategy.id] = (value, side)
+                else:
+                    waiting.append(strategy)
+            signal.fresh = waiting
+        
+        signal.last = value
+        return crossed
+    
+    def save(self):
+        """Persist sides that changed since the last save"""
+        if self.db is not None and self.dirty:
+            self.db.save_strategy_states(self.dirty)
+        self.dirty = {}
+        self._parked = {}
 
 
-# ============================================================================
-# STRATEGY CHECKER
-# ============================================================================
+class TickerRoutes:
+    """
+    The strategies a quote on each ticker can affect, for streaming mode
+    
+    A strategy is routed to its own ticker and, for a composite, to every
+    ticker its terms read, so a tick re-checks only those. Strategies the
+    ThresholdIndex or CrossingTracker already answer per ticker are left to
+    them (`exclude`); the rest run as predicates compiled on first use (see
+    StrategyChecker.compile).
+    """
+    
+    def __init__(self, exclude: Callable[[Strategy], bool] = None, strategies: List[Strategy] = ()):
+        self.exclude = exclude
+        self.reset(strategies)
+    
+    def reset(self, strategies: List[Strategy]):
+        self.routes: Dict[str, Dict[int, Strategy]] = {}
+        self.predicates: Dict[int, Callable] = {}
+        for strategy in strategies:
+            self.strategy_added(strategy)
+    
+    @staticmethod
+    def tickers_of(strategy: Strategy) -> set:
+        if strategy.type == StrategyType.COMPOSITE:
+            return {strategy.ticker, *(ticker for ticker, _, _ in composite_terms(strategy))}
+        return {strategy.ticker}
+    
+    def tickers(self) -> List[str]:
+        return list(self.routes)
+    
+    def strategies_for(self, ticker: str) -> List[Strategy]:
+        return list(self.routes.get(ticker, {}).values())
+    
+    def __len__(self) -> int:
+        return sum(len(group) for group in self.routes.values())
+    
+    def compile(self, compile: Callable[[Strategy], Callable]):
+        """Compile every routed strategy not compiled yet (otherwise done on its first tick)"""
+        for group in self.routes.values():
+            for strategy_id, strategy in group.items():
+                if strategy_id not in self.predicates:
+                    self.predicates[strategy_id] = compile(strategy)
+    
+    def strategy_added(self, strategy: Strategy):
+        if self.exclude is not None and self.exclude(strategy):
+            return
+        for ticker in self.tickers_of(strategy):
+            self.routes.setdefault(ticker, {})[strategy.id] = strategy
+    
+    def strategy_removed(self, strategy: Strategy):
+        for ticker in self.tickers_of(strategy):
+            group = self.routes.get(ticker)
+            if group is not None and group.pop(strategy.id, None) is not None and not group:
+                del self.routes[ticker]
+        self.predicates.pop(strategy.id, None)
+
 
 class StrategyChecker:
     """Checks if strategies should trigger"""
     
     def __init__(self, market_data: MarketData):
         self.market_data = market_data
+        self.prices: Dict[str, Optional[float]] = {}  # Quotes for the current cycle
+        self.last_quotes: Dict[str, Optional[float]] = {}  # Latest fetched quote per ticker, across cycles
+        self.fetched: Dict[str, Optional[float]] = {}  # Quotes the latest begin_cycle() fetched
+        self.fetch_missing = True  # Fetch a quote nobody prefetched (off when quotes are pushed)
+        self.plan = IndicatorPlan(market_data.indicators)  # Register as a registry listener
+        self.cycle_stats = FetchStats()
+        self.total_stats = FetchStats()
+        self.indicator_stats = IndicatorStats()
+    
+    def begin_cycle(self, by_ticker: Dict[str, List[Strategy]], due: List[str] = None):
+        """
+        Fetch each ticker's quote exactly once for every strategy on it
+        
+        The tickers composite terms read are fetched along with the ones
+        strategies are filed under. With `due`, only those tickers are
+        fetched; the rest keep their last fetched quote (see AdaptivePoller).
+        """
+        requests_before = self.market_data.requests_made
+        missing_before = self.market_data.missing
+        if due is None:
+            tickers = dict.fromkeys(by_ticker)
+            for group in by_ticker.values():
+                for strategy in group:
+                    if strategy.type == StrategyType.COMPOSITE:
+                        tickers.update(dict.fromkeys(TickerRoutes.tickers_of(strategy)))
+            fetched = self.prices = self.market_data.get_prices(list(tickers))
+        else:
+            fetched = self.market_data.get_prices(due)
+            self.prices = {ticker: self.last_quotes.get(ticker) for ticker in by_ticker}
+            self.prices.update(fetched)
+        self.last_quotes.update(fetched)
+        self.fetched = fetched
+        
+        lookups = sum(len(group) for group in by_ticker.values())
+        self.cycle_stats = FetchStats(lookups, len(fetched),
+                                      self.market_data.requests_made - requests_before,
+                                      self.market_data.missing - missing_before)
+        self.total_stats.lookups += lookups
+        self.total_stats.fetches += len(fetched)
+        self.total_stats.requests += self.cycle_stats.requests
+        self.total_stats.missing += self.cycle_stats.missing
+        
+        # Quotes are in, so shared indicators are stale until first read
+        self.indicator_stats = self.plan.begin_cycle()
+    
+    def _indicator(self, ticker: str, name: str, *params, resolution: int = None):
+        """Current-cycle indicator value, shared through the plan when it has a slot"""
+        slot = self.plan.slots.get((ticker, name, params, resolution))
+        if slot is not None:
+            return slot.current()
+        return self.market_data.indicators.get(ticker, name, *params, resolution=resolution)
+    
+    def _rsi(self, ticker: str, params: Dict = None) -> Optional[float]:
+        return self._indicator(ticker, "RSI", 14, resolution=timeframe_resolution(params))
+    
+    def _macd(self, ticker: str, params: Dict) -> Optional[tuple]:
+        return self._indicator(ticker, "MACD", params.get('fast', 12), params.get('slow', 26),
+                               params.get('signal', 9), resolution=timeframe_resolution(params))
+    
+    def _get_price(self, ticker: str) -> Optional[float]:
+        """Current-cycle quote, fetched once if it wasn't prefetched"""
+        if ticker not in self.prices:
+            if not self.fetch_missing:
+                return None
+            self.prices[ticker] = self.market_data.get_price(ticker)
+            for stats in (self.cycle_stats, self.total_stats):
+                stats.fetches += 1
+                stats.requests += 1
+        return self.prices[ticker]
+    
+    def evaluate(self, batch: StrategyBatch, index: ThresholdIndex = None,
+                 crossings: CrossingTracker = None, skip: set = None) -> List[tuple]:
+        """
+        Check a whole batch (and optionally a PRICE threshold index and
+        crossing tracker) at once
+        
+        Strategies on a ticker in `skip` (a closed venue) are left out.
+        Crossings there keep their last side, so a move across the gap
+        still counts once the ticker is checked again.
+        Returns: [(strategy, message)] for every strategy that triggered
+        """
+        skip = skip or ()
+        fired = []
+        if index is not None:
+            for ticker in index.tickers():
+                if ticker in skip:
+                    continue
+                price = self._get_price(ticker)
+                if price is not None:
+                    fired.extend((strategy, self._render(strategy, price))
+                                 for strategy in index.triggered(ticker, price))
+        
+        if crossings is not None:
+            self._observe(crossings, [signal for signal in crossings.signals.values() if signal.ticker not in skip],
+                          fired)
+        
+        batch.flush()
+        
+        # One reading per (kind, ticker) that some strategy needs; NaN = no data
+        values = np.full((StrategyBatch.N_KINDS, len(batch.tickers)), np.nan)
+        readers = {
+            StrategyBatch.PRICE: self._get_price,
+            StrategyBatch.RSI: self._rsi,
+            StrategyBatch.MACD: self._macd_histogram,
+            StrategyBatch.VOLUME: self.market_data.get_volume,
+            StrategyBatch.RELATIVE_VOLUME: self.market_data.get_relative_volume,
+        }
+        for kind, read in readers.items():
+            for i in batch.needed[kind]:
+                if batch.tickers[i] in skip:
+                    continue
+                try:
+                    value = read(batch.tickers[i])
+                except Exception as e:
+                    print(f"Error checking {batch.tickers[i]}: {e}")
+                    value = None
+                if value is not None:
+                    values[kind, i] = value
+        
+        # NaN compares False, so strategies without data never fire
+        current = values[batch.kind, batch.ticker_idx]
+        fires = batch.alive & np.where(batch.above, current > batch.threshold, current < batch.threshold)
+        
+        for row in np.flatnonzero(fires).tolist():
+            strategy = batch.strategies[row]
+            fired.append((strategy, self._render(strategy, float(current[row]))))
+        
+        # Everything else runs as a predicate compiled the first time it's seen
+        self._run_predicates([strategy for strategy in batch.fallback.values() if strategy.ticker not in skip],
+                             batch.predicates, fired)
+        return fired
+    
+    def evaluate_ticker(self, ticker: str, routes: TickerRoutes, index: ThresholdIndex = None,
+                        crossings: CrossingTracker = None) -> List[tuple]:
+        """
+        Re-check only what a new quote on `ticker` can change (streaming mode)
+        
+        The quote must already be in self.prices and the market data. Gives
+        the same answers evaluate() would for those strategies.
+        Returns: [(strategy, message)] for every strategy that triggered
+        """
+        self.indicator_stats = self.plan.begin_cycle()
+        fired = []
+        price = self.prices.get(ticker)
+        if index is not None and price is not None:
+            fired.extend((strategy, self._render(strategy, price)) for strategy in index.triggered(ticker, price))
+        if crossings is not None:
+            self._observe(crossings, crossings.signals_for(ticker), fired)
+        self._run_predicates(routes.strategies_for(ticker), routes.predicates, fired)
+        return fired
+    
+    def _observe(self, crossings: CrossingTracker, signals: List[CrossingSignal], fired: List[tuple]):
+        for signal in signals:
+            try:
+                value = self._signal(signal.ticker, signal.type, signal.parameters or {})
+            except Exception as e:
+                print(f"Error checking {signal.ticker}: {e}")
+                value = None
+            if value is not None:
+                fired.extend((strategy, self._render(strategy, value))
+                             for strategy in crossings.observe(signal, value))
+    
+    def _run_predicates(self, strategies: List[Strategy], predicates: Dict[int, Callable], fired: List[tuple]):
+        for strategy in strategies:
+            predicate = predicates.get(strategy.id)
+            if predicate is None:
+                predicate = predicates[strategy.id] = self.compile(strategy)
+            try:
+                message = predicate()
+            except Exception as e:
+                print(f"Error checking {strategy.ticker}: {e}")
+                continue
+            if message is not None:
+                fired.append((strategy, message))
+    
+    def _macd_histogram(self, ticker: str) -> Optional[float]:
+        macd = self._macd(ticker, {})
+        return macd[2] if macd else None
+    
+    def _moving_averages(self, ticker: str, params: Dict) -> Optional[tuple]:
+        """(fast MA, slow MA) for an MA_CROSS strategy, from the incremental engine"""
+        resolution = timeframe_resolution(params)
+        fast = self._indicator(ticker, "SMA", params.get('fast', MA_CROSS_DEFAULTS['fast']), resolution=resolution)
+        slow = self._indicator(ticker, "SMA", params.get('slow', MA_CROSS_DEFAULTS['slow']), resolution=resolution)
+        if fast is None or slow is None:
+            return None
+        return fast, slow
+    
+    def _signal(self, ticker: str, strategy_type: StrategyType, params: Dict) -> Optional[float]:
+        """The reading a crossing strategy compares with its level"""
+        if strategy_type == StrategyType.PRICE:
+            return self._get_price(ticker)
+        if strategy_type == StrategyType.RSI:
+            return self._rsi(ticker, params)
+        if strategy_type == StrategyType.MACD:
+            macd = self._macd(ticker, params)
+            return macd[2] if macd else None
+        if strategy_type == StrategyType.MA_CROSS:
+            averages = self._moving_averages(ticker, params)
+            return averages[0] - averages[1] if averages else None
+        if strategy_type == StrategyType.VOLUME:
+            return self._volume(ticker, params)
+        return None
+    
+    def _volume(self, ticker: str, params: Dict) -> Optional[float]:
+        if is_relative_volume(params):
+            return self.market_data.get_relative_volume(ticker)
+        return self.market_data.get_volume(ticker)
+    
+    def _render(self, strategy: Strategy, value: float) -> str:
+        """Build the alert text for a triggered level or crossing strategy"""
+        fields = {'ticker': strategy.ticker, 'threshold': strategy.threshold, 'value': value}
+        params = strategy.parameters or {}
+        if strategy.type == StrategyType.VOLUME and is_relative_volume(params):
+            return RELATIVE_VOLUME_MESSAGES[strategy.condition].format(**fields)
+        if strategy.type == StrategyType.MACD:
+            fields['line'], fields['signal'], _ = self._macd(strategy.ticker, params)
+        elif strategy.type == StrategyType.MA_CROSS:
+            fields['fast'], fields['slow'] = self._moving_averages(strategy.ticker, params)
+            fields['fast_period'] = params.get('fast', MA_CROSS_DEFAULTS['fast'])
+            fields['slow_period'] = params.get('slow', MA_CROSS_DEFAULTS['slow'])
+        return ALERT_MESSAGES[strategy.type, strategy.condition].format(**fields)
+    
+    def compile(self, strategy: Strategy) -> Callable[[], Optional[str]]:
+        """
+        Specialize a level strategy into a zero-argument predicate
+        
+        The type/condition dispatch, parameter defaults, indicator slot,
+        comparison operator and message template are all resolved here, so
+        each cycle is one direct call. The predicate returns the alert text
+        when the strategy triggers and None otherwise - the same answer as
+        check(), which remains the uncompiled reference.
+        """
+        if strategy.type == StrategyType.COMPOSITE:
+            return self._compile_composite(strategy)
+        
+        ticker, threshold = strategy.ticker, strategy.threshold
+        params = strategy.parameters or {}
+        template = ALERT_MESSAGES.get((strategy.type, strategy.condition))
+        compare = LEVEL_OPERATORS.get(strategy.condition)
+        if template is None or compare is None:
+            return _never
+        plan = self.plan
+        
+        if strategy.type == StrategyType.PRICE and threshold is not None:
+            get_price = self._get_price
+            
+            def predicate():
+                value = get_price(ticker)
+                if value is not None and compare(value, threshold):
+                    return template.format(ticker=ticker, threshold=threshold, value=value)
+            return predicate
+        
+        if strategy.type == StrategyType.VOLUME and threshold is not None:
+            if is_relative_volume(params):
+                read, template = self.market_data.volumes.relative_volume, RELATIVE_VOLUME_MESSAGES[strategy.condition]
+            else:
+                read = self.market_data.volumes.session_volume
+            
+            def predicate():
+                value = read(ticker)
+                if value is not None and compare(value, threshold):
+                    return template.format(ticker=ticker, threshold=threshold, value=value)
+            return predicate
+        
+        slots = [plan.slot(key) for key in IndicatorPlan.term_requirements(ticker, strategy.type, params)]
+        
+        if strategy.type == StrategyType.RSI and threshold is not None:
+            slot = slots[0]
+            
+            def predicate():
+                value = slot.current()
+                if value is not None and compare(value, threshold):
+                    return template.format(ticker=ticker, threshold=threshold, value=value)
+            return predicate
+        
+        if strategy.type == StrategyType.MACD:
+            slot = slots[0]
+            level = threshold or 0.0
+            
+            def predicate():
+                macd = slot.current()
+                if macd is not None and compare(macd[2], level):
+                    return template.format(ticker=ticker, line=macd[0], signal=macd[1])
+            return predicate
+        
+        if strategy.type == StrategyType.MA_CROSS:
+            fast_period = params.get('fast', MA_CROSS_DEFAULTS['fast'])
+            slow_period = params.get('slow', MA_CROSS_DEFAULTS['slow'])
+            fast_slot, slow_slot = slots
+            
+            def predicate():
+                fast, slow = fast_slot.current(), slow_slot.current()
+                if fast is not None and slow is not None and compare(fast, slow):
+                    return template.format(ticker=ticker, fast=fast, slow=slow,
+                                           fast_period=fast_period, slow_period=slow_period)
+            return predicate
+        
+        return _never
+    
+    def _compile_composite(self, strategy: Strategy) -> Callable[[], Optional[str]]:
+        """Compile a COMPOSITE strategy's expression tree into one predicate"""
+        root = self._compile_term((strategy.parameters or {}).get('expression'), strategy.ticker)
+        if root is None:
+            print(f"⚠️  Strategy #{strategy.id}: unsupported composite expression")
+            return _never
+        
+        message = COMPOSITE_MESSAGE.format(ticker=strategy.ticker, expression=root.label)
+        
+        def predicate():
+            return message if root() else None
+        return predicate
+    
+    def _compile_term(self, node, ticker: str):
+        """LevelTerm / TermGroup for one expression node, or None if it isn't supported"""
+        if not isinstance(node, dict):
+            return None
+        for group in COMPOSITE_GROUPS:
+            if group in node:
+                terms = [self._compile_term(child, ticker) for child in node[group] or ()]
+                if not terms or None in terms:
+                    return None
+                return TermGroup(group == 'any', terms)
+        
+        strategy_type = StrategyType.parse(node.get('type'))
+        condition = Condition.parse(node.get('condition'))
+        compare = LEVEL_OPERATORS.get(condition)
+        if compare is None or strategy_type not in TERM_COSTS:
+            return None
+        
+        term_ticker = sys.intern(node.get('ticker') or ticker)
+        params = node.get('parameters') or {}
+        threshold = node.get('threshold')
+        prefix = "" if term_ticker == ticker else f"{term_ticker} "
+        word = condition.name.lower()
+        cost = TERM_COSTS[strategy_type]
+        plan = self.plan
+        
+        if strategy_type == StrategyType.PRICE:
+            if threshold is None:
+                return None
+            if term_ticker != ticker:
+                cost = UNFETCHED_QUOTE_COST
+            return LevelTerm(f"{prefix}price {word} ${threshold}",
+                             lambda: self._get_price(term_ticker), lambda: term_ticker in self.prices,
+                             compare, float(threshold), cost)
+        
+        if strategy_type == StrategyType.VOLUME:
+            if threshold is None:
+                return None
+            relative = is_relative_volume(params)
+            label = f"{prefix}volume {word} {threshold}x average" if relative else f"{prefix}volume {word} {threshold:,}"
+            return LevelTerm(label, lambda: self._volume(term_ticker, params), lambda: True,
+                             compare, float(threshold), cost)
+        
+        keys = IndicatorPlan.term_requirements(term_ticker, strategy_type, params)
+        slots = [plan.slot(key) for key in keys]
+        if timeframe_resolution(params):
+            prefix += f"{params['timeframe']} "
+        ready = lambda: all(slot.epoch == plan.epoch for slot in slots)
+        
+        if strategy_type == StrategyType.RSI:
+            if threshold is None:
+                return None
+            return LevelTerm(f"{prefix}RSI {word} {threshold}", slots[0].current, ready,
+                             compare, float(threshold), cost)
+        
+        if strategy_type == StrategyType.MACD:
+            def histogram():
+                macd = slots[0].current()
+                return macd[2] if macd else None
+            level = float(threshold or 0.0)
+            return LevelTerm(f"{prefix}MACD histogram {word} {level:g}", histogram, ready, compare, level, cost)
+        
+        fast_slot, slow_slot = slots
+        fast_period, slow_period = fast_slot.key[2][0], slow_slot.key[2][0]
+        
+        def spread():
+            fast, slow = fast_slot.current(), slow_slot.current()
+            return fast - slow if fast is not None and slow is not None else None
+        fast_label = "price" if fast_period == 1 else f"{fast_period}-bar MA"
+        return LevelTerm(f"{prefix}{fast_label} {word} {slow_period}-bar MA", spread, ready, compare, 0.0, cost)
     
-    def check(self, strategy: Dict) -> tuple[bool, str]:
+    def check(self, strategy: Strategy) -> tuple[bool, str]:
         """
         Check if a strategy should trigger
         Returns: (triggered, message)
         """
-        ticker = strategy['ticker']
-        strategy_type = strategy['strategy_type']
-        condition = strategy['condition']
-        threshold = strategy.get('threshold')
+        ticker = strategy.ticker
+        strategy_type = strategy.type
+        condition = strategy.condition
+        threshold = strategy.threshold
         
         try:
-            if strategy_type == "PRICE":
+            if strategy_type == StrategyType.PRICE:
                 return self._check_price(ticker, condition, threshold)
             
-            elif strategy_type == "RSI":
-                return self._check_rsi(ticker, condition, threshold)
+            elif strategy_type == StrategyType.RSI:
+                return self._check_rsi(ticker, condition, threshold, strategy.parameters or {})
+            
+            elif strategy_type == StrategyType.MA_CROSS:
+                return self._check_ma_cross(ticker, condition, strategy.parameters or {})
             
-            elif strategy_type == "MA_CROSS":
-                return self._check_ma_cross(ticker, strategy['parameters'])
+            elif strategy_type == StrategyType.VOLUME:
+                return self._check_volume(ticker, condition, threshold, strategy.parameters or {})
             
-            elif strategy_type == "VOLUME":
-                return self._check_volume(ticker, condition, threshold)
+            elif strategy_type == StrategyType.MACD:
+                return self._check_macd(ticker, condition, threshold, strategy.parameters or {})
+            
+            elif strategy_type == StrategyType.COMPOSITE:
+                message = self._compile_composite(strategy)()
+                return message is not None, message or ""
             
         except Exception as e:
             print(f"Error checking {ticker}: {e}")
         
         return False, ""
     
-    def _check_price(self, ticker: str, condition: str, threshold: float) -> tuple[bool, str]:
+    def _check_price(self, ticker: str, condition: Condition, threshold: float) -> tuple[bool, str]:
         """Check price condition"""
-        current_price = self.market_data.get_price(ticker)
+        current_price = self._get_price(ticker)
         
         if current_price is None:
             return False, ""
         
-        if condition == "above" and current_price > threshold:
-            msg = f"{ticker} broke above ${threshold}! Currently at ${current_price:.2f}"
-            return True, msg
-        
-        elif condition == "below" and current_price < threshold:
-            msg = f"{ticker} dropped below ${threshold}! Currently at ${current_price:.2f}"
+        if ((condition == Condition.ABOVE and current_price > threshold)
+                or (condition == Condition.BELOW and current_price < threshold)):
+            msg = ALERT_MESSAGES[StrategyType.PRICE, condition].format(
+                ticker=ticker, threshold=threshold, value=current_price)
             return True, msg
         
         return False, ""
     
-    def _check_rsi(self, ticker: str, condition: str, threshold: float) -> tuple[bool, str]:
+    def _check_rsi(self, ticker: str, condition: Condition, threshold: float,
+                   params: Dict) -> tuple[bool, str]:
         """Check RSI condition"""
-        current_rsi = self.market_data.calculate_rsi(ticker)
+        current_rsi = self._rsi(ticker, params)
         
         if current_rsi is None:
             return False, ""
         
-        if condition == "below" and current_rsi < threshold:
-            msg = f"{ticker} RSI dropped to {current_rsi:.1f} (below {threshold}) - Oversold!"
+        if ((condition == Condition.BELOW and current_rsi < threshold)
+                or (condition == Condition.ABOVE and current_rsi > threshold)):
+            msg = ALERT_MESSAGES[StrategyType.RSI, condition].format(
+                ticker=ticker, threshold=threshold, value=current_rsi)
             return True, msg
         
-        elif condition == "above" and current_rsi > threshold:
-            msg = f"{ticker} RSI rose to {current_rsi:.1f} (above {threshold}) - Overbought!"
+        return False, ""
+    
+    def _check_macd(self, ticker: str, condition: Condition, threshold: Optional[float],
+                    params: Dict) -> tuple[bool, str]:
+        """Check MACD histogram (MACD line minus signal line) against threshold - 0 is a signal-line cross"""
+        macd = self._macd(ticker, params)
+        
+        if macd is None:
+            return False, ""
+        
+        line, signal, histogram = macd
+        threshold = threshold or 0.0
+        
+        if ((condition == Condition.ABOVE and histogram > threshold)
+                or (condition == Condition.BELOW and histogram < threshold)):
+            msg = ALERT_MESSAGES[StrategyType.MACD, condition].format(
+                ticker=ticker, line=line, signal=signal)
             return True, msg
         
         return False, ""
     
-    def _check_ma_cross(self, ticker: str, params: Dict) -> tuple[bool, str]:
-        """Check moving average crossover"""
-        # TODO: Implement proper MA cross detection
+    def _check_ma_cross(self, ticker: str, condition: Condition, params: Dict) -> tuple[bool, str]:
+        """
+        Check whether the fast MA is above/below the slow MA
+        
+        The crossing itself (crosses_above/crosses_below) needs the previous
+        side, so those strategies are tracked by CrossingTracker instead.
+        """
+        averages = self._moving_averages(ticker, params)
+        
+        if averages is None:
+            return False, ""
+        
+        fast, slow = averages
+        if ((condition == Condition.ABOVE and fast > slow)
+                or (condition == Condition.BELOW and fast < slow)):
+            msg = ALERT_MESSAGES[StrategyType.MA_CROSS, condition].format(
+                ticker=ticker, fast=fast, slow=slow,
+                fast_period=params.get('fast', MA_CROSS_DEFAULTS['fast']),
+                slow_period=params.get('slow', MA_CROSS_DEFAULTS['slow']))
+            return True, msg
+        
         return False, ""
     
-    def _check_volume(self, ticker: str, condition: str, threshold: float) -> tuple[bool, str]:
-        """Check volume condition"""
-        # TODO: Implement volume checking
+    def _check_volume(self, ticker: str, condition: Condition, threshold: float,
+                      params: Dict) -> tuple[bool, str]:
+        """Check session volume - in shares, or with {"relative": true} as a multiple of the daily average"""
+        current_volume = self._volume(ticker, params)
+        
+        if current_volume is None or threshold is None:
+            return False, ""
+        
+        if ((condition == Condition.ABOVE and current_volume > threshold)
+                or (condition == Condition.BELOW and current_volume < threshold)):
+            template = (RELATIVE_VOLUME_MESSAGES[condition] if is_relative_volume(params)
+                        else ALERT_MESSAGES[StrategyType.VOLUME, condition])
+            msg = template.format(ticker=ticker, threshold=threshold, value=current_volume)
+            return True, msg
+        
         return False, ""
 
 
@@ -537,15 +3849,498 @@ class StrategyChecker:
 # MAIN MONITORING SYSTEM
 # ============================================================================
 
+@dataclass
+class StreamStats:
+    """Streaming-mode throughput, and tick-to-alert latency of recent alerts"""
+    ticks: int = 0
+    alerts: int = 0
+    latencies: deque = field(default_factory=lambda: deque(maxlen=10000))  # Seconds, tick made -> alert recorded
+    
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+    
+    def __str__(self) -> str:
+        text = f"{self.ticks} ticks, {self.alerts} alerts"
+        if self.latencies:
+            text += (f", tick-to-alert p50 {self.percentile(0.5) * 1000:.1f} ms"
+                     f" / p99 {self.percentile(0.99) * 1000:.1f} ms")
+        return text
+
+
+class AlertDispatcher:
+    """
+    Records and sends alerts on a worker thread, in batches
+    
+    Streaming mode hands each trigger over the moment it fires, and the
+    scheduled monitor hands over each cycle's triggers so the next cycle's
+    fetch runs while they're still being sent. The worker takes everything
+    queued since its last pass, marks and logs it in one transaction, then
+    sends the notifications - so neither a database commit per alert nor a
+    slow mail server holds up quote handling.
+    
+    Submitted strategies leave the registry at once. A batch that fails to
+    commit (say, the database is locked by a web worker) is retried with
+    backoff, together with whatever is queued meanwhile, until it goes
+    through; recording is idempotent, so a retry never logs twice.
+    """
+    
+    def __init__(self, db: Database, notify: Callable[[List[tuple], Dict], None],
+                 registry: StrategyRegistry = None, stats: StreamStats = None):
+        self.db = db
+        self.notify = notify
+        self.registry = registry
+        self.stats = stats
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+    
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="alerts", daemon=True)
+        self._thread.start()
+    
+    def submit(self, fired: List[tuple], made: float):
+        """Queue triggered (strategy, message) pairs from a quote made at `made` (epoch seconds)"""
+        if self.registry is not None:
+            self.registry.hand_off([strategy.id for strategy, _ in fired])
+        self._queue.put((fired, made))
+    
+    def close(self):
+        """Finish everything queued, then stop the worker"""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+    
+    def _run(self):
+        batch: List[tuple] = []  # (fired, made) not recorded yet, oldest first
+        stopping = False
+        failures = 0
+        retry_at = 0.0
+        while True:
+            if not stopping:
+                # Wait for work - or, with a failed batch pending, for its retry
+                items = []
+                try:
+                    items.append(self._queue.get(timeout=max(0.0, retry_at - time.monotonic()) if batch else None))
+                except queue.Empty:
+                    pass
+                while not self._queue.empty():
+                    items.append(self._queue.get_nowait())
+                if None in items:
+                    stopping = True
+                batch += [item for item in items if item is not None]
+                if batch and not stopping and time.monotonic() < retry_at:
+                    continue
+            if not batch:
+                return
+            if stopping and failures:
+                time.sleep(max(0.0, retry_at - time.monotonic()))
+            
+            fired = [pair for pairs, _ in batch for pair in pairs]
+            ids = [strategy.id for strategy, _ in fired]
+            try:
+                self.db.record_triggers([(strategy.id, message) for strategy, message in fired])
+                details = self.db.get_alert_details(ids)
+            except Exception as e:
+                failures += 1
+                if stopping and failures > Config.ALERT_RETRIES_ON_CLOSE:
+                    print(f"Error recording alerts: {e} - {len(fired)} left pending for the next run")
+                    return
+                delay = min(Config.ALERT_RETRY_DELAY * 2 ** (failures - 1), Config.ALERT_RETRY_MAX_DELAY)
+                print(f"Error recording alerts: {e} - retrying {len(fired)} in {delay:.1f}s")
+                retry_at = time.monotonic() + delay
+                continue
+            
+            failures = 0
+            if self.registry is not None:
+                self.registry.settle(ids)
+            if self.stats is not None:
+                now = time.time()
+                self.stats.alerts += len(fired)
+                self.stats.latencies.extend(now - made for pairs, made in batch for _ in pairs)
+            batch = []
+            self.notify(fired, details)
+
+
+@dataclass
+class ScheduleStats:
+    """Monitor cycles against their fixed schedule (seconds)"""
+    cycles: int = 0
+    overruns: int = 0  # Cycles that ran past the next deadline
+    skipped: int = 0  # Deadlines missed while overrunning (merged into a catch-up cycle, or dropped)
+    last_duration: float = 0.0
+    max_duration: float = 0.0
+    total_duration: float = 0.0
+    last_lag: float = 0.0  # How late the latest cycle started
+    max_lag: float = 0.0
+    
+    @property
+    def mean_duration(self) -> float:
+        return self.total_duration / self.cycles if self.cycles else 0.0
+    
+    def __str__(self) -> str:
+        return (f"{self.cycles} cycles, last {self.last_duration:.2f}s (mean {self.mean_duration:.2f}s, "
+                f"max {self.max_duration:.2f}s), lag {self.last_lag:.3f}s (max {self.max_lag:.3f}s), "
+                f"{self.overruns} overruns, {self.skipped} deadlines skipped")
+
+
+class CycleScheduler:
+    """
+    Runs a job on absolute deadlines: start, start + interval, start + 2 x interval...
+    
+    Sleeping a fixed interval after each run stretches every period by the
+    run time, so the schedule drifts further behind as cycles get slower.
+    Here deadlines sit on a fixed grid (on the monotonic clock) and a run
+    only waits for the remainder of its slot. A run that ends past the next
+    deadline is an overrun: the deadlines it missed are merged into a
+    single catch-up run started at once (`catch_up`), or dropped in favour
+    of the next deadline still ahead - never queued up back to back.
+    """
+    
+    def __init__(self, interval: float, catch_up: bool = Config.SCHEDULE_CATCH_UP,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        self.interval = interval
+        self.catch_up = catch_up
+        self.clock = clock
+        self.sleep = sleep
+        self.stats = ScheduleStats()
+    
+    def run(self, job: Callable[[], None], cycles: int = None):
+        """Run `job` on schedule (forever, or `cycles` times)"""
+        interval, stats = self.interval, self.stats
+        deadline = self.clock()
+        for _ in iter(int, 1) if cycles is None else range(cycles):
+            now = self.clock()
+            if now < deadline:
+                self.sleep(deadline - now)
+                now = self.clock()
+            stats.last_lag = now - deadline
+            stats.max_lag = max(stats.max_lag, stats.last_lag)
+            
+            job()
+            
+            finished = self.clock()
+            duration = finished - now
+            stats.cycles += 1
+            stats.last_duration = duration
+            stats.max_duration = max(stats.max_duration, duration)
+            stats.total_duration += duration
+            
+            deadline += interval
+            if finished > deadline:
+                stats.overruns += 1
+                missed = int((finished - deadline) // interval)  # Further deadlines also already past
+                stats.skipped += missed if self.catch_up else missed + 1
+                deadline += (missed if self.catch_up else missed + 1) * interval
+
+
+@dataclass
+class PollStats:
+    """Tickers quoted vs. skipped by adaptive polling"""
+    cycles: int = 0
+    polled: int = 0
+    skipped: int = 0  # Quotes not fetched
+    requests_saved: int = 0  # Batch requests not sent
+    
+    def __str__(self) -> str:
+        total = self.polled + self.skipped
+        share = self.skipped / total if total else 0.0
+        return (f"{self.polled} tickers polled, {self.skipped} skipped ({share:.0%}) "
+                f"-> ~{self.requests_saved} requests saved")
+
+
+class AdaptivePoller:
+    """
+    Decides which tickers need a fresh quote this cycle
+    
+    A ticker whose only strategies are PRICE levels well away from its
+    price can't plausibly reach one before the next few cycles, so
+    fetching it every cycle buys nothing. After each fetch the poller
+    estimates the ticker's volatility from its recent base bars (realized
+    variance per second across bar-to-bar moves) and gives it a horizon:
+    the time it would take a move of POLL_SIGMAS standard deviations to
+    cover the distance to the nearest level. The ticker isn't fetched
+    again until that horizon would expire before the following cycle, and
+    never goes more than `max_staleness` without a quote. Tickers with any
+    other kind of strategy (indicators, volume, composite terms), too
+    little history or no quote are fetched every cycle.
+    """
+    
+    def __init__(self, bars: BarStore, interval: float = Config.CHECK_INTERVAL,
+                 max_staleness: float = Config.POLL_MAX_STALENESS, sigmas: float = Config.POLL_SIGMAS,
+                 clock: Callable[[], float] = time.monotonic):
+        self.bars = bars
+        self.interval = interval
+        self.max_staleness = max_staleness
+        self.sigmas = sigmas
+        self.clock = clock
+        self.cycle_stats = PollStats()
+        self.total_stats = PollStats()
+        self.reset([])
+    
+    def reset(self, strategies: List[Strategy]):
+        self._levels: Dict[str, Dict[int, tuple]] = {}  # ticker -> (PRICE level, operator or None) by strategy id
+        self._always: Dict[str, set] = {}  # ticker -> ids of strategies that need every quote
+        self._next: Dict[str, float] = {}  # ticker -> when its quote must be refreshed by
+        for strategy in strategies:
+            self.strategy_added(strategy)
+    
+    def strategy_added(self, strategy: Strategy):
+        if strategy.type == StrategyType.PRICE and strategy.threshold is not None:
+            self._levels.setdefault(strategy.ticker, {})[strategy.id] = (strategy.threshold,
+                                                                         LEVEL_OPERATORS.get(strategy.condition))
+            self._next.pop(strategy.ticker, None)  # Check a new level against a fresh quote
+        else:
+            for ticker in TickerRoutes.tickers_of(strategy):
+                self._always.setdefault(ticker, set()).add(strategy.id)
+    
+    def strategy_removed(self, strategy: Strategy):
+        levels = self._levels.get(strategy.ticker)
+        if levels is not None and levels.pop(strategy.id, None) is not None:
+            if not levels:
+                del self._levels[strategy.ticker]
+        for ticker in TickerRoutes.tickers_of(strategy):
+            ids = self._always.get(ticker)
+            if ids is not None:
+                ids.discard(strategy.id)
+                if not ids:
+                    del self._always[ticker]
+    
+    def tickers(self) -> List[str]:
+        return list({**self._levels, **self._always})
+    
+    def wake(self, tickers):
+        """Fetch these tickers next cycle, whatever their horizon said"""
+        for ticker in tickers:
+            self._next.pop(ticker, None)
+    
+    def due(self, tickers: List[str] = None, batch_size: int = 1) -> List[str]:
+        """Those of `tickers` (default: all) to fetch this cycle: the ones that would go stale before the next"""
+        cutoff = self.clock() + self.interval
+        tickers = self.tickers() if tickers is None else tickers
+        due = [ticker for ticker in tickers if ticker in self._always or self._next.get(ticker, 0.0) < cutoff]
+        
+        def requests(n: int) -> int:
+            return (n + batch_size - 1) // batch_size
+        
+        self.cycle_stats = PollStats(1, len(due), len(tickers) - len(due), requests(len(tickers)) - requests(len(due)))
+        self.total_stats.cycles += 1
+        self.total_stats.polled += self.cycle_stats.polled
+        self.total_stats.skipped += self.cycle_stats.skipped
+        self.total_stats.requests_saved += self.cycle_stats.requests_saved
+        return due
+    
+    def observe(self, prices: Dict[str, Optional[float]]):
+        """Schedule the next fetch of each ticker just quoted"""
+        now = self.clock()
+        for ticker, price in prices.items():
+            levels = self._levels.get(ticker)
+            if levels is None or ticker in self._always:
+                continue
+            self._next[ticker] = now + self.horizon(ticker, price, levels.values())
+    
+    def horizon(self, ticker: str, price: Optional[float], levels) -> float:
+        """
+        Seconds before `price` could plausibly reach any of `levels` (0 if unknown)
+        
+        `levels` are (level, operator) pairs; a level the price already
+        satisfies (one whose strategy just hasn't been checked yet) is due now.
+        """
+        volatility = self.volatility(ticker)
+        if price is None or price <= 0 or volatility is None:
+            return 0.0
+        if any(compare is not None and compare(price, level) for level, compare in levels):
+            return 0.0
+        distance = min((abs(np.log(level / price)) if level > 0 else 0.0) for level, _ in levels)
+        if volatility == 0:
+            return self.max_staleness if distance else 0.0
+        return min((distance / (self.sigmas * volatility)) ** 2, self.max_staleness)
+    
+    def volatility(self, ticker: str) -> Optional[float]:
+        """Standard deviation of log returns per sqrt(second), from recent base bars"""
+        bars = self.bars.get(ticker)
+        if bars is None or len(bars) <= Config.POLL_MIN_RETURNS:
+            return None
+        n = Config.POLL_VOLATILITY_BARS + 1
+        returns = np.diff(np.log(bars.closes(n)))
+        gaps = np.diff(bars.times(n))
+        # Leave out gaps the poller didn't cause (overnight, outages)
+        recent = gaps <= self.max_staleness + bars.resolution
+        if np.count_nonzero(recent) < Config.POLL_MIN_RETURNS:
+            return None
+        return float(np.sqrt(np.sum(returns[recent] ** 2) / np.sum(gaps[recent])))
+
+
+@dataclass
+class TierStats:
+    """One plan tier's checks: how many, how fast, and how soon its alerts were handed off"""
+    runs: int = 0
+    checked: int = 0  # Strategy checks
+    alerts: int = 0
+    busy: float = 0.0  # Seconds spent fetching quotes and evaluating
+    latencies: deque = field(default_factory=lambda: deque(maxlen=10000))  # Seconds, check started -> alerts handed off
+    
+    percentile = StreamStats.percentile
+    
+    @property
+    def throughput(self) -> float:
+        return self.checked / self.busy if self.busy else 0.0
+    
+    def record(self, checked: int, alerts: int, busy: float, latency: float):
+        self.runs += 1
+        self.checked += checked
+        self.alerts += alerts
+        self.busy += busy
+        self.latencies.append(latency)
+    
+    def __str__(self) -> str:
+        text = f"{self.runs} runs, {self.checked} checks ({self.throughput:,.0f}/s), {self.alerts} alerts"
+        if self.latencies:
+            text += (f", alerts out after p50 {self.percentile(0.5) * 1000:.0f} ms"
+                     f" / p99 {self.percentile(0.99) * 1000:.0f} ms")
+        return text
+
+
+class TierQueue:
+    """
+    The strategies of some plan tiers, with evaluation state of their own
+    
+    A queue is a StrategyListener that passes only its tiers'
+    strategies on to its own threshold index, crossing tracker and batch
+    (and, in streaming mode, ticker routes), so one tier can be checked on
+    its own schedule without touching another's. `interval` None means
+    every monitor cycle; otherwise the queue comes due every `interval`
+    seconds on a fixed grid.
+    """
+    
+    def __init__(self, name: str, plans, interval: Optional[float], db: Database = None,
+                 exclude: Callable[[Strategy], bool] = None):
+        self.name = name
+        self.plans = frozenset(plans)
+        self.interval = interval
+        self.price_index = ThresholdIndex()
+        self.crossings = CrossingTracker(db)
+        self.batch = StrategyBatch(exclude=exclude)
+        self.routes = TickerRoutes(exclude=exclude)  # Streaming mode only (see TradingAlertSystem.stream())
+        self.listeners: List[StrategyListener] = [self.price_index, self.crossings, self.batch]
+        self.stats = TierStats()
+        self.due_at = 0.0  # Monotonic time of the next scheduled check (0: right away)
+        self._by_ticker: Dict[str, Dict[int, Strategy]] = {}
+        self._tickers: Dict[str, int] = {}  # Ticker -> strategies reading it (composite terms included)
+    
+    @classmethod
+    def for_plans(cls, intervals: Dict[str, Optional[float]] = None, db: Database = None,
+                  exclude: Callable[[Strategy], bool] = None) -> List["TierQueue"]:
+        """One queue per distinct check interval (Config.PLAN_CHECK_INTERVALS), fastest first"""
+        groups: Dict[Optional[float], List[Plan]] = {}
+        for name, interval in (intervals or Config.PLAN_CHECK_INTERVALS).items():
+            groups.setdefault(interval, []).append(Plan.parse(name))
+        return [cls("/".join(plan.name.title() for plan in groups[interval]), groups[interval], interval, db, exclude)
+                for interval in sorted(groups, key=lambda interval: -1 if interval is None else interval)]
+    
+    def __len__(self) -> int:
+        return sum(len(group) for group in self._by_ticker.values())
+    
+    def by_ticker(self) -> Dict[str, List[Strategy]]:
+        return {ticker: list(group.values()) for ticker, group in self._by_ticker.items()}
+    
+    def strategies(self) -> List[Strategy]:
+        return [strategy for group in self._by_ticker.values() for strategy in group.values()]
+    
+    def tickers(self) -> List[str]:
+        """Every ticker the queue's strategies read"""
+        return list(self._tickers)
+    
+    def listen(self, listener: StrategyListener):
+        """Feed another listener this queue's strategies from now on"""
+        if listener not in self.listeners:
+            self.listeners.append(listener)
+            listener.reset(self.strategies())
+    
+    def reset(self, strategies: List[Strategy]):
+        mine = [strategy for strategy in strategies if strategy.plan in self.plans]
+        self._by_ticker, self._tickers = {}, {}
+        for strategy in mine:
+            self._add(strategy)
+        for listener in self.listeners:
+            listener.reset(mine)
+    
+    def strategy_added(self, strategy: Strategy):
+        if strategy.plan in self.plans:
+            self._add(strategy)
+            for listener in self.listeners:
+                listener.strategy_added(strategy)
+    
+    def strategy_removed(self, strategy: Strategy):
+        group = self._by_ticker.get(strategy.ticker)
+        if group is None or group.pop(strategy.id, None) is None:
+            return
+        if not group:
+            del self._by_ticker[strategy.ticker]
+        for ticker in TickerRoutes.tickers_of(strategy):
+            self._tickers[ticker] -= 1
+            if not self._tickers[ticker]:
+                del self._tickers[ticker]
+        for listener in self.listeners:
+            listener.strategy_removed(strategy)
+    
+    def _add(self, strategy: Strategy):
+        self._by_ticker.setdefault(strategy.ticker, {})[strategy.id] = strategy
+        for ticker in TickerRoutes.tickers_of(strategy):
+            self._tickers[ticker] = self._tickers.get(ticker, 0) + 1
+    
+    def due(self, now: float) -> bool:
+        return self.interval is None or now >= self.due_at
+    
+    def advance(self, now: float):
+        """Schedule the next check after one made at `now` (missed slots are skipped, not queued)"""
+        if self.interval is None:
+            return
+        self.due_at = (self.due_at or now) + self.interval
+        if self.due_at <= now:
+            self.due_at += ((now - self.due_at) // self.interval + 1) * self.interval
+
+
+@dataclass
+class MarketHoursStats:
+    """Checks held back while venues were closed, and made up at their open"""
+    cycles: int = 0  # Cycles with at least one venue closed
+    held: int = 0  # Strategy checks skipped (no quote fetched, nothing evaluated)
+    caught_up: int = 0  # Checks run at a venue's open ahead of their tier's schedule
+    
+    def __str__(self) -> str:
+        return (f"{self.held} checks held over {self.cycles} cycles with venues closed, "
+                f"{self.caught_up} caught up at the open")
+
+
 class TradingAlertSystem:
     """Main system that ties everything together"""
     
-    def __init__(self):
-        self.db = Database()
+    def __init__(self, db_file: str = Config.DATABASE_FILE, plan_intervals: Dict[str, Optional[float]] = None):
+        self.db = Database(db_file)
+        self.registry = StrategyRegistry(self.db)
+        # Plan tiers, fastest first; those checked every cycle also run on every tick when streaming
+        self.queues = TierQueue.for_plans(plan_intervals, self.db, self._answered_per_ticker)
+        self.live_queues = [queue for queue in self.queues if queue.interval is None]
         self.parser = StrategyParser()
         self.market_data = MarketData()
         self.checker = StrategyChecker(self.market_data)
+        self.poller = AdaptivePoller(self.market_data.bars) if Config.ADAPTIVE_POLLING else None
+        self.registry.listeners += [*self.queues, self.checker.plan]
+        if self.poller is not None:
+            self.registry.listeners.append(self.poller)
         self.alerts = AlertSystem()
+        self.stream_stats = StreamStats()
+        self.schedule_stats: Optional[ScheduleStats] = None  # Set while start_monitoring runs
+        self.market_hours_stats = MarketHoursStats()
+        self.closed: set = set()  # Tickers whose venue was closed at the last cycle
+        self._ticked: Dict[str, tuple] = {}  # Streaming: latest (price, timestamp) per ticker, not yet published
+    
+    @staticmethod
+    def _answered_per_ticker(strategy: Strategy) -> bool:
+        return ThresholdIndex.indexable(strategy) or CrossingTracker.tracked(strategy)
     
     def add_user_strategy(self, email: str, strategy_description: str, phone: str = None) -> int:
         """Add a new user strategy"""
@@ -557,81 +4352,355 @@ class TradingAlertSystem:
         
         # Save to database
         strategy_id = self.db.add_strategy(user_id, strategy)
+        if self.registry.loaded:
+            self.registry.add(strategy_id)
         
         print(f"✓ Added strategy #{strategy_id} for {email}")
         return strategy_id
     
-    def monitor_once(self):
-        """Run one monitoring cycle"""
-        strategies = self.db.get_active_strategies()
+    def _market_hours(self, timestamp: float) -> tuple:
+        """(tickers whose venue is closed now, tickers whose venue opened since the last cycle)"""
+        calendar = self.market_data.calendar
+        closed = set()
+        if calendar is not None:
+            closed = calendar.closed({ticker: None for queue in self.queues for ticker in queue.tickers()}, timestamp)
+        reopened = self.closed - closed
+        self.closed = closed
+        return closed, reopened
+    
+    def monitor_once(self, dispatcher: "AlertDispatcher" = None):
+        """
+        Run one monitoring cycle
+        
+        Each plan tier's queue that is due gets checked in turn, fastest
+        tier first: its quotes fetched, its strategies evaluated and its
+        alerts handed off before the next tier starts, so paid tiers never
+        wait behind the free bulk. With a `dispatcher`, triggers are only
+        dropped from the registry here; recording and sending them overlaps
+        the rest of the cycle and the next one.
+        
+        Strategies on tickers whose venue is closed (see MarketCalendar) are
+        neither quoted nor evaluated. When a venue opens, its tickers are
+        checked at once in every tier, due or not, to catch up on the gap.
+        """
+        cycle_start = time.time()
+        self.registry.sync()
+        now = time.monotonic()
+        closed, reopened = self._market_hours(cycle_start)
+        if reopened and self.poller is not None:
+            self.poller.wake(reopened)  # Horizons from before the close don't cover the gap
+        
+        checks = []
+        held = 0
+        for queue in self.queues:
+            if not len(queue):
+                continue
+            scheduled = queue.due(now)
+            if scheduled:
+                skip = closed
+            elif reopened:
+                skip = set(queue.tickers()) - reopened  # Catch-up only
+            else:
+                continue
+            by_ticker = {}
+            for ticker, group in queue.by_ticker().items():
+                if ticker in skip:
+                    held += len(group) if scheduled else 0
+                else:
+                    by_ticker[ticker] = group
+            if by_ticker:
+                checks.append((queue, by_ticker, skip, scheduled))
+            elif scheduled:
+                queue.advance(now)  # Every venue in the tier is closed: nothing to check this slot
         
-        if not strategies:
-            print("No active strategies to monitor")
+        stats = self.market_hours_stats
+        if closed:
+            stats.cycles += 1
+            stats.held += held
+        
+        if not checks:
+            fed = self._feed_bars(closed, {})
+            if fed:
+                self._publish_quotes([(ticker, price, cycle_start) for ticker, price in fed.items() if price is not None])
+            if not len(self.registry):
+                print("No active strategies to monitor")
+            elif held:
+                reopens = self.market_data.calendar.next_open_of(closed, cycle_start)
+                print(f"Markets closed: {held} strategies on hold until "
+                      f"{datetime.fromtimestamp(reopens).strftime('%a %H:%M')}")
+            else:
+                print("No plan tier due for a check")
             return
         
+        counts = [(queue.name, sum(len(group) for group in by_ticker.values())) for queue, by_ticker, _, _ in checks]
+        total = sum(count for _, count in counts)
         print(f"\n{'='*70}")
-        print(f"Checking {len(strategies)} strategies at {datetime.now().strftime('%H:%M:%S')}")
+        print(f"Checking {total} strategies ({', '.join(f'{name}: {count}' for name, count in counts)}) "
+              f"at {datetime.now().strftime('%H:%M:%S')}")
         print(f"{'='*70}\n")
         
         triggered_count = 0
-        
-        for strategy in strategies:
-            ticker = strategy['ticker']
-            user_email = strategy['email']
+        summaries = []
+        quotes = {}
+        for (queue, by_ticker, skip, scheduled), (_, checked) in zip(checks, counts):
+            started = time.perf_counter()
+            if not scheduled:
+                stats.caught_up += checked
             
-            # Check if should trigger
-            triggered, message = self.checker.check(strategy)
-            
-            if triggered:
-                # Send alert
-                self.alerts.send_alert(user_email, strategy.get('phone'), message)
-                
-                # Mark as triggered
-                self.db.mark_triggered(strategy['id'])
-                
-                # Log alert
-                self.db.log_alert(strategy['id'], strategy['user_id'], message)
-                
-                triggered_count += 1
-                print(f"🚨 ALERT: {message}")
+            # One quote per ticker and one value per distinct indicator, fanned
+            # out to every strategy that depends on it. Tickers whose levels
+            # are out of reach for now keep their last quote.
+            tickers = [ticker for ticker in queue.tickers() if ticker not in skip]  # Composite terms' too
+            if self.poller is None:
+                self.checker.begin_cycle(by_ticker, tickers)
             else:
-                print(f"✓ {ticker:6} - Monitoring ({strategy['strategy_type']})")
+                due = self.poller.due(tickers, self.market_data.batch_size)
+                self.checker.begin_cycle(by_ticker, due)
+                self.poller.observe({ticker: self.checker.prices.get(ticker) for ticker in due})
+            quotes.update(self.checker.fetched)
+            
+            # PRICE levels via the sorted threshold index, crosses via the edge
+            # tracker, everything else via the vectorized batch - all kept in
+            # step with the registry
+            fired = self.checker.evaluate(queue.batch, queue.price_index, queue.crossings, skip)
+            
+            if dispatcher is None:
+                self._notify(fired, self._record_fired(fired))
+            elif fired:
+                dispatcher.submit(fired, cycle_start)
+            queue.stats.record(checked, len(fired), time.perf_counter() - started, time.time() - cycle_start)
+            if scheduled:
+                queue.advance(now)
+            triggered_count += len(fired)
+            
+            fired_by_ticker = {}
+            for strategy, _ in fired:
+                fired_by_ticker[strategy.ticker] = fired_by_ticker.get(strategy.ticker, 0) + 1
+            for ticker, group in by_ticker.items():
+                quiet = len(group) - fired_by_ticker.get(ticker, 0)
+                if quiet:
+                    print(f"✓ {ticker:6} - Monitoring {quiet} {queue.name} strategies")
+            
+            summary = (f"{queue.name}{'' if scheduled else ' (catch-up at the open)'}: {checked} checked, "
+                       f"{len(fired)} alerts | Market data: {self.checker.cycle_stats}")
+            if self.poller is not None:
+                summary += f" | Polling: {self.poller.cycle_stats}"
+            summaries.append(summary)
+        
+        self._save_crossings()  # Every cycle, fired or not, so a restart resumes from these sides
+        fed = self._feed_bars(closed, quotes)
+        quotes.update(fed)
+        self._publish_quotes([(ticker, price, cycle_start) for ticker, price in quotes.items() if price is not None])
         
         print(f"\n{'='*70}")
-        print(f"Checked {len(strategies)} strategies | {triggered_count} alerts sent")
+        print(f"Checked {total} strategies | {triggered_count} alerts sent")
+        for summary in summaries:
+            print(summary)
+        if fed:
+            print(f"Bars: {len(fed)} more tickers quoted for tiers not checked this cycle")
+        if held:
+            print(f"Market hours: {held} strategies on hold, {len(closed)} tickers on closed venues")
+        print(f"Indicators: {self.checker.indicator_stats}")
+        print(f"Quote cache: {self.market_data.cache}")
+        if self.schedule_stats is not None:
+            print(f"Schedule: {self.schedule_stats}")
         print(f"{'='*70}\n")
     
+    def _record_fired(self, fired: List[tuple]) -> Dict[int, Dict]:
+        """Mark and log triggered strategies; returns contact details to notify"""
+        # Mark + log every trigger in one transaction before notifying, so a
+        # crash mid-cycle can't leave a strategy marked without its alert row
+        fired_ids = [strategy.id for strategy, _ in fired]
+        self.db.record_triggers([(strategy.id, message) for strategy, message in fired])
+        self.registry.discard(fired_ids)
+        self._save_crossings()
+        
+        # Contact details are only loaded for the strategies that fired
+        return self.db.get_alert_details(fired_ids) if fired else {}
+    
+    def _feed_bars(self, closed: set, fetched: Dict[str, Optional[float]]) -> Dict[str, Optional[float]]:
+        """
+        Quote the open tickers no tier fetched this cycle, for their price history only
+        
+        Slower tiers are evaluated on their own schedule, but their tickers
+        still get a bar every cycle. Indicators then read the same bars
+        whichever tiers watch a ticker, so the same strategy gives the same
+        answer for a Free user and a Pro one. The quotes also become the
+        last known prices a tier's check starts from (see StrategyChecker.begin_cycle).
+        """
+        tickers = [ticker for ticker in {ticker: None for queue in self.queues for ticker in queue.tickers()}
+                   if ticker not in closed and ticker not in fetched]
+        if not tickers:
+            return {}
+        if self.poller is None:
+            fed = self.market_data.get_prices(tickers)
+        else:
+            due = self.poller.due(tickers, self.market_data.batch_size)
+            fed = self.market_data.get_prices(due) if due else {}
+            self.poller.observe(fed)
+        self.checker.last_quotes.update(fed)
+        return fed
+    
+    def _publish_quotes(self, quotes: List[tuple]):
+        """Share fresh quotes with the web apps through the database (see Database.get_quote)"""
+        try:
+            self.db.publish_quotes(quotes)
+        except sqlite3.Error as e:
+            print(f"Error publishing quotes: {e}")  # Only the web apps' prices go stale; the next cycle retries
+    
+    def _save_crossings(self):
+        """Persist crossing sides that changed; unsaved ones stay dirty for the next call"""
+        try:
+            for queue in self.queues:
+                queue.crossings.save()
+        except sqlite3.Error as e:
+            print(f"Error saving crossing state: {e}")
+    
+    def _notify(self, fired: List[tuple], details: Dict[int, Dict]):
+        for strategy, message in fired:
+            contact = details.get(strategy.id)
+            if contact:
+                self.alerts.send_alert(contact['email'], contact['phone'], message)
+            print(f"🚨 ALERT: {message}")
+    
+    def on_tick(self, tick: Tick) -> List[tuple]:
+        """Take in one pushed quote and re-check the strategies it affects. Returns what fired."""
+        self.market_data.ingest(tick)
+        self.checker.prices[tick.ticker] = tick.price
+        self._ticked[tick.ticker] = (tick.price, tick.timestamp or time.time())
+        fired = []
+        for queue in self.live_queues:
+            fired += self.checker.evaluate_ticker(tick.ticker, queue.routes, queue.price_index, queue.crossings)
+        self.stream_stats.ticks += 1
+        return fired
+    
+    async def stream(self, source: QuoteStream, max_ticks: int = None):
+        """
+        Monitor from pushed quotes instead of polling
+        
+        Every tick is folded into the market data and re-checks only the
+        strategies on its ticker (plus composites that read it) - there is
+        no cycle to wait for. A strategy that fires is dropped from the
+        registry at once and its alert handed to an AlertDispatcher. New
+        strategies are picked up, their tickers subscribed, and crossing
+        sides saved every Config.STREAM_SYNC_INTERVAL seconds. Tiers on a
+        slower schedule than every cycle aren't checked per tick but all at
+        once, on the latest quotes, when their check comes due (skipping
+        tickers whose venue is closed). Runs until
+        the source ends or `max_ticks` ticks have been handled.
+        """
+        for queue in self.live_queues:
+            queue.listen(queue.routes)
+        self.checker.prices = {}
+        self.checker.fetch_missing = False  # A ticker that hasn't ticked yet has no quote
+        dispatcher = AlertDispatcher(self.db, self._notify, self.registry, self.stream_stats)
+        dispatcher.start()
+        
+        def tickers():
+            return list({ticker: None for queue in self.queues for ticker in queue.tickers()})
+        
+        def check_scheduled():
+            now = time.monotonic()
+            calendar = self.market_data.calendar
+            for queue in self.queues:
+                if queue in self.live_queues or not len(queue) or not queue.due(now):
+                    continue
+                started = time.perf_counter()
+                skip = calendar.closed(queue.tickers()) if calendar is not None else set()
+                checked = sum(len(group) for ticker, group in queue.by_ticker().items() if ticker not in skip)
+                self.checker.indicator_stats = self.checker.plan.begin_cycle()
+                fired = self.checker.evaluate(queue.batch, queue.price_index, queue.crossings, skip)
+                if fired:
+                    dispatcher.submit(fired, time.time())
+                busy = time.perf_counter() - started
+                queue.stats.record(checked, len(fired), busy, busy)
+                queue.advance(now)
+        
+        async def follow_registry():
+            while True:
+                if self.registry.sync():
+                    await source.subscribe(tickers())
+                check_scheduled()
+                self._save_crossings()
+                ticked, self._ticked = self._ticked, {}
+                self._publish_quotes([(ticker, price, at) for ticker, (price, at) in ticked.items()])
+                await asyncio.sleep(Config.STREAM_SYNC_INTERVAL)
+        
+        self.registry.sync()
+        for queue in self.live_queues:
+            queue.routes.compile(self.checker.compile)  # Up front, so the first ticks don't pay for it
+        await source.subscribe(tickers())
+        syncing = asyncio.create_task(follow_registry())
+        stats = self.stream_stats
+        handled = 0
+        try:
+            async for tick in source:
+                fired = self.on_tick(tick)
+                if fired:
+                    dispatcher.submit(fired, tick.timestamp or time.time())
+                handled += 1
+                if max_ticks is not None and handled >= max_ticks:
+                    break
+        finally:
+            syncing.cancel()
+            dispatcher.close()
+            self._save_crossings()
+            self.checker.fetch_missing = True
+    
+    def start_streaming(self, source: QuoteStream = None):
+        """Start continuous monitoring from a quote stream (Polygon's websocket by default)"""
+        if source is None and Config.POLYGON_API_KEY == "your-polygon-api-key-here":
+            print("\n❌ Streaming needs a Polygon API key: set POLYGON_API_KEY in Config (or use option 2 to poll)\n")
+            return
+        source = source or PolygonQuoteStream()
+        print("\n" + "="*70)
+        print("🤖 AI TRADING ALERT SYSTEM STARTED (STREAMING)")
+        print("="*70)
+        print(f"Checking strategies on every quote from {type(source).__name__}")
+        print(f"Press Ctrl+C to stop\n")
+        
+        try:
+            asyncio.run(self.stream(source))
+        except KeyboardInterrupt:
+            print("\n\n⏹️  System stopped by user")
+            self.print_stats()
+        except ImportError as e:
+            print(f"\n❌ Streaming needs the `{e.name}` package: pip install -r requirements.txt\n")
+        except PermissionError as e:
+            print(f"\n❌ The quote stream rejected the API key ({e}): check POLYGON_API_KEY in Config\n")
+    
     def start_monitoring(self, interval: int = Config.CHECK_INTERVAL):
         """Start continuous monitoring"""
         print("\n" + "="*70)
         print("🤖 AI TRADING ALERT SYSTEM STARTED")
         print("="*70)
         print(f"Checking market every {interval} seconds")
+        if self.market_data.calendar is not None:
+            print("Tickers on closed venues are held until they open")
         print(f"Press Ctrl+C to stop\n")
         
+        scheduler = CycleScheduler(interval)
+        if self.poller is not None:
+            self.poller.interval = interval
+        self.schedule_stats = scheduler.stats
+        dispatcher = AlertDispatcher(self.db, self._notify, self.registry)
+        dispatcher.start()
         try:
-            while True:
-                self.monitor_once()
-                time.sleep(interval)
+            scheduler.run(lambda: self.monitor_once(dispatcher))
         except KeyboardInterrupt:
             print("\n\n⏹️  System stopped by user")
+            dispatcher.close()
             self.print_stats()
+        finally:
+            dispatcher.close()
+            self._save_crossings()
     
     def print_stats(self):
         """Print system statistics"""
-        conn = sqlite3.connect(Config.DATABASE_FILE)
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT COUNT(*) FROM users')
-        user_count = cursor.fetchone()[0]
-        
-        cursor.execute('SELECT COUNT(*) FROM strategies WHERE active = 1')
-        strategy_count = cursor.fetchone()[0]
-        
-        cursor.execute('SELECT COUNT(*) FROM alerts')
-        alert_count = cursor.fetchone()[0]
-        
-        conn.close()
+        with self.db.pool.connection() as conn:
+            user_count = conn.execute('SELECT COUNT(*) FROM users').fetchone()[0]
+            strategy_count = conn.execute('SELECT COUNT(*) FROM strategies WHERE active = 1').fetchone()[0]
+            alert_count = conn.execute('SELECT COUNT(*) FROM alerts').fetchone()[0]
         
         print("\n" + "="*70)
         print("SYSTEM STATISTICS")
@@ -639,6 +4708,21 @@ class TradingAlertSystem:
         print(f"Total users: {user_count}")
         print(f"Active strategies: {strategy_count}")
         print(f"Total alerts sent: {alert_count}")
+        print(f"Market data this session: {self.checker.total_stats}")
+        if self.poller is not None and self.poller.total_stats.cycles:
+            print(f"Adaptive polling: {self.poller.total_stats}")
+        if self.stream_stats.ticks:
+            print(f"Streaming: {self.stream_stats}")
+        if self.schedule_stats is not None:
+            print(f"Schedule: {self.schedule_stats}")
+        if self.market_hours_stats.cycles:
+            print(f"Market hours: {self.market_hours_stats}")
+        for queue in self.queues:
+            if queue.stats.runs:
+                print(f"{queue.name} tier: {queue.stats}")
+        print(f"Quote cache: {self.market_data.cache}")
+        bars = self.market_data.bars
+        print(f"Price history: {len(bars)} series, {bars.nbytes / 1024:.0f} KB")
         print("="*70 + "\n")
 
 
@@ -656,10 +4740,12 @@ def main():
     print("\nWhat would you like to do?")
     print("1. Add a new strategy")
     print("2. Start monitoring")
-    print("3. View statistics")
-    print("4. Exit")
+    print("3. Start streaming monitoring (Polygon websocket)")
+    print("4. Change a user's plan")
+    print("5. View statistics")
+    print("6. Exit")
     
-    choice = input("\nEnter choice (1-4): ").strip()
+    choice = input("\nEnter choice (1-6): ").strip()
     
     if choice == "1":
         # Add strategy
@@ -674,6 +4760,21 @@ def main():
         system.start_monitoring()
     
     elif choice == "3":
+        # Quotes pushed as they trade instead of polled
+        system.start_streaming()
+    
+    elif choice == "4":
+        # Plan tiers decide how often a user's strategies are checked
+        email = input("User's email: ").strip()
+        plan = input(f"New plan ({' / '.join(plan.name.lower() for plan in Plan)}): ").strip()
+        if plan.upper() not in Plan.__members__:
+            print(f"\nUnknown plan: {plan}\n")
+        elif system.db.set_plan(email, Plan.parse(plan)):
+            print(f"\n✓ {email} is now on the {plan.lower()} plan (running monitors pick it up on their next cycle)\n")
+        else:
+            print(f"\nNo user with email {email}\n")
+    
+    elif choice == "5":
         # View stats
         system.print_stats()
     
@@ -9,6 +9,8 @@ import sqlite3
 import os
 import re
 import json
+from datetime import datetime
+from complete_trading_system import SQL_SELECT_QUOTE, get_http_client, get_pool, migrate
 
 app = Flask(__name__)
 app.secret_key = os.environ.get('SECRET_KEY', 'stratalerts-secret')
@@ -19,77 +21,38 @@ app.secret_key = os.environ.get('SECRET_KEY', 'stratalerts-secret')
 DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'trading_alerts.db')
 
 def get_db():
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+    # Borrow a pooled (WAL, long-lived) connection shared with the monitor
+    return get_pool(DB_PATH).connection()
 
 def init_db():
-    conn = get_db()
-    c = conn.cursor()
-    c.execute('''CREATE TABLE IF NOT EXISTS users (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        email TEXT UNIQUE NOT NULL,
-        phone TEXT,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    )''')
-    c.execute('''CREATE TABLE IF NOT EXISTS strategies (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        user_id INTEGER NOT NULL,
-        ticker TEXT NOT NULL,
-        strategy_type TEXT NOT NULL,
-        condition TEXT NOT NULL,
-        threshold REAL,
-        parameters TEXT,
-        raw_description TEXT,
-        active INTEGER DEFAULT 1,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        triggered_at TIMESTAMP,
-        FOREIGN KEY (user_id) REFERENCES users (id)
-    )''')
-    c.execute('''CREATE TABLE IF NOT EXISTS alerts (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        strategy_id INTEGER NOT NULL,
-        user_id INTEGER NOT NULL,
-        message TEXT NOT NULL,
-        sent_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    )''')
-    conn.commit()
-    conn.close()
-    print(f"✓ Database initialised at {DB_PATH}")
+    with get_db() as conn:
+        version = migrate(conn)
+    print(f"✓ Database initialised at {DB_PATH} (schema v{version})")
 
 init_db()
 
 def get_or_create_user(email):
-    conn = get_db()
-    c = conn.cursor()
-    try:
-        c.execute('INSERT INTO users (email) VALUES (?)', (email,))
-        user_id = c.lastrowid
-        conn.commit()
-    except sqlite3.IntegrityError:
-        c.execute('SELECT id FROM users WHERE email = ?', (email,))
-        user_id = c.fetchone()['id']
-    conn.close()
-    return user_id
+    with get_db() as conn:
+        try:
+            with conn:
+                return conn.execute('INSERT INTO users (email) VALUES (?)', (email,)).lastrowid
+        except sqlite3.IntegrityError:
+            return conn.execute('SELECT id FROM users WHERE email = ?', (email,)).fetchone()['id']
 
 def save_strategy(user_id, parsed):
-    conn = get_db()
-    c = conn.cursor()
-    c.execute('''INSERT INTO strategies
-        (user_id, ticker, strategy_type, condition, threshold, parameters, raw_description)
-        VALUES (?, ?, ?, ?, ?, ?, ?)''', (
-        user_id,
-        parsed['ticker'],
-        parsed['type'],
-        parsed['condition'],
-        parsed['threshold'],
-        json.dumps(parsed.get('parameters', {})),
-        parsed['raw_description'],
-    ))
-    sid = c.lastrowid
-    conn.commit()
-    conn.close()
-    return sid
+    with get_db() as conn, conn:
+        c = conn.execute('''INSERT INTO strategies
+            (user_id, ticker, strategy_type, condition, threshold, parameters, raw_description)
+            VALUES (?, ?, ?, ?, ?, ?, ?)''', (
+            user_id,
+            parsed['ticker'],
+            parsed['type'],
+            parsed['condition'],
+            parsed['threshold'],
+            json.dumps(parsed.get('parameters', {})),
+            parsed['raw_description'],
+        ))
+        return c.lastrowid
 
 # ============================================================================
 # STRATEGY PARSING
@@ -98,25 +61,23 @@ OPENAI_API_KEY = "sk-yourkeyhere"
 
 def parse_with_openai(text):
     try:
-        import urllib.request
-        payload = json.dumps({
-            "model": "gpt-4o-mini",
-            "max_tokens": 200,
-            "temperature": 0,
-            "messages": [{"role": "user", "content":
-                'Parse this trading strategy into JSON. Return ONLY valid JSON.\n'
-                'Fields: ticker (string), type (PRICE/RSI/MACD/VOLUME/MA_CROSS), '
-                'condition (above/below), threshold (number), parameters (object).\n'
-                'Strategy: "' + text + '"'
-            }]
-        }).encode()
-        req = urllib.request.Request(
+        resp = get_http_client().post(
             'https://api.openai.com/v1/chat/completions',
-            data=payload,
-            headers={'Authorization': 'Bearer ' + OPENAI_API_KEY,'Content-Type':'application/json'}
+            json={
+                "model": "gpt-4o-mini",
+                "max_tokens": 200,
+                "temperature": 0,
+                "messages": [{"role": "user", "content":
+                    'Parse this trading strategy into JSON. Return ONLY valid JSON.\n'
+                    'Fields: ticker (string), type (PRICE/RSI/MACD/VOLUME/MA_CROSS), '
+                    'condition (above/below), threshold (number), parameters (object).\n'
+                    'Strategy: "' + text + '"'
+                }]
+            },
+            headers={'Authorization': 'Bearer ' + OPENAI_API_KEY}
         )
-        with urllib.request.urlopen(req, timeout=10) as resp:
-            data = json.loads(resp.read())
+        resp.raise_for_status()
+        data = resp.json()
         raw = data['choices'][0]['message']['content'].strip()
         if raw.startswith('```'):
             raw = raw.split('```')[1]
@@ -155,9 +116,33 @@ def parse_rule_based(text):
 def parse_strategy(text):
     return parse_with_openai(text) or parse_rule_based(text)
 
+# ============================================================================
+# MARKET DATA
+# ============================================================================
+def get_latest_quote(ticker):
+    # Whatever the monitor last published - a request never waits on an upstream fetch
+    with get_db() as conn:
+        row = conn.execute(SQL_SELECT_QUOTE, (ticker,)).fetchone()
+    return (row['price'], row['updated_at']) if row else None
+
+def quote_time(timestamp, now=None):
+    # "14:05" today; otherwise the day too, so Friday's close doesn't read as a live price on Monday
+    at, now = datetime.fromtimestamp(timestamp), now or datetime.now()
+    if at.date() == now.date():
+        return f"{at:%H:%M}"
+    if (now - at).days < 7:
+        return f"{at:%a %H:%M}"
+    return f"{at:%b %d, %Y %H:%M}"
+
 # ============================================================================
 # FLASK ROUTES
 # ============================================================================
+@app.errorhandler(sqlite3.OperationalError)
+def database_busy(e):
+    # Locked database or every pooled connection in use: worth a retry, not a 500
+    print(f"Database busy: {e}")
+    return jsonify(success=False, message="The service is busy, please try again in a moment"), 503
+
 @app.route('/')
 def landing():
     return LANDING
@@ -178,7 +163,13 @@ def api_strategy():
     if not parsed:
         return jsonify(success=False, message="Could not parse strategy")
     save_strategy(user_id, parsed)
-    return jsonify(success=True, message="Strategy submitted successfully")
+    quote = get_latest_quote(parsed['ticker']) if parsed['ticker'] != "UNKNOWN" else None
+    price = quote[0] if quote else None
+    message = "Strategy submitted successfully"
+    if quote is not None:
+        message += f" - {parsed['ticker']} was at ${price:.2f} as of {quote_time(quote[1])}"
+    return jsonify(success=True, message=message, price=price,
+                   price_as_of=datetime.fromtimestamp(quote[1]).isoformat() if quote else None)
 
 # ============================================================================
 # HTML PAGES (truncated landing/app with working submit button)
@@ -783,6 +783,12 @@ def pricing():
 # API ENDPOINTS
 # ============================================================================
 
+def latest_price(ticker):
+    """Last price the monitor published for a ticker (None if it hasn't quoted it yet) - never fetched here"""
+    quote = system.db.get_quote(ticker)
+    return quote[0] if quote else None
+
+
 @app.route('/add-strategy', methods=['POST'])
 def add_strategy():
     """API endpoint to add strategy"""
@@ -800,7 +806,8 @@ def add_strategy():
         return jsonify({
             'success': True,
             'strategy_id': strategy_id,
-            'parsed': parsed
+            'parsed': parsed,
+            'price': latest_price(parsed['ticker'])
         })
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
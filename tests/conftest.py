@@ -0,0 +1,39 @@
+import os
+import sys
+
+import pytest
+
+# The modules under test live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from complete_trading_system import Quote, TradingAlertSystem  # noqa: E402
+from helpers import BASE_TIME  # noqa: E402
+
+
+@pytest.fixture
+def make_system(tmp_path, monkeypatch, capsys):
+    """
+    Build TradingAlertSystems on scratch databases, always open and polling every ticker
+    
+    Quotes come from `quote(ticker, fetch_number)` instead of a provider and
+    feed the bars a minute apart. Each system keeps the sorted ticker lists
+    it fetched in `fetches`.
+    """
+    def make(quote=lambda ticker, fetch: 100.0, name: str = "monitor") -> TradingAlertSystem:
+        system = TradingAlertSystem(str(tmp_path / f"{name}.db"))
+        system.market_data.calendar = None
+        system.poller = None
+        system.fetches = []
+        
+        def get_prices(tickers, timeout=None):
+            system.fetches.append(sorted(tickers))
+            fetch = len(system.fetches)
+            prices = {ticker: quote(ticker, fetch) for ticker in tickers}
+            for ticker, price in prices.items():
+                if price is not None:
+                    system.market_data._record_quote(ticker, Quote(price), BASE_TIME + 60 * fetch)
+            return prices
+        
+        monkeypatch.setattr(system.market_data, "get_prices", get_prices)
+        return system
+    return make
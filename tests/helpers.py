@@ -0,0 +1,70 @@
+"""Builders and reference implementations shared by the tests"""
+
+import random
+from typing import Dict, List, Optional
+
+from benchmarks import StubQuoteServer
+from complete_trading_system import BarStore, MarketData, QuoteCache, TokenBucket
+
+BASE_TIME = 1_800_000_000.0  # A fixed weekday, so bars land in predictable sessions
+
+
+def price_strategy(ticker: str, condition: str, threshold: float) -> Dict:
+    """Strategy dict for Database.add_strategy: a plain price level"""
+    return {'ticker': ticker, 'type': 'PRICE', 'condition': condition, 'threshold': threshold,
+            'parameters': {}, 'raw_description': f"{ticker} {condition.lower()} {threshold}"}
+
+
+def composite_strategy(ticker: str, group: str, *terms) -> Dict:
+    """Strategy dict for Database.add_strategy: price terms (ticker, condition, threshold) joined by `group`"""
+    return {'ticker': ticker, 'type': 'COMPOSITE', 'condition': group, 'threshold': None,
+            'parameters': {'expression': {group: [
+                {'ticker': term_ticker, 'type': 'PRICE', 'condition': condition, 'threshold': threshold}
+                for term_ticker, condition, threshold in terms
+            ]}},
+            'raw_description': f" {group} ".join(f"{t} {c} {x}" for t, c, x in terms)}
+
+
+def stub_market_data(server: StubQuoteServer, use_free: bool = True) -> MarketData:
+    """MarketData quoting from the stub server: always open, not rate-limited, with its own cache"""
+    market_data = MarketData(cache=QuoteCache())
+    market_data.use_free = use_free
+    market_data.yahoo_url = market_data.polygon_url = server.url
+    market_data.yahoo_cookie_url = f"{server.url}/cookie"
+    market_data.calendar = None
+    market_data.rate_limits = {provider: TokenBucket(1_000_000, 1_000_000) for provider in market_data.rate_limits}
+    return market_data
+
+
+def random_walk_bars(store: BarStore, ticker: str, n_bars: int, ticks_per_bar: int = 3, seed: int = 7):
+    """Yield after each quote fed into `store` (several quotes per bar)"""
+    rng = random.Random(seed)
+    price = 100.0
+    for bar in range(n_bars):
+        for tick in range(ticks_per_bar):
+            price *= 1 + rng.gauss(0, 0.002)
+            store.record(ticker, price, timestamp=bar * store.resolution + tick)
+            yield
+
+
+def reference_ema(closes: List[float], period: int) -> List[Optional[float]]:
+    """Full-recomputation EMA series (SMA-seeded), None before it exists"""
+    out = [None] * len(closes)
+    if len(closes) < period:
+        return out
+    alpha = 2 / (period + 1)
+    ema = out[period - 1] = sum(closes[:period]) / period
+    for i in range(period, len(closes)):
+        ema += alpha * (closes[i] - ema)
+        out[i] = ema
+    return out
+
+
+def reference_macd(closes: List[float], fast: int = 12, slow: int = 26, signal: int = 9) -> Optional[tuple]:
+    """Full-recomputation (macd, signal, histogram) at the last close"""
+    fast_ema, slow_ema = reference_ema(closes, fast), reference_ema(closes, slow)
+    line = [f - s for f, s in zip(fast_ema, slow_ema) if s is not None]
+    signal_ema = reference_ema(line, signal)
+    if not line or signal_ema[-1] is None:
+        return None
+    return line[-1], signal_ema[-1], line[-1] - signal_ema[-1]
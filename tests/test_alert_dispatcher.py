@@ -0,0 +1,114 @@
+"""AlertDispatcher: failed batches are retried, never dropped"""
+
+import sqlite3
+import threading
+
+import pytest
+
+from complete_trading_system import AlertDispatcher, Config, Database, StrategyRegistry
+from helpers import price_strategy
+
+
+@pytest.fixture
+def db(tmp_path, capsys):
+    database = Database(str(tmp_path / "alerts.db"))
+    user_id = database.add_user("trader@example.com")
+    for threshold in (100.0, 200.0):
+        database.add_strategy(user_id, {'ticker': 'AAPL', 'type': 'PRICE', 'condition': 'ABOVE',
+                                        'threshold': threshold, 'parameters': {}, 'raw_description': 'test'})
+    return database
+
+
+def flaky(monkeypatch, db, failures: int):
+    """Make record_triggers raise "database is locked" `failures` times"""
+    record = db.record_triggers
+    calls = []
+    
+    def record_triggers(triggers):
+        calls.append(triggers)
+        if len(calls) <= failures:
+            raise sqlite3.OperationalError("database is locked")
+        return record(triggers)
+    
+    monkeypatch.setattr(db, "record_triggers", record_triggers)
+    monkeypatch.setattr(Config, "ALERT_RETRY_DELAY", 0.01)
+    return calls
+
+
+def test_failed_batch_is_retried_until_recorded(db, monkeypatch):
+    calls = flaky(monkeypatch, db, failures=2)
+    registry = StrategyRegistry(db)
+    registry.sync()
+    notified = []
+    dispatcher = AlertDispatcher(db, lambda fired, details: notified.extend(fired), registry)
+    dispatcher.start()
+    
+    fired = [(strategy, f"{strategy.id} fired") for strategy in registry.strategies()]
+    dispatcher.submit(fired, 0.0)
+    assert len(registry) == 0
+    dispatcher.close()
+    
+    assert len(calls) == 3
+    assert sorted(strategy.id for strategy, _ in notified) == sorted(strategy.id for strategy, _ in fired)
+    assert db.get_pending_strategies([strategy.id for strategy, _ in fired]) == []
+    assert not registry._in_flight
+
+
+def test_gives_up_on_close_and_leaves_strategies_pending(db, monkeypatch):
+    monkeypatch.setattr(Config, "ALERT_RETRIES_ON_CLOSE", 2)
+    calls = flaky(monkeypatch, db, failures=100)
+    registry = StrategyRegistry(db)
+    registry.sync()
+    notified = []
+    dispatcher = AlertDispatcher(db, lambda fired, details: notified.extend(fired), registry)
+    dispatcher.start()
+    
+    strategies = registry.strategies()
+    dispatcher.submit([(strategy, "fired") for strategy in strategies], 0.0)
+    dispatcher.close()
+    
+    assert notified == []
+    assert 2 < len(calls) < 100
+    assert len(db.get_pending_strategies([strategy.id for strategy in strategies])) == len(strategies)
+
+
+def test_reload_while_in_flight_does_not_refire(db, monkeypatch):
+    registry = StrategyRegistry(db)
+    registry.sync()
+    strategies = registry.strategies()
+    record = db.record_triggers
+    gate = threading.Event()
+    
+    def record_triggers(triggers):
+        gate.wait(5)
+        return record(triggers)
+    
+    monkeypatch.setattr(db, "record_triggers", record_triggers)
+    dispatcher = AlertDispatcher(db, lambda fired, details: None, registry)
+    dispatcher.start()
+    dispatcher.submit([(strategy, "fired") for strategy in strategies], 0.0)
+    
+    # A pruned change log forces a full reload while the batch is still queued
+    registry.load()
+    assert len(registry) == 0
+    
+    gate.set()
+    dispatcher.close()
+    registry.load()
+    assert len(registry) == 0
+
+
+def test_monitor_saves_crossing_sides_when_nothing_fires(make_system):
+    system = make_system(lambda ticker, fetch: 100.0)
+    system.db.add_strategy(system.db.add_user("trader@example.com"), price_strategy('AAPL', 'CROSSES_ABOVE', 150.0))
+    dispatcher = AlertDispatcher(system.db, system._notify, system.registry)
+    dispatcher.start()
+    for _ in range(3):
+        system.monitor_once(dispatcher)
+    dispatcher.close()
+    assert system.db.get_strategy_states() == {1: (100.0, -1)}
+    
+    # A restarted monitor resumes below the level, so the first quote above it is a cross
+    restarted = make_system(lambda ticker, fetch: 160.0)
+    restarted.monitor_once()
+    assert restarted.db.get_active_strategies() == []
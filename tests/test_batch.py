@@ -0,0 +1,51 @@
+"""StrategyBatch: vectorized evaluation agrees with per-strategy checks"""
+
+import pytest
+
+from complete_trading_system import Condition, MarketData, Strategy, StrategyBatch, StrategyChecker, StrategyType
+
+
+@pytest.fixture
+def checker(monkeypatch):
+    checker = StrategyChecker(MarketData())
+    reads = []
+    
+    def get_price(ticker):
+        reads.append(ticker)
+        return {"AAPL": 190.0, "MSFT": 410.0}.get(ticker)
+    
+    monkeypatch.setattr(checker, "_get_price", get_price)
+    checker.reads = reads
+    return checker
+
+
+def price(id: int, ticker: str, condition: Condition, threshold: float) -> Strategy:
+    return Strategy(id, 1, ticker, StrategyType.PRICE, condition, threshold)
+
+
+def test_fires_like_the_levels_say(checker):
+    batch = StrategyBatch([price(1, "AAPL", Condition.ABOVE, 180), price(2, "AAPL", Condition.ABOVE, 200),
+                           price(3, "MSFT", Condition.BELOW, 420), price(4, "MSFT", Condition.BELOW, 400)])
+    assert sorted(strategy.id for strategy, _ in checker.evaluate(batch)) == [1, 3]
+
+
+def test_ticker_without_live_strategies_is_not_read(checker):
+    strategies = [price(1, "AAPL", Condition.ABOVE, 500), price(2, "MSFT", Condition.ABOVE, 500),
+                  price(3, "MSFT", Condition.BELOW, 100)]
+    batch = StrategyBatch(strategies + [price(i, "MSFT", Condition.ABOVE, 900) for i in range(4, 10)])
+    batch.strategy_removed(strategies[0])
+    checker.evaluate(batch)
+    assert checker.reads == ["MSFT"]
+    
+    # Still one live row on MSFT after the first goes
+    checker.reads.clear()
+    batch.strategy_removed(strategies[1])
+    checker.evaluate(batch)
+    assert checker.reads == ["MSFT"]
+    
+    # Removed strategies pending compaction don't keep their ticker read either
+    for strategy in [strategies[2]] + [price(i, "MSFT", Condition.ABOVE, 900) for i in range(4, 10)]:
+        batch.strategy_removed(strategy)
+    checker.reads.clear()
+    assert checker.evaluate(batch) == []
+    assert checker.reads == []
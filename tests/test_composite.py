@@ -0,0 +1,36 @@
+"""Composite strategies whose terms read other tickers"""
+
+import pytest
+
+from helpers import composite_strategy
+
+SPREAD = composite_strategy('AAPL', 'all', ('AAPL', 'above', 100), ('MSFT', 'below', 500))
+
+
+@pytest.fixture
+def system(make_system, monkeypatch):
+    system = make_system(lambda ticker, fetch: 200.0)
+    system.singles = []
+    monkeypatch.setattr(system.market_data, "get_price", lambda ticker: system.singles.append(ticker) or 200.0)
+    return system
+
+
+def test_term_tickers_fetched_with_the_batch(system):
+    user_id = system.db.add_user("trader@example.com")
+    system.db.add_strategy(user_id, SPREAD)
+    system.monitor_once()
+    
+    assert system.fetches == [["AAPL", "MSFT"]]
+    assert system.singles == []
+    assert system.db.get_active_strategies() == []  # Fired on the batched quotes
+
+
+def test_begin_cycle_fetches_term_tickers(system):
+    user_id = system.db.add_user("trader@example.com")
+    system.db.add_strategy(user_id, SPREAD)
+    system.registry.sync()
+    queue = next(queue for queue in system.queues if len(queue))
+    
+    system.checker.begin_cycle(queue.by_ticker())
+    assert system.fetches == [["AAPL", "MSFT"]]
+    assert system.checker.prices == {"AAPL": 200.0, "MSFT": 200.0}
@@ -0,0 +1,93 @@
+"""CrossingTracker: edge-triggered crosses, resumed across restarts"""
+
+import pytest
+
+from complete_trading_system import Condition, CrossingTracker, Database, Strategy, StrategyType
+from helpers import price_strategy
+
+ABOVE, BELOW = Condition.CROSSES_ABOVE, Condition.CROSSES_BELOW
+
+
+def cross(id: int, condition: Condition, level: float) -> Strategy:
+    return Strategy(id, 1, "AAPL", StrategyType.PRICE, condition, level)
+
+
+def observe(tracker: CrossingTracker, value: float) -> list:
+    """Feed AAPL's price; ids of the strategies that crossed"""
+    return sorted(strategy.id for signal in tracker.signals_for("AAPL")
+                  for strategy in tracker.observe(signal, value))
+
+
+@pytest.fixture
+def db(tmp_path, capsys):
+    database = Database(str(tmp_path / "crossings.db"))
+    user_id = database.add_user("trader@example.com")
+    for condition in ("CROSSES_ABOVE", "CROSSES_BELOW"):
+        database.add_strategy(user_id, price_strategy("AAPL", condition, 150.0))
+    return database
+
+
+def test_first_reading_is_only_a_baseline():
+    tracker = CrossingTracker(strategies=[cross(1, ABOVE, 150), cross(2, BELOW, 150)])
+    assert observe(tracker, 160) == []  # Already above: not a cross
+    assert tracker.states == {1: (160, 1), 2: (160, 1)}
+    assert observe(tracker, 140) == [2]
+    assert observe(tracker, 130) == []  # Still below
+    assert observe(tracker, 150) == []  # On the level: no side change
+    assert observe(tracker, 155) == [1]
+
+
+def test_reading_only_touches_levels_it_moved_across():
+    tracker = CrossingTracker(strategies=[cross(i, ABOVE, level) for i, level in enumerate((10, 20, 30, 40), 1)])
+    observe(tracker, 15)
+    before = dict(tracker.states)
+    assert observe(tracker, 35) == [2, 3]
+    assert {id: tracker.states[id] for id in (1, 4)} == {id: before[id] for id in (1, 4)}
+    assert tracker.dirty.keys() == {1, 2, 3, 4}  # Baselines from the first reading, then the two crossed
+
+
+def test_level_out_of_reach_waits_for_a_side():
+    tracker = CrossingTracker(strategies=[cross(1, ABOVE, 150)])
+    assert observe(tracker, 150) == []  # Exactly on the level: no side yet
+    assert observe(tracker, 151) == []  # First side seen: above
+    assert observe(tracker, 149) == []
+    assert observe(tracker, 151) == [1]
+
+
+def test_removed_and_re_added_before_save_keeps_its_side():
+    strategy = cross(1, ABOVE, 150)
+    tracker = CrossingTracker(strategies=[strategy])
+    observe(tracker, 140)
+    tracker.strategy_removed(strategy)
+    assert len(tracker) == 0
+    tracker.strategy_added(strategy)  # Same cycle (e.g. a registry reload)
+    assert observe(tracker, 160) == [1]
+
+
+def test_restart_resumes_from_saved_sides(db):
+    strategies = db.get_active_strategies_snapshot()[0]
+    tracker = CrossingTracker(db, strategies)
+    assert observe(tracker, 140) == []
+    tracker.save()
+    assert db.get_strategy_states() == {1: (140, -1), 2: (140, -1)}
+    
+    # Crossed while the monitor was down: the first reading after the restart fires
+    restarted = CrossingTracker(db, strategies)
+    assert observe(restarted, 160) == [1]
+
+
+def test_edited_level_re_derives_the_side(db):
+    strategies = db.get_active_strategies_snapshot()[0]
+    tracker = CrossingTracker(db, strategies)
+    observe(tracker, 140)  # Below 150
+    tracker.save()
+    
+    # The crosses_above level moves under the last price while the monitor is down
+    with db.pool.connection() as conn, conn:
+        conn.execute('UPDATE strategies SET threshold = 130 WHERE id = 1')
+    strategies = db.get_active_strategies_snapshot()[0]
+    restarted = CrossingTracker(db, strategies)
+    assert restarted.states[1] == (140, 1)
+    assert observe(restarted, 145) == []  # Still above the new level: no spurious cross
+    assert observe(restarted, 120) == []  # crosses_below 150 was already below
+    assert observe(restarted, 135) == [1]
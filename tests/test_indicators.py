@@ -0,0 +1,43 @@
+"""Incremental indicators match a full recomputation over the same bars"""
+
+import pytest
+
+from complete_trading_system import BarStore, IndicatorEngine, wilder_rsi
+from helpers import random_walk_bars, reference_ema, reference_macd
+
+REFERENCES = {
+    ("RSI", 14): lambda closes: wilder_rsi(closes, 14),
+    ("SMA", 50): lambda closes: float(closes[-50:].mean()) if len(closes) >= 50 else None,
+    ("EMA", 20): lambda closes: reference_ema(closes.tolist(), 20)[-1],
+    ("MACD", 12, 26, 9): lambda closes: reference_macd(closes.tolist()),
+}
+
+
+def assert_matches(got, want):
+    assert (got is None) == (want is None), (got, want)
+    if want is not None:
+        assert got == pytest.approx(want, abs=1e-9)
+
+
+@pytest.mark.parametrize("key", REFERENCES, ids=lambda key: "-".join(map(str, key)))
+def test_matches_full_recomputation_after_every_quote(key):
+    store = BarStore()
+    engine = IndicatorEngine(store)
+    handle = engine.handle("AAPL", *key)  # Bound before any bars exist
+    recompute = REFERENCES[key]
+    for _ in random_walk_bars(store, "AAPL", 150):
+        want = recompute(store.get("AAPL").closes())
+        assert_matches(engine.get("AAPL", *key), want)
+        assert_matches(handle(), want)
+
+
+@pytest.mark.parametrize("key", REFERENCES, ids=lambda key: "-".join(map(str, key)))
+def test_rolled_up_timeframe_matches_full_recomputation(key):
+    store = BarStore()
+    engine = IndicatorEngine(store)
+    recompute = REFERENCES[key]
+    for _ in random_walk_bars(store, "AAPL", 5 * 150, ticks_per_bar=1):
+        got = engine.get("AAPL", *key, resolution=300)
+        closes = store.get("AAPL", 300).closes().copy()  # A view into the store otherwise
+        closes[-1] = store.get("AAPL").last_close  # The forming bar is valued at the latest price
+        assert_matches(got, recompute(closes))
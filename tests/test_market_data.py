@@ -0,0 +1,53 @@
+"""MarketData quote fetching against a local stub of the providers"""
+
+import time
+
+import pytest
+
+from benchmarks import StubQuoteServer, stub_price
+from complete_trading_system import Config, QuoteCache
+from helpers import stub_market_data
+
+
+@pytest.fixture(params=[True, False], ids=["yahoo", "polygon"])
+def use_free(request):
+    return request.param
+
+
+@pytest.mark.parametrize("concurrent", [True, False])
+def test_stalled_server_cannot_hold_past_deadline(use_free, concurrent, monkeypatch, capsys):
+    monkeypatch.setattr(Config, "CONCURRENT_FETCH", concurrent)
+    with StubQuoteServer(slow={"SLOW": 3.0}) as server:
+        market_data = stub_market_data(server, use_free)
+        started = time.monotonic()
+        assert market_data.get_prices(["SLOW"], timeout=0.3) == {"SLOW": None}
+        assert time.monotonic() - started < 1.0
+
+
+def test_batches_quotes_and_serves_repeats_from_cache(use_free, capsys):
+    tickers = [f"T{i:03d}" for i in range(250)]
+    with StubQuoteServer() as server:
+        market_data = stub_market_data(server, use_free)
+        prices = market_data.get_prices(tickers + tickers[:10])  # Duplicates are fetched once
+        
+        batches = -(-len(tickers) // market_data.batch_size)
+        handshake = 2 if use_free else 0  # Yahoo's cookie + crumb, once
+        assert server.request_count == market_data.requests_made == batches + handshake
+        assert prices == {ticker: stub_price(ticker) for ticker in tickers}
+        
+        assert market_data.get_prices(tickers[::-1]) == prices
+        assert server.request_count == batches + handshake
+        assert market_data.missing == 0
+
+
+def test_expired_yahoo_crumb_is_renewed(capsys):
+    with StubQuoteServer() as server:
+        market_data = stub_market_data(server, use_free=True)
+        assert market_data.get_prices(["AAPL"]) == {"AAPL": stub_price("AAPL")}
+        assert server.request_count == 3  # Cookie, crumb, quotes
+        
+        server.httpd.crumb = "rotated"
+        market_data.cache = QuoteCache()
+        assert market_data.get_prices(["MSFT"]) == {"MSFT": stub_price("MSFT")}
+        assert server.request_count == 3 + 4  # Rejected, cookie, crumb, quotes - no single-quote fallback
+        assert "falling back" not in capsys.readouterr().out
@@ -0,0 +1,40 @@
+"""StrategyParser's rule-based fallback: single conditions, ranges and compounds"""
+
+import pytest
+
+from complete_trading_system import StrategyParser
+
+
+def parse(description: str) -> dict:
+    return StrategyParser()._fallback_parse(description)
+
+
+def term(strategy_type: str, condition: str, threshold: float) -> dict:
+    return {'type': strategy_type, 'condition': condition, 'threshold': threshold, 'parameters': {}}
+
+
+def test_single_condition():
+    strategy = parse("Alert me when Apple's RSI drops below 30")
+    assert (strategy['ticker'], strategy['type'], strategy['condition'], strategy['threshold']) == \
+        ("AAPL", "RSI", "below", 30.0)
+
+
+@pytest.mark.parametrize("description, expression", [
+    ("AAPL trades between 150 and 200", {'all': [term('PRICE', 'above', 150.0), term('PRICE', 'below', 200.0)]}),
+    ("Apple RSI between 70 and 30", {'all': [term('RSI', 'above', 30.0), term('RSI', 'below', 70.0)]}),
+    ("Tesla above 250 or below 200", {'any': [term('PRICE', 'above', 250.0), term('PRICE', 'below', 200.0)]}),
+    ("Apple above 150 and RSI below 30", {'all': [term('PRICE', 'above', 150.0), term('RSI', 'below', 30.0)]}),
+    ("Apple between $150 and $200 or volume above 5M", {'any': [
+        {'all': [term('PRICE', 'above', 150.0), term('PRICE', 'below', 200.0)]},
+        term('VOLUME', 'above', 5_000_000.0),
+    ]}),
+])
+def test_compound_descriptions(description, expression):
+    strategy = parse(description)
+    assert strategy['type'] == "COMPOSITE"
+    assert strategy['parameters'] == {'expression': expression}
+
+
+def test_clause_without_its_own_condition_is_not_split():
+    strategy = parse("Apple above 150 and 200")
+    assert (strategy['type'], strategy['condition'], strategy['threshold']) == ("PRICE", "above", 150.0)
@@ -0,0 +1,17 @@
+"""ConnectionPool: borrowing and running out of connections"""
+
+import sqlite3
+
+import pytest
+
+from complete_trading_system import Config, ConnectionPool
+
+
+def test_exhausted_pool_raises_a_database_error(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "DB_BUSY_TIMEOUT", 0.05)
+    pool = ConnectionPool(str(tmp_path / "pool.db"), size=1)
+    with pool.connection():
+        with pytest.raises(sqlite3.OperationalError, match="pool exhausted"):
+            pool.acquire()
+    with pool.connection() as conn:  # Released: available again
+        assert conn.execute("SELECT 1").fetchone()[0] == 1
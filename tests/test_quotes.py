@@ -0,0 +1,24 @@
+"""Quotes the monitor publishes for the web apps (Database.publish_quotes / get_quote)"""
+
+from complete_trading_system import Database
+
+
+def test_newer_quote_wins(tmp_path, capsys):
+    db = Database(str(tmp_path / "quotes.db"))
+    assert db.get_quote("AAPL") is None
+    db.publish_quotes([("AAPL", 190.0, 2_000.0)])
+    db.publish_quotes([("AAPL", 180.0, 1_000.0)])  # Late writer with an older quote
+    assert db.get_quote("AAPL") == (190.0, 2_000.0)
+    db.publish_quotes([("AAPL", 191.0, 3_000.0)])
+    assert db.get_quote("AAPL") == (191.0, 3_000.0)
+
+
+def test_monitor_cycle_publishes_what_it_fetched(make_system):
+    system = make_system(lambda ticker, fetch: 101.5)
+    system.add_user_strategy("trader@example.com", "Alert me when AAPL goes above $500")
+    system.monitor_once()
+    assert system.fetches == [["AAPL"]]
+    
+    # Another process (a web worker) reads it without fetching anything
+    price, _ = Database(system.db.db_file).get_quote("AAPL")
+    assert price == 101.5
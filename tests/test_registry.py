@@ -0,0 +1,61 @@
+"""StrategyRegistry: following the strategy change log across monitors"""
+
+import pytest
+
+from complete_trading_system import Config, Database, StrategyRegistry
+
+STRATEGY = {'ticker': 'AAPL', 'type': 'PRICE', 'condition': 'ABOVE', 'threshold': 100.0,
+            'parameters': {}, 'raw_description': 'test'}
+
+
+@pytest.fixture
+def db(tmp_path, capsys):
+    database = Database(str(tmp_path / "registry.db"))
+    database.user_id = database.add_user("trader@example.com")
+    return database
+
+
+def test_sync_picks_up_new_strategies(db):
+    registry = StrategyRegistry(db)
+    registry.load()
+    db.add_strategy(db.user_id, STRATEGY)
+    assert registry.sync() == 1
+    assert len(registry) == 1
+
+
+def test_log_emptied_by_another_monitor_forces_reload(db):
+    behind, ahead = StrategyRegistry(db), StrategyRegistry(db)
+    behind.load()
+    db.add_strategy(db.user_id, STRATEGY)
+    ahead.load()  # Prunes the log up to the new strategy's change
+    
+    assert behind.sync() == 1
+    assert len(behind) == 1
+    assert behind.cursor == ahead.cursor
+    
+    # Caught up: an empty log no longer means a gap
+    assert behind.sync() == 0
+    assert db.get_strategy_changes(behind.cursor) == (set(), behind.cursor)
+
+
+def test_sync_prunes_the_log_it_has_read(db, monkeypatch):
+    monkeypatch.setattr(Config, "CHANGE_LOG_PRUNE_ROWS", 3)
+    registry = StrategyRegistry(db)
+    registry.load()
+    
+    def log_size():
+        with db.pool.connection() as conn:
+            return conn.execute('SELECT COUNT(*) FROM strategy_changes').fetchone()[0]
+    
+    for _ in range(2):
+        db.add_strategy(db.user_id, STRATEGY)
+    registry.sync()
+    assert log_size() == 2  # Below the threshold
+    
+    db.add_strategy(db.user_id, STRATEGY)
+    registry.sync()
+    assert log_size() == 0
+    assert len(registry) == 3
+    
+    db.add_strategy(db.user_id, STRATEGY)
+    assert registry.sync() == 1  # Still follows the log after pruning it
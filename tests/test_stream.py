@@ -0,0 +1,65 @@
+"""Streaming mode fires what a polling cycle would on the same quotes"""
+
+import asyncio
+
+import pytest
+
+from complete_trading_system import Config, Plan, QuoteStream, ReplayQuoteStream, Tick
+from helpers import BASE_TIME, composite_strategy as composite, price_strategy as price
+
+QUOTES = {"AAPL": 190.0, "MSFT": 410.0, "TSLA": 250.0, "NVDA": 120.0}
+
+STRATEGIES = [
+    price("AAPL", "ABOVE", 180), price("AAPL", "ABOVE", 200), price("AAPL", "BELOW", 195),
+    price("MSFT", "BELOW", 400), price("MSFT", "ABOVE", 405), price("TSLA", "BELOW", 250.5),
+    price("NVDA", "ABOVE", 121), price("NVDA", "BELOW", 100),
+    composite("AAPL", "all", ("AAPL", "above", 185), ("MSFT", "below", 420)),
+    composite("TSLA", "all", ("TSLA", "above", 200), ("NVDA", "above", 130)),
+    composite("NVDA", "any", ("NVDA", "above", 130), ("AAPL", "below", 191)),
+]
+
+
+def fired_ids(system) -> set:
+    with system.db.pool.connection() as conn:
+        return {row[0] for row in conn.execute('SELECT strategy_id FROM alerts')}
+
+
+def test_replayed_stream_fires_like_evaluate(make_system):
+    polled, streamed = (make_system(lambda ticker, fetch: QUOTES[ticker], name) for name in ("polled", "streamed"))
+    for system in (polled, streamed):
+        user_id = system.db.add_user("trader@example.com", plan=Plan.PRO)
+        for strategy in STRATEGIES:
+            system.db.add_strategy(user_id, strategy)
+    
+    polled.monitor_once()
+    ticks = [Tick(ticker, quote, timestamp=BASE_TIME + i) for i, (ticker, quote) in enumerate(QUOTES.items())]
+    asyncio.run(streamed.stream(ReplayQuoteStream(ticks, speed=0)))
+    
+    assert fired_ids(polled) == {1, 3, 5, 6, 9, 11}
+    assert fired_ids(streamed) == fired_ids(polled)
+
+
+class FailingStream(QuoteStream):
+    def __init__(self, error: Exception):
+        super().__init__()
+        self.error = error
+    
+    async def ticks(self):
+        raise self.error
+        yield
+
+
+@pytest.mark.parametrize("error, message", [
+    (ModuleNotFoundError("No module named 'websockets'", name="websockets"), "needs the `websockets` package"),
+    (PermissionError("authentication failed"), "rejected the API key"),
+])
+def test_streaming_setup_errors_are_reported(make_system, capsys, error, message):
+    system = make_system()
+    system.start_streaming(FailingStream(error))
+    assert message in capsys.readouterr().out
+
+
+def test_streaming_without_a_polygon_key_is_refused(make_system, capsys, monkeypatch):
+    monkeypatch.setattr(Config, "POLYGON_API_KEY", "your-polygon-api-key-here")
+    make_system().start_streaming()
+    assert "needs a Polygon API key" in capsys.readouterr().out
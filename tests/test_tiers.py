@@ -0,0 +1,72 @@
+"""Plan tiers: slower tiers are evaluated on schedule but keep their bars current"""
+
+import pytest
+
+from complete_trading_system import LEVEL_OPERATORS, AdaptivePoller, BarStore, Condition, Plan
+from helpers import price_strategy, random_walk_bars
+
+
+@pytest.fixture
+def system(make_system):
+    return make_system(lambda ticker, fetch: 100.0 + fetch)
+
+
+def test_free_only_ticker_gets_a_bar_every_cycle(system, monkeypatch):
+    user_id = system.db.add_user("free@example.com", plan=Plan.FREE)
+    system.db.add_strategy(user_id, price_strategy('MSFT', 'ABOVE', 10_000))
+    free = next(queue for queue in system.queues if Plan.FREE in queue.plans)
+    evaluated = []
+    evaluate = system.checker.evaluate
+    monkeypatch.setattr(system.checker, "evaluate",
+                        lambda batch, *args: evaluated.append(batch) or evaluate(batch, *args))
+    
+    for _ in range(3):
+        system.monitor_once()
+    
+    assert system.fetches == [["MSFT"]] * 3
+    assert evaluated == [free.batch]  # Hourly: only the first cycle was due
+    assert free.stats.runs == 1
+    assert system.market_data.bars.get("MSFT").closes(3).tolist() == [101.0, 102.0, 103.0]
+
+
+def test_set_plan_moves_strategies_between_queues(system):
+    user_id = system.db.add_user("trader@example.com")
+    system.db.add_strategy(user_id, price_strategy('AAPL', 'ABOVE', 10_000))
+    system.registry.sync()
+    pro, free = system.queues
+    assert (len(pro), len(free)) == (0, 1)
+    
+    assert system.db.set_plan("trader@example.com", Plan.PRO)
+    assert not system.db.set_plan("nobody@example.com", Plan.PRO)
+    system.registry.sync()
+    assert (len(pro), len(free)) == (1, 0)
+
+
+def test_slow_tier_check_starts_from_fed_quotes(make_system, monkeypatch):
+    system = make_system(lambda ticker, fetch: 100.0 if fetch == 1 else 160.0)
+    system.poller = AdaptivePoller(system.market_data.bars)
+    system.db.add_strategy(system.db.add_user("free@example.com"), price_strategy('AAPL', 'ABOVE', 150))
+    free = next(queue for queue in system.queues if Plan.FREE in queue.plans)
+    
+    system.monitor_once()  # Free check at 100
+    system.monitor_once()  # Bars only: 160
+    assert system.fetches == [["AAPL"], ["AAPL"]]
+    
+    # The Free check comes due while the poller has nothing due
+    free.due_at = 0.0
+    monkeypatch.setattr(system.poller, "due", lambda tickers, batch_size=1: [])
+    system.monitor_once()
+    assert system.checker.prices == {"AAPL": 160.0}
+    assert system.db.get_active_strategies() == []
+
+
+def test_level_already_satisfied_is_due_now():
+    bars = BarStore()
+    for _ in random_walk_bars(bars, "AAPL", 40, ticks_per_bar=1):
+        pass
+    poller = AdaptivePoller(bars, max_staleness=3600)
+    price = bars.get("AAPL").last_close
+    ahead = [(price * 1.5, LEVEL_OPERATORS[Condition.ABOVE])]
+    assert poller.horizon("AAPL", price, ahead) > 0
+    assert poller.horizon("AAPL", price, ahead + [(price * 0.9, LEVEL_OPERATORS[Condition.ABOVE])]) == 0
+    assert poller.horizon("AAPL", price, ahead + [(price * 0.9, None)]) > 0  # A cross needs the move back first
@@ -0,0 +1,72 @@
+"""Session volume rollover (VolumeTracker) against the trading calendar"""
+
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from complete_trading_system import Config, VolumeTracker
+
+
+def at(*fields) -> float:
+    return datetime(*fields, tzinfo=ZoneInfo(Config.MARKET_TIMEZONE)).timestamp()
+
+
+def test_stale_total_overnight_is_not_new_volume():
+    tracker = VolumeTracker(days=3)
+    tracker.record("AAPL", 1_000, at(2026, 10, 19, 10, 0))
+    assert tracker.record("AAPL", 5_000, at(2026, 10, 19, 15, 0)) == 4_000
+    
+    # Past midnight the provider still reports Monday's total
+    assert tracker.record("AAPL", 5_000, at(2026, 10, 20, 0, 30)) == 0.0
+    assert tracker.session_volume("AAPL") == 5_000
+    assert tracker.average_volume("AAPL") is None
+    
+    # At the open it's Monday's volume, not Tuesday's, until the provider resets
+    assert tracker.record("AAPL", 5_000, at(2026, 10, 20, 9, 31)) == 0.0
+    assert tracker.session_volume("AAPL") == 0.0
+    assert tracker.average_volume("AAPL") == 5_000
+    assert tracker.record("AAPL", 300, at(2026, 10, 20, 9, 32)) == 300
+    assert tracker.session_volume("AAPL") == 300
+    assert tracker.average_volume("AAPL") == 5_000
+
+
+def test_weekend_adds_one_session_to_the_baseline():
+    tracker = VolumeTracker(days=3)
+    tracker.record("AAPL", 1_000, at(2026, 10, 16, 10, 0))  # Friday
+    tracker.record("AAPL", 8_000, at(2026, 10, 16, 15, 59))
+    for day in (17, 18):  # Saturday, Sunday
+        for hour in (0, 12, 23):
+            assert tracker.record("AAPL", 8_000, at(2026, 10, day, hour, 0)) == 0.0
+    assert tracker.average_volume("AAPL") is None
+    
+    tracker.record("AAPL", 200, at(2026, 10, 19, 9, 35))  # Reset with the open
+    assert tracker.session_volume("AAPL") == 200
+    assert tracker.average_volume("AAPL") == 8_000
+    assert tracker.relative_volume("AAPL") == 200 / 8_000
+
+
+def test_reset_ahead_of_the_open_rolls_over_once():
+    tracker = VolumeTracker(days=3)
+    tracker.record("AAPL", 1_000, at(2026, 10, 19, 10, 0))
+    tracker.record("AAPL", 6_000, at(2026, 10, 19, 15, 0))
+    assert tracker.record("AAPL", 50, at(2026, 10, 20, 8, 0)) == 50  # Pre-market
+    assert tracker.record("AAPL", 400, at(2026, 10, 20, 9, 45)) == 350
+    assert tracker.session_volume("AAPL") == 400
+    assert tracker.average_volume("AAPL") == 6_000
+
+
+def test_round_the_clock_venue_rolls_over_on_reset():
+    tracker = VolumeTracker(days=3)
+    tracker.record("BTC-USD", 10.0, at(2026, 10, 17, 12, 0))  # A Saturday
+    assert tracker.record("BTC-USD", 25.0, at(2026, 10, 17, 18, 0)) == 15.0
+    assert tracker.record("BTC-USD", 4.0, at(2026, 10, 17, 20, 1)) == 4.0
+    assert tracker.session_volume("BTC-USD") == 4.0
+    assert tracker.average_volume("BTC-USD") == 25.0
+
+
+def test_correction_within_a_session_is_not_a_reset():
+    tracker = VolumeTracker(days=3)
+    tracker.record("AAPL", 1_000, at(2026, 10, 19, 10, 0))
+    tracker.record("AAPL", 5_000, at(2026, 10, 19, 11, 0))
+    assert tracker.record("AAPL", 4_900, at(2026, 10, 19, 11, 1)) == 0.0
+    assert tracker.session_volume("AAPL") == 4_900
+    assert tracker.average_volume("AAPL") is None